@@ -0,0 +1,41 @@
+"""Add llm_extraction_cache table.
+
+Revision ID: 20261016_llm_cache
+Revises: 20261016_prompt_active_idx
+Create Date: 2026-10-16
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_llm_cache'
+down_revision = '20261016_prompt_active_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'llm_extraction_cache',
+        sa.Column('variable_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('content_hash', sa.String(32), nullable=False,
+                  comment='BLAKE2b-128 of the extracted text'),
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('variable_hash', sa.String(32), nullable=False,
+                  comment='BLAKE2b-128 of the variable definition and prompt'),
+        sa.Column('value', postgresql.JSONB(), nullable=True),
+        sa.Column('confidence', sa.Integer(), nullable=True),
+        sa.Column('source_text', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['variable_id'], ['variables.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('variable_id', 'content_hash', 'model'),
+    )
+    op.create_index(
+        'ix_llm_extraction_cache_created_at', 'llm_extraction_cache', ['created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_extraction_cache_created_at', table_name='llm_extraction_cache')
+    op.drop_table('llm_extraction_cache')
@@ -0,0 +1,36 @@
+"""Add a partial index for active prompt lookups.
+
+Revision ID: 20261016_prompt_active_idx
+Revises: 20260225_eta_jobs
+Create Date: 2026-10-16
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '20261016_prompt_active_idx'
+down_revision = '20260225_eta_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Matches the worker's DISTINCT ON (variable_id) ... ORDER BY
+    # variable_id, version DESC query over active prompts. Built
+    # concurrently so prompt writes are not blocked during the migration.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_prompts_active_variable_version',
+            'prompts',
+            ['variable_id', sa.text('version DESC')],
+            postgresql_where=sa.text('is_active = true'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_prompts_active_variable_version',
+            table_name='prompts',
+            postgresql_concurrently=True,
+        )
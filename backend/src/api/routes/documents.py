@@ -32,6 +32,7 @@ from src.services.document_processor import (
     parse_docx,
     parse_html,
     parse_pdf,
+    parse_pdfs_async,
     parse_txt,
 )
 
@@ -118,7 +119,11 @@ async def upload_document(
         from io import BytesIO
 
         file_obj = BytesIO(file_content)
-        extracted_text = parser(file_obj)
+        if content_type == ContentType.PDF:
+            # Parse in the worker process pool to keep the event loop free
+            extracted_text = (await parse_pdfs_async([file_obj]))[0]
+        else:
+            extracted_text = parser(file_obj)
     except DocumentProcessingError as e:
         # Create failed document record
         document = Document(
@@ -1,12 +1,15 @@
 """
 API routes for data export functionality.
 """
+import gzip
 import os
+import shutil
 import tempfile
 from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,10 +18,73 @@ from src.api.dependencies import get_current_user, get_db
 from src.models.project import Project
 from src.models.user import User
 from src.schemas.export import ExportConfig, ExportFormat, ExportResponse
-from src.services.export_service import ExportService
+from src.services.export_service import ExportService, write_chunks, write_excel
 
 router = APIRouter(tags=["exports"])
 
+# Text exports are served gzip-compressed to clients that accept it; xlsx
+# files are zip archives already
+GZIP_EXPORT_EXTENSIONS = (".csv", ".json")
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check whether an Accept-Encoding header allows a gzip response.
+
+    An explicit gzip entry decides; otherwise a "*" entry does. Entries
+    with q=0 (or an unreadable q) refuse the coding.
+
+    Args:
+        accept_encoding: Accept-Encoding header value
+
+    Returns:
+        True if gzip is acceptable
+    """
+    qualities = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in entry.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+
+    quality = qualities.get("gzip", qualities.get("*", 0.0))
+    return quality > 0
+
+
+def _gzip_copy(file_path: str) -> str:
+    """
+    Write a gzip-compressed copy of an export next to it, once.
+
+    Args:
+        file_path: Path of the export file
+
+    Returns:
+        Path of the compressed copy
+    """
+    gz_path = f"{file_path}.gz"
+    if os.path.exists(gz_path) and os.path.getmtime(gz_path) >= os.path.getmtime(file_path):
+        return gz_path
+
+    # Compress to a private temp file, so concurrent downloads never see
+    # a partial copy
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".gz.tmp")
+    try:
+        with open(file_path, "rb") as src, os.fdopen(fd, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp_path, gz_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return gz_path
+
 
 @router.post(
     "/api/v1/projects/{project_id}/export",
@@ -74,12 +140,8 @@ async def create_export(
             extension = "csv"
 
         elif export_config.format == ExportFormat.CSV_LONG:
-            file_content = await export_service.generate_csv_long(
-                project_id=project_id,
-                include_confidence=export_config.include_confidence,
-                include_source_text=export_config.include_source_text,
-                min_confidence=export_config.min_confidence,
-            )
+            # Streamed straight to disk below
+            file_content = None
             extension = "csv"
 
         elif export_config.format == ExportFormat.EXCEL:
@@ -101,14 +163,8 @@ async def create_export(
             extension = "json"
 
         elif export_config.format == ExportFormat.CODEBOOK:
-            import pandas as pd
-            from io import BytesIO
-
             df_codebook = await export_service.generate_codebook(project_id)
-            buf = BytesIO()
-            with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-                df_codebook.to_excel(writer, sheet_name="Codebook", index=False)
-            file_content = buf.getvalue()
+            file_content = write_excel({"Codebook": df_codebook})
             extension = "xlsx"
 
         else:
@@ -117,24 +173,34 @@ async def create_export(
                 detail=f"Unsupported export format: {export_config.format}",
             )
 
+        # Generate filename
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        filename = f"{project.name.replace(' ', '_')}_{timestamp}.{extension}"
+
+        # Save file temporarily
+        # In production, this should upload to S3 or similar storage
+        temp_dir = tempfile.gettempdir()
+        file_path = os.path.join(temp_dir, filename)
+
+        if file_content is None:
+            chunks = export_service.generate_csv_long_stream(
+                project_id=project_id,
+                include_confidence=export_config.include_confidence,
+                include_source_text=export_config.include_source_text,
+                min_confidence=export_config.min_confidence,
+            )
+            size_bytes = await write_chunks(file_path, chunks)
+        else:
+            with open(file_path, "wb") as f:
+                f.write(file_content)
+            size_bytes = len(file_content)
+
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
 
-    # Generate filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"{project.name.replace(' ', '_')}_{timestamp}.{extension}"
-
-    # Save file temporarily
-    # In production, this should upload to S3 or similar storage
-    temp_dir = tempfile.gettempdir()
-    file_path = os.path.join(temp_dir, filename)
-
-    with open(file_path, "wb") as f:
-        f.write(file_content)
-
     # Generate download URL
     # In production, this should be a signed URL to S3 or CDN
     download_url = f"/api/v1/exports/download/{filename}"
@@ -143,20 +209,23 @@ async def create_export(
         download_url=download_url,
         format=export_config.format,
         filename=filename,
-        size_bytes=len(file_content),
+        size_bytes=size_bytes,
     )
 
 
 @router.get("/api/v1/exports/download/{filename}")
-async def download_export(filename: str) -> FileResponse:
+async def download_export(filename: str, request: Request) -> FileResponse:
     """
     Download an export file.
 
+    CSV and JSON exports are sent gzip-compressed to clients that accept it.
+
     Note: This is a simple implementation for MVP. In production, use signed URLs
     to S3 or CDN with expiration and access control.
 
     Args:
         filename: Export filename
+        request: Incoming request (for Accept-Encoding)
 
     Returns:
         File response
@@ -184,8 +253,21 @@ async def download_export(filename: str) -> FileResponse:
     else:
         media_type = "application/octet-stream"
 
+    if not filename.endswith(GZIP_EXPORT_EXTENSIONS):
+        return FileResponse(
+            path=file_path,
+            filename=filename,
+            media_type=media_type,
+        )
+
+    headers = {"Vary": "Accept-Encoding"}
+    if _accepts_gzip(request.headers.get("Accept-Encoding", "")):
+        file_path = await run_in_threadpool(_gzip_copy, file_path)
+        headers["Content-Encoding"] = "gzip"
+
     return FileResponse(
         path=file_path,
         filename=filename,
         media_type=media_type,
+        headers=headers,
     )
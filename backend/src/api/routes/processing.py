@@ -443,18 +443,13 @@ async def create_feedback(
     if feedback_count >= 3:
         # Enqueue refinement job via ARQ
         try:
-            from arq.connections import create_pool
-            from src.workers.settings import parse_redis_url
-            from src.core.config import settings as app_settings
-
-            pool = await create_pool(parse_redis_url(app_settings.REDIS_URL))
-            try:
-                await pool.enqueue_job(
-                    "process_refinement_job",
-                    variable_id=str(extraction.variable_id),
-                )
-            finally:
-                await pool.close()
+            from src.core.redis import get_arq_pool
+
+            pool = await get_arq_pool()
+            await pool.enqueue_job(
+                "process_refinement_job",
+                variable_id=str(extraction.variable_id),
+            )
         except Exception:
             pass  # Non-critical — refinement can be triggered manually
 
@@ -952,17 +947,12 @@ async def trigger_refinement(
         )
 
     # Enqueue refinement job
-    from arq.connections import create_pool
-    from src.workers.settings import parse_redis_url
-    from src.core.config import settings as app_settings
+    from src.core.redis import get_arq_pool
 
-    pool = await create_pool(parse_redis_url(app_settings.REDIS_URL))
-    try:
-        await pool.enqueue_job(
-            "process_refinement_job",
-            variable_id=str(variable_id),
-        )
-    finally:
-        await pool.close()
+    pool = await get_arq_pool()
+    await pool.enqueue_job(
+        "process_refinement_job",
+        variable_id=str(variable_id),
+    )
 
     return {"status": "accepted", "message": f"Refinement job enqueued for variable {variable_id}"}
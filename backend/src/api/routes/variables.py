@@ -1,6 +1,7 @@
 """
 API routes for variable management (CRUD operations).
 """
+import json
 from typing import List
 from uuid import UUID
 
@@ -380,8 +381,11 @@ async def add_golden_example(
         )
 
     # Append to golden_examples list (create if missing)
+    # The value is also stored pre-serialized for the prompt's few-shot section
     existing = list(variable.golden_examples or [])
-    existing.append(example.model_dump())
+    record = example.model_dump()
+    record["value_json"] = json.dumps(record["value"])
+    existing.append(record)
     variable.golden_examples = existing
 
     # Regenerate prompt if the new example should appear in future extractions
@@ -102,6 +102,22 @@ class Settings(BaseSettings):
         default=3600,
         description="Job timeout in seconds (1 hour)"
     )
+    PDF_PARSE_WORKERS: int = Field(
+        default=2,
+        description="Max PDF parsing processes per app process (capped at the CPU count)"
+    )
+    EXTRACTION_BATCH_VARIABLES: bool = Field(
+        default=False,
+        description="Extract variables without a stored prompt in one LLM call per document"
+    )
+    EXTRACTION_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Reuse stored LLM results for text and variables extracted before"
+    )
+    EXTRACTION_CACHE_TTL_DAYS: int = Field(
+        default=30,
+        description="Days to keep stored LLM results before the daily purge deletes them"
+    )
     
     # LLM Retry Configuration
     LLM_RETRY_MAX_ATTEMPTS: int = Field(default=3, description="Max retry attempts for LLM calls")
@@ -113,6 +129,10 @@ class Settings(BaseSettings):
         default=10.0,
         description="Maximum delay in seconds for retries"
     )
+    LLM_USE_LANGCHAIN: bool = Field(
+        default=False,
+        description="Send LLMClient calls through LangChain's ChatOpenAI instead of the OpenAI SDK"
+    )
     
     # LLM Rate Limiting
     LLM_RATE_LIMIT_CALLS: int = Field(
@@ -123,6 +143,14 @@ class Settings(BaseSettings):
         default=60,
         description="Rate limit period in seconds"
     )
+    LLM_REQUESTS_PER_MINUTE: int = Field(
+        default=0,
+        description="Client-side LLM request budget per model (0 disables)"
+    )
+    LLM_TOKENS_PER_MINUTE: int = Field(
+        default=0,
+        description="Client-side LLM token budget per model (0 disables)"
+    )
 
     # OpenTelemetry
     OTEL_ENABLED: bool = Field(default=False, description="Enable OpenTelemetry tracing")
@@ -94,6 +94,16 @@ def _build_extraction_json(system: str, user: str) -> str:
 
     source = (user[:120]).replace("\n", " ") or "Found in document text."
 
+    # Batched extraction call → one entry per listed variable
+    if '"extractions"' in system:
+        names = re.findall(r"^- (\S+) \(", system, re.MULTILINE)
+        return json.dumps({
+            "extractions": {
+                name: {"value": "Mock extracted value", "confidence": 82, "source_text": source}
+                for name in names
+            }
+        })
+
     if "yyyy-mm-dd" in system or ("date" in system and "iso" in system):
         value = "2024-03-15"
     elif "boolean" in system or ("true" in system and "false" in system and "null" in system):
@@ -138,6 +148,10 @@ class MockChatOpenAI:
         logger.debug("[MockLLM] fake chat response")
         return _MockAIMessage(content)
 
+    async def astream(self, messages: list):
+        """Stream the fake response as a single chunk."""
+        yield await self.ainvoke(messages)
+
 
 def _build_chat_response(system: str, user: str) -> str:
     """Route to the right fake JSON or prose based on prompt intent."""
@@ -1,11 +1,13 @@
 """
 Token-bucket rate limiter using Redis INCR with TTL.
 
-Provides per-project rate limiting for LLM API calls.
+Provides per-project rate limiting for LLM API calls, and in-process
+per-model throttles that wait for capacity instead of raising.
 """
+import asyncio
 import logging
 import time
-from typing import Optional
+from typing import Dict, Optional
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
@@ -110,3 +112,96 @@ async def get_rate_limiter() -> RateLimiter:
             period_seconds=settings.LLM_RATE_LIMIT_PERIOD,
         )
     return _rate_limiter
+
+
+class AsyncTokenBucket:
+    """
+    In-process token bucket that waits for capacity instead of raising.
+
+    Tokens refill continuously at capacity / period_seconds. Waiters are
+    served in arrival order.
+    """
+
+    def __init__(self, capacity: float, period_seconds: float = 60.0):
+        """
+        Args:
+            capacity: Maximum tokens available per period
+            period_seconds: Refill period in seconds
+        """
+        self.capacity = capacity
+        self.rate = capacity / period_seconds
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """
+        Wait until `amount` tokens are available, then take them.
+
+        Requests larger than the bucket are capped at its capacity so they
+        cannot wait forever.
+        """
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class LLMThrottle:
+    """
+    Client-side request and token budget for one LLM model.
+
+    Calls wait here before reaching the provider, so concurrent extractions
+    stay under its per-minute limits instead of being rejected with 429s.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Args:
+            requests_per_minute: Request budget (0 disables)
+            tokens_per_minute: Token budget (0 disables)
+        """
+        self.requests = AsyncTokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = AsyncTokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """Wait for one request and `estimated_tokens` tokens of budget."""
+        if self.requests:
+            await self.requests.acquire()
+        if self.tokens:
+            await self.tokens.acquire(estimated_tokens)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+# Throttles shared by every client of the same model
+_llm_throttles: Dict[str, LLMThrottle] = {}
+
+
+def get_llm_throttle(model: str) -> Optional[LLMThrottle]:
+    """
+    Get the shared throttle for a model, or None if throttling is disabled.
+    """
+    from src.core.config import settings
+
+    if settings.LLM_REQUESTS_PER_MINUTE <= 0 and settings.LLM_TOKENS_PER_MINUTE <= 0:
+        return None
+
+    throttle = _llm_throttles.get(model)
+    if throttle is None:
+        throttle = _llm_throttles[model] = LLMThrottle(
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        )
+    return throttle
@@ -1,9 +1,12 @@
 """
 Redis connection manager for ARQ job queue and pub/sub.
 """
+import asyncio
 import logging
 from typing import Optional
 
+from arq import ArqRedis
+from arq.connections import create_pool
 from redis.asyncio import ConnectionPool, Redis
 
 from src.core.config import settings
@@ -12,6 +15,8 @@ logger = logging.getLogger(__name__)
 
 _pool: Optional[ConnectionPool] = None
 _redis: Optional[Redis] = None
+_arq_pool: Optional[ArqRedis] = None
+_arq_pool_lock = asyncio.Lock()
 
 
 async def get_redis() -> Redis:
@@ -45,3 +50,27 @@ async def close_redis() -> None:
         await _pool.disconnect()
         _pool = None
     logger.info("Redis connections closed")
+
+
+async def get_arq_pool() -> ArqRedis:
+    """Get the shared ARQ pool used to enqueue jobs.
+
+    Created on first use and reused afterwards, so enqueueing a job does not
+    pay for a new Redis connection handshake each time.
+    """
+    global _arq_pool
+    if _arq_pool is None:
+        async with _arq_pool_lock:
+            if _arq_pool is None:
+                from src.workers.settings import parse_redis_url
+                _arq_pool = await create_pool(parse_redis_url(settings.REDIS_URL))
+    return _arq_pool
+
+
+async def close_arq_pool() -> None:
+    """Close the shared ARQ pool."""
+    global _arq_pool
+    if _arq_pool is not None:
+        await _arq_pool.close()
+        _arq_pool = None
+        logger.info("ARQ pool closed")
@@ -149,6 +149,25 @@ async def set_rls_context(session: AsyncSession, user_id: UUID) -> None:
     )
 
 
+def bind_rls_context(session: AsyncSession, user_id: UUID) -> None:
+    """
+    Set the RLS context at the start of every transaction of a session.
+
+    SET LOCAL only lasts until commit, so sessions that commit and keep
+    working (e.g. refresh after commit) need it applied again each time.
+
+    Args:
+        session: Database session, before its first query
+        user_id: User whose rows the session may see
+    """
+    @event.listens_for(session.sync_session, "after_begin")
+    def _set_context(sync_session, transaction, connection):
+        connection.execute(
+            text("SET LOCAL app.current_user_id = :user_id"),
+            {"user_id": str(user_id)},
+        )
+
+
 async def clear_rls_context(session: AsyncSession) -> None:
     """Clear the RLS context (for worker/superuser bypass)."""
     await session.execute(text("RESET app.current_user_id"))
@@ -66,12 +66,17 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
-    from src.core.redis import close_redis
+    from src.core.redis import close_arq_pool, close_redis
     from src.core.database import close_db
     from src.core.job_subscriber import stop_subscriber
+    from src.services.document_processor import shutdown_pdf_pool
+    from src.services.llm_client import close_llm_http_client
     await stop_subscriber()
+    await close_arq_pool()
     await close_redis()
     await close_db()
+    await close_llm_http_client()
+    shutdown_pdf_pool()
     logger.info("Connections closed")
 
 
@@ -13,6 +13,7 @@ from src.models.processing_job import ProcessingJob
 from src.models.extraction import Extraction
 from src.models.extraction_feedback import ExtractionFeedback
 from src.models.processing_log import ProcessingLog
+from src.models.llm_extraction_cache import LLMExtractionCache
 
 __all__ = [
     "Base",
@@ -27,4 +28,5 @@ __all__ = [
     "Extraction",
     "ExtractionFeedback",
     "ProcessingLog",
+    "LLMExtractionCache",
 ]
@@ -0,0 +1,33 @@
+"""
+LLMExtractionCache model - a stored LLM answer for one text and variable.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from src.models.compat import JSONB, UUID
+
+from src.core.database import Base
+
+
+class LLMExtractionCache(Base):
+    """
+    LLMExtractionCache model.
+
+    Stores the raw LLM result for a (variable, text, model) combination, so
+    reprocessing the same text skips the LLM call. Rows belong to a
+    variable, so they are never shared between projects and are deleted
+    with it.
+    """
+    __tablename__ = "llm_extraction_cache"
+
+    variable_id = Column(UUID(as_uuid=True), ForeignKey("variables.id", ondelete="CASCADE"), primary_key=True)
+    content_hash = Column(String(32), primary_key=True, comment="BLAKE2b-128 of the extracted text")
+    model = Column(String(100), primary_key=True)
+    variable_hash = Column(String(32), nullable=False, comment="BLAKE2b-128 of the variable definition and prompt")
+    value = Column(JSONB, nullable=True)
+    confidence = Column(Integer, nullable=True)  # 0-100 scale
+    source_text = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self) -> str:
+        return f"<LLMExtractionCache(variable_id={self.variable_id}, content_hash={self.content_hash}, model={self.model})>"
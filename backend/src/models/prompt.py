@@ -4,7 +4,7 @@ Prompt model - represents a generated LLM prompt for a variable.
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Text
 from src.models.compat import JSONB, UUID
 from sqlalchemy.orm import relationship
 
@@ -28,6 +28,17 @@ class Prompt(Base):
     response_schema = Column(JSONB, nullable=True, comment="Expected JSON response schema")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
+    # Indexes
+    __table_args__ = (
+        # Serves the active highest-version prompt lookup per variable
+        Index(
+            "ix_prompts_active_variable_version",
+            variable_id,
+            version.desc(),
+            postgresql_where=is_active == True,
+        ),
+    )
+
     # Relationships
     variable = relationship("Variable", back_populates="prompts")
 
@@ -63,7 +63,7 @@ class Variable(Base):
     golden_examples = Column(
         JSONB,
         nullable=True,
-        comment="Few-shot examples: [{source_text, value, document_name, use_in_prompt}]",
+        comment="Few-shot examples: [{source_text, value, value_json, document_name, use_in_prompt}]",
     )
     order = Column(Integer, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
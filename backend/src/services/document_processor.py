@@ -2,13 +2,35 @@
 Document processing service for parsing PDF, DOCX, and TXT files.
 
 This service extracts text content from uploaded documents using PyMuPDF (for PDFs)
-and python-docx (for Word documents).
+and lxml (for Word documents and HTML).
 """
+import asyncio
 import io
-from typing import BinaryIO
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, List, Optional
 
 import fitz  # PyMuPDF
-from docx import Document as DocxDocument
+from lxml import etree
+
+from src.core.config import settings
+
+# WordprocessingML element tags used by parse_docx
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = f"{_W_NS}body"
+_W_P = f"{_W_NS}p"
+_W_T = f"{_W_NS}t"
+_W_TAB = f"{_W_NS}tab"
+_W_BR = f"{_W_NS}br"
+_W_CR = f"{_W_NS}cr"
+_W_TBL = f"{_W_NS}tbl"
+_W_TR = f"{_W_NS}tr"
+_W_TC = f"{_W_NS}tc"
+
+# Process pool for CPU-bound PDF parsing (created lazily)
+_pdf_pool: Optional[ProcessPoolExecutor] = None
 
 
 class DocumentProcessingError(Exception):
@@ -16,14 +38,14 @@ class DocumentProcessingError(Exception):
     pass
 
 
-def parse_pdf(file: BinaryIO) -> str:
+def _parse_pdf_bytes(file_content: bytes) -> str:
     """
-    Parse PDF file and extract text content.
+    Extract text content from raw PDF bytes.
 
-    Uses PyMuPDF (fitz) for fast and accurate text extraction with layout preservation.
+    Module-level so it can be dispatched to a worker process.
 
     Args:
-        file: Binary file object (PDF)
+        file_content: PDF file content
 
     Returns:
         Extracted text content
@@ -32,9 +54,6 @@ def parse_pdf(file: BinaryIO) -> str:
         DocumentProcessingError: If PDF parsing fails
     """
     try:
-        # Read file content
-        file_content = file.read()
-
         # Open PDF document
         pdf_document = fitz.open(stream=file_content, filetype="pdf")
 
@@ -60,17 +79,108 @@ def parse_pdf(file: BinaryIO) -> str:
 
         return full_text
 
+    except DocumentProcessingError:
+        raise
     except fitz.fitz.FileDataError as e:
         raise DocumentProcessingError(f"Invalid PDF file: {str(e)}")
     except Exception as e:
         raise DocumentProcessingError(f"Failed to parse PDF: {str(e)}")
 
 
+def parse_pdf(file: BinaryIO) -> str:
+    """
+    Parse PDF file and extract text content.
+
+    Uses PyMuPDF (fitz) for fast and accurate text extraction with layout preservation.
+
+    Args:
+        file: Binary file object (PDF)
+
+    Returns:
+        Extracted text content
+
+    Raises:
+        DocumentProcessingError: If PDF parsing fails
+    """
+    return _parse_pdf_bytes(file.read())
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared PDF parsing process pool, creating it on first use.
+
+    Every app process gets its own pool, so it is capped at
+    PDF_PARSE_WORKERS rather than sized to the whole machine.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        max_workers = max(1, min(os.cpu_count() or 1, settings.PDF_PARSE_WORKERS))
+        _pdf_pool = ProcessPoolExecutor(max_workers=max_workers)
+    return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """Shut down the PDF parsing process pool (call on application shutdown)."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+async def parse_pdfs_async(files: List[BinaryIO]) -> List[str]:
+    """
+    Parse several PDF files in parallel worker processes.
+
+    PyMuPDF holds the GIL while extracting, so parsing runs in a process pool,
+    one document per task. This also keeps the event loop responsive.
+
+    Args:
+        files: Binary file objects (PDF)
+
+    Returns:
+        Extracted text content, in the same order as files
+
+    Raises:
+        DocumentProcessingError: If any PDF fails to parse, or a parsing
+            process dies (e.g. killed on a malformed file)
+    """
+    global _pdf_pool
+    loop = asyncio.get_running_loop()
+    pool = _get_pdf_pool()
+    try:
+        return await asyncio.gather(*[
+            loop.run_in_executor(pool, _parse_pdf_bytes, file.read())
+            for file in files
+        ])
+    except BrokenProcessPool as e:
+        # A broken pool rejects all further work; drop it so the next
+        # upload starts a fresh one
+        if _pdf_pool is pool:
+            _pdf_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise DocumentProcessingError(f"PDF parsing process crashed: {e}") from e
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    """Join the text, tab and break runs of a <w:p> element in document order."""
+    parts = []
+    for node in paragraph.iter(_W_T, _W_TAB, _W_BR, _W_CR):
+        if node.tag == _W_T:
+            parts.append(node.text or "")
+        elif node.tag == _W_TAB:
+            parts.append("\t")
+        else:
+            parts.append("\n")
+    return "".join(parts)
+
+
 def parse_docx(file: BinaryIO) -> str:
     """
     Parse DOCX file and extract text content.
 
-    Uses python-docx to extract text from Word documents, preserving paragraph structure.
+    Reads word/document.xml straight from the OOXML zip and walks it once with
+    lxml, preserving paragraph structure. Body paragraphs come first, then
+    table rows with cells joined by " | ".
 
     Args:
         file: Binary file object (DOCX)
@@ -82,22 +192,32 @@ def parse_docx(file: BinaryIO) -> str:
         DocumentProcessingError: If DOCX parsing fails
     """
     try:
-        # Open DOCX document
-        doc = DocxDocument(file)
+        with zipfile.ZipFile(file) as archive:
+            document_xml = archive.read("word/document.xml")
 
-        # Extract text from all paragraphs
+        body = etree.fromstring(document_xml).find(_W_BODY)
+        if body is None:
+            raise DocumentProcessingError("DOCX contains no extractable text")
+
+        # Extract text from all top-level paragraphs
         paragraphs = []
-        for paragraph in doc.paragraphs:
-            text = paragraph.text.strip()
+        for paragraph in body.iterchildren(_W_P):
+            text = _docx_paragraph_text(paragraph).strip()
             if text:  # Skip empty paragraphs
                 paragraphs.append(text)
 
-        # Extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = " | ".join([cell.text.strip() for cell in row.cells])
-                if row_text:
-                    paragraphs.append(row_text)
+        # Extract text from top-level tables
+        for table in body.iterchildren(_W_TBL):
+            for row in table.iterchildren(_W_TR):
+                cells = [
+                    "\n".join(
+                        _docx_paragraph_text(p) for p in cell.iterchildren(_W_P)
+                    ).strip()
+                    for cell in row.iterchildren(_W_TC)
+                ]
+                # Skip rows whose cells are all empty
+                if any(cells):
+                    paragraphs.append(" | ".join(cells))
 
         # Combine all paragraphs
         full_text = "\n\n".join(paragraphs).strip()
@@ -107,6 +227,8 @@ def parse_docx(file: BinaryIO) -> str:
 
         return full_text
 
+    except DocumentProcessingError:
+        raise
     except Exception as e:
         raise DocumentProcessingError(f"Failed to parse DOCX: {str(e)}")
 
@@ -131,11 +253,8 @@ def parse_txt(file: BinaryIO) -> str:
         try:
             text = content.decode('utf-8')
         except UnicodeDecodeError:
-            # Fallback to latin-1 if UTF-8 fails
-            try:
-                text = content.decode('latin-1')
-            except UnicodeDecodeError:
-                raise DocumentProcessingError("Unable to decode text file (unsupported encoding)")
+            # Fallback to latin-1, which maps every byte and cannot fail
+            text = content.decode('latin-1')
 
         text = text.strip()
 
@@ -150,9 +269,38 @@ def parse_txt(file: BinaryIO) -> str:
         raise DocumentProcessingError(f"Failed to parse text file: {str(e)}")
 
 
+def _html_to_text_lxml(html_text: str) -> str:
+    """Extract visible text from HTML with lxml (libxml2) in a single pass."""
+    root = etree.fromstring(html_text, etree.HTMLParser())
+    if root is None:
+        return ""
+
+    # Drop non-visible content before walking text nodes
+    etree.strip_elements(root, etree.Comment, "script", "style", "head", with_tail=False)
+
+    return "\n".join(t.strip() for t in root.itertext() if t.strip())
+
+
+def _html_to_text_bs4(html_text: str) -> str:
+    """Extract visible text from HTML with BeautifulSoup (lenient fallback)."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_text, "html.parser")
+
+    # Remove script and style elements
+    for element in soup(["script", "style", "head"]):
+        element.decompose()
+
+    # Get text with newline separation
+    return soup.get_text(separator="\n", strip=True)
+
+
 def parse_html(file: BinaryIO) -> str:
     """
-    Parse HTML file and extract text content using BeautifulSoup.
+    Parse HTML file and extract text content.
+
+    Uses lxml for speed on large documents, falling back to BeautifulSoup
+    when lxml cannot handle the input.
 
     Args:
         file: Binary file object (HTML)
@@ -164,8 +312,6 @@ def parse_html(file: BinaryIO) -> str:
         DocumentProcessingError: If HTML parsing fails
     """
     try:
-        from bs4 import BeautifulSoup
-
         content = file.read()
 
         # Try UTF-8 first, then latin-1
@@ -174,14 +320,11 @@ def parse_html(file: BinaryIO) -> str:
         except UnicodeDecodeError:
             html_text = content.decode("latin-1")
 
-        soup = BeautifulSoup(html_text, "html.parser")
-
-        # Remove script and style elements
-        for element in soup(["script", "style", "head"]):
-            element.decompose()
-
-        # Get text with newline separation
-        text = soup.get_text(separator="\n", strip=True)
+        try:
+            text = _html_to_text_lxml(html_text)
+        except (ValueError, SyntaxError):
+            # Input lxml rejects (e.g. an XML encoding declaration)
+            text = _html_to_text_bs4(html_text)
 
         if not text:
             raise DocumentProcessingError("HTML contains no extractable text")
@@ -194,7 +337,11 @@ def parse_html(file: BinaryIO) -> str:
         raise DocumentProcessingError(f"Failed to parse HTML: {str(e)}")
 
 
-def chunk_text(text: str, max_words: int = 3000, overlap_words: int = 300) -> list[dict]:
+def chunk_text(
+    text: str,
+    max_words: int = 3000,
+    overlap_words: int = 300,
+) -> list[dict]:
     """
     Split text into overlapping chunks for processing large documents.
 
@@ -211,21 +358,19 @@ def chunk_text(text: str, max_words: int = 3000, overlap_words: int = 300) -> li
     if len(words) <= max_words:
         return [{"text": text, "token_count": len(words), "overlap_tokens": 0}]
 
-    chunks = []
-    start = 0
+    # Fixed-size windows advancing by max_words - overlap_words; the last
+    # window is the first one that reaches the end of the text
+    step = max_words - overlap_words
+    starts = range(0, len(words) - overlap_words, step)
 
-    while start < len(words):
-        end = min(start + max_words, len(words))
-        chunk_words = words[start:end]
-        overlap = overlap_words if start > 0 else 0
-        chunks.append({
-            "text": " ".join(chunk_words),
-            "token_count": len(chunk_words),
-            "overlap_tokens": overlap,
-        })
-        start = end - overlap_words if end < len(words) else end
-
-    return chunks
+    return [
+        {
+            "text": " ".join(words[start:start + max_words]),
+            "token_count": min(max_words, len(words) - start),
+            "overlap_tokens": overlap_words if start > 0 else 0,
+        }
+        for start in starts
+    ]
 
 
 async def create_chunks_for_document(db, document, min_word_count: int = 5000) -> int:
@@ -240,6 +385,8 @@ async def create_chunks_for_document(db, document, min_word_count: int = 5000) -
     Returns:
         Number of chunks created (0 if not chunked)
     """
+    from sqlalchemy import insert
+
     from src.models.document_chunk import DocumentChunk
 
     if not document.content or (document.word_count or 0) <= min_word_count:
@@ -249,15 +396,18 @@ async def create_chunks_for_document(db, document, min_word_count: int = 5000) -
     if len(chunks_data) <= 1:
         return 0
 
-    for i, chunk_data in enumerate(chunks_data):
-        chunk = DocumentChunk(
-            document_id=document.id,
-            chunk_index=i,
-            text=chunk_data["text"],
-            token_count=chunk_data["token_count"],
-            overlap_tokens=chunk_data["overlap_tokens"],
-        )
-        db.add(chunk)
+    # Single executemany INSERT instead of one ORM-tracked object per chunk
+    rows = [
+        {
+            "document_id": document.id,
+            "chunk_index": i,
+            "text": chunk_data["text"],
+            "token_count": chunk_data["token_count"],
+            "overlap_tokens": chunk_data["overlap_tokens"],
+        }
+        for i, chunk_data in enumerate(chunks_data)
+    ]
+    await db.execute(insert(DocumentChunk), rows)
 
     document.chunk_count = len(chunks_data)
     return len(chunks_data)
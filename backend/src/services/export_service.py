@@ -1,15 +1,22 @@
 """
 Export service for aggregating extractions and generating export files.
 """
+import csv
 import json
 import logging
-from io import BytesIO
-from typing import List, Optional
+import time
+from collections import OrderedDict
+from io import BytesIO, TextIOWrapper
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
 
+import numpy as np
+import orjson
 import pandas as pd
-from openpyxl import Workbook
-from sqlalchemy import func, select
+import xlsxwriter
+from sqlalchemy import (
+    Select, Text, and_, case, cast, func, literal_column, null, select, type_coerce,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.document import Document
@@ -19,6 +26,70 @@ from src.models.variable import Variable
 
 logger = logging.getLogger(__name__)
 
+# Recently collected export columns, keyed by project, export options and
+# data version, so requesting several formats in a row reads the rows once.
+# Only small exports are kept, and never more than EXPORT_CACHE_MAX_ROWS rows
+# in total, so large exports are not held in memory after they are written
+EXPORT_CACHE_SIZE = 8
+EXPORT_CACHE_TTL_SECONDS = 60.0
+EXPORT_CACHE_MAX_ROWS = 100_000
+EXPORT_CACHE_MAX_EXPORT_ROWS = 20_000
+_export_cache: "OrderedDict[tuple, Tuple[float, int, dict]]" = OrderedDict()
+
+
+def write_excel(sheets: Dict[str, pd.DataFrame]) -> bytes:
+    """
+    Write DataFrames to an Excel workbook, one sheet each.
+
+    Uses xlsxwriter in constant_memory mode, which flushes each row to disk
+    once the next row starts. Rows are therefore written strictly in order
+    with write_row (pandas' to_excel writes column by column, which
+    constant_memory does not support).
+
+    Args:
+        sheets: Mapping of sheet name to DataFrame, in sheet order
+
+    Returns:
+        Excel file content as bytes
+    """
+    excel_buffer = BytesIO()
+    workbook = xlsxwriter.Workbook(
+        excel_buffer,
+        {"constant_memory": True, "strings_to_urls": False},
+    )
+    header_format = workbook.add_format({"bold": True})
+
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+
+        # Missing values become blank cells, as with to_excel
+        cells = df.astype(object).where(df.notna(), None)
+        for row_idx, row in enumerate(cells.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row_idx, 0, row)
+
+    workbook.close()
+    return excel_buffer.getvalue()
+
+
+async def write_chunks(file_path: str, chunks: AsyncIterator[bytes]) -> int:
+    """
+    Write a streamed export to disk chunk by chunk.
+
+    Args:
+        file_path: Destination path
+        chunks: Async iterator of encoded file chunks
+
+    Returns:
+        Total number of bytes written
+    """
+    size_bytes = 0
+    with open(file_path, "wb") as f:
+        async for chunk in chunks:
+            f.write(chunk)
+            size_bytes += len(chunk)
+    return size_bytes
+
 
 class ExportService:
     """
@@ -34,119 +105,406 @@ class ExportService:
         """
         self.db = db
 
-    async def aggregate_extractions(
+    async def _check_exportable(self, project_id: UUID) -> None:
+        """
+        Check that a project exists and has variables and documents to export.
+
+        Args:
+            project_id: Project UUID
+
+        Raises:
+            ValueError: If project not found, or has no variables or documents
+        """
+        # Validate project, variables and documents in one round-trip,
+        # without loading any rows (documents carry their full content)
+        result = await self.db.execute(
+            select(
+                select(Variable.id)
+                .where(Variable.project_id == project_id)
+                .exists()
+                .label("has_variables"),
+                select(Document.id)
+                .where(Document.project_id == project_id)
+                .exists()
+                .label("has_documents"),
+            ).where(Project.id == project_id)
+        )
+        project = result.first()
+
+        if not project:
+            raise ValueError(f"Project with id {project_id} not found")
+
+        if not project.has_variables:
+            raise ValueError(f"No variables defined for project {project_id}")
+
+        if not project.has_documents:
+            raise ValueError(f"No documents found for project {project_id}")
+
+    async def _build_extractions_query(
         self,
         project_id: UUID,
         include_confidence: bool = False,
         include_source_text: bool = False,
         min_confidence: Optional[float] = None,
-    ) -> pd.DataFrame:
+    ) -> Select:
         """
-        Aggregate all extractions for a project into a pandas DataFrame.
+        Validate the project and build the extraction export query.
+
+        Optional columns are only selected when exported, so large
+        source_text excerpts are not transferred unless requested.
 
         Args:
             project_id: Project UUID
-            include_confidence: Include confidence scores
-            include_source_text: Include source text excerpts
+            include_confidence: Select confidence scores
+            include_source_text: Select source text excerpts
             min_confidence: Optional minimum confidence threshold
 
         Returns:
-            DataFrame with extractions
+            Select over the exported extraction columns
 
         Raises:
-            ValueError: If project not found
+            ValueError: If project not found, or has no variables or documents
         """
-        # Verify project exists
-        result = await self.db.execute(
-            select(Project).where(Project.id == project_id)
+        await self._check_exportable(project_id)
+
+        # Build query for extractions, selecting only the exported columns
+        value = Extraction.value
+        value_json = null()
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Let Postgres render object/array values as JSON text
+            is_container = func.jsonb_typeof(Extraction.value).in_(("object", "array"))
+            value = type_coerce(
+                case((is_container, null()), else_=Extraction.value),
+                Extraction.value.type,
+            )
+            value_json = case((is_container, cast(Extraction.value, Text)), else_=null())
+
+        selected = [
+            Document.id.label("document_id"),
+            Document.name.label("document_name"),
+            Variable.name.label("variable_name"),
+            value.label("value"),
+            value_json.label("value_json"),
+            Extraction.entity_index,
+            Extraction.entity_text,
+        ]
+        if include_confidence:
+            selected.append(Extraction.confidence)
+        if include_source_text:
+            selected.append(Extraction.source_text)
+
+        query = (
+            select(*selected)
+            .select_from(Extraction)
+            .join(Document, Extraction.document_id == Document.id)
+            .join(Variable, Extraction.variable_id == Variable.id)
+            .where(Document.project_id == project_id)
         )
-        project = result.scalar_one_or_none()
 
-        if not project:
-            raise ValueError(f"Project with id {project_id} not found")
+        # Apply confidence filter if provided
+        if min_confidence is not None:
+            query = query.where(Extraction.confidence >= min_confidence)
+
+        return query
 
-        # Get all variables for project
+    async def _has_entity_extractions(self, project_id: UUID) -> bool:
+        """Check whether any extraction in the project is entity-level."""
         result = await self.db.execute(
-            select(Variable)
-            .where(Variable.project_id == project_id)
-            .order_by(Variable.order)
+            select(Extraction.id)
+            .join(Document, Extraction.document_id == Document.id)
+            .where(
+                Document.project_id == project_id,
+                Extraction.entity_index.is_not(None),
+            )
+            .limit(1)
         )
-        variables = result.scalars().all()
+        return result.first() is not None
 
-        if not variables:
-            raise ValueError(f"No variables defined for project {project_id}")
+    async def _build_wide_query(
+        self,
+        project_id: UUID,
+        include_confidence: bool = False,
+        min_confidence: Optional[float] = None,
+    ) -> Tuple[Select, List[str]]:
+        """
+        Validate the project and build a query that pivots extractions in SQL.
+
+        Each variable becomes one conditional aggregate over its extractions,
+        grouped by document (and entity), so the database returns the wide
+        rows directly.
+
+        Args:
+            project_id: Project UUID
+            include_confidence: Add a "<variable>_confidence" column per variable
+            min_confidence: Optional minimum confidence threshold
+
+        Returns:
+            Tuple of (query, header), where header names the query's columns
+
+        Raises:
+            ValueError: If project not found, or has no variables or documents
+        """
+        await self._check_exportable(project_id)
 
-        # Get all documents for project
         result = await self.db.execute(
-            select(Document)
-            .where(Document.project_id == project_id)
-            .order_by(Document.uploaded_at)
+            select(Variable.id, Variable.name)
+            .where(Variable.project_id == project_id)
+            .order_by(Variable.order)
         )
-        documents = result.scalars().all()
-
-        if not documents:
-            raise ValueError(f"No documents found for project {project_id}")
+        variables = result.all()
+
+        postgres = self.db.get_bind().dialect.name == "postgresql"
+
+        def first_value(column, variable_id):
+            condition = and_(Extraction.variable_id == variable_id, column.is_not(None))
+            if postgres:
+                # Postgres has no max() for JSON; take the first value instead
+                return func.array_agg(column).filter(condition)[1]
+            return type_coerce(func.max(column).filter(condition), column.type)
+
+        header = ["document_id", "document_name"]
+        keys = [Document.id, Document.name]
+        order = [Document.uploaded_at, Document.id]
+        if await self._has_entity_extractions(project_id):
+            header.extend(["entity_index", "entity_text"])
+            # Inline '' so the grouped and selected expressions render identically
+            entity_text = func.coalesce(Extraction.entity_text, literal_column("''"))
+            keys.extend([Extraction.entity_index, entity_text])
+            order.append(Extraction.entity_index.nulls_first())
+
+        header.extend(variable.name for variable in variables)
+        aggregates = [first_value(Extraction.value, variable.id) for variable in variables]
+        if include_confidence:
+            header.extend(f"{variable.name}_confidence" for variable in variables)
+            aggregates.extend(
+                first_value(Extraction.confidence, variable.id) for variable in variables
+            )
 
-        # Build query for extractions
         query = (
-            select(Extraction, Document, Variable)
+            select(*keys, *aggregates)
+            .select_from(Extraction)
             .join(Document, Extraction.document_id == Document.id)
-            .join(Variable, Extraction.variable_id == Variable.id)
             .where(Document.project_id == project_id)
+            .group_by(*keys, Document.uploaded_at)
+            .order_by(*order)
         )
 
         # Apply confidence filter if provided
         if min_confidence is not None:
             query = query.where(Extraction.confidence >= min_confidence)
 
-        # Execute query
-        result = await self.db.execute(query)
-        rows = result.all()
-
-        # Build data for DataFrame
-        data = []
-        for extraction, document, variable in rows:
-            # Handle JSONB values: serialize complex types to string for export
-            value = extraction.value
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value, default=str)
-
-            row = {
-                "document_id": str(document.id),
-                "document_name": document.name,
-                "variable_name": variable.name,
-                "value": value,
-            }
+        return query, header
+
+    @staticmethod
+    def _new_columns(include_confidence: bool, include_source_text: bool) -> dict:
+        """Create empty per-column lists for long-format export data."""
+        columns = {
+            "document_id": [],
+            "document_name": [],
+            "variable_name": [],
+            "value": [],
+            "entity_index": [],
+            "entity_text": [],
+        }
+        if include_confidence:
+            columns["confidence"] = []
+        if include_source_text:
+            columns["source_text"] = []
+        return columns
+
+    @staticmethod
+    def _append_rows(columns: dict, rows) -> None:
+        """
+        Append extraction query rows to per-column lists.
+
+        Args:
+            columns: Column lists from _new_columns
+            rows: Iterable of rows from _build_extractions_query
+        """
+        # Bind the list appends once; this loop runs for every exported row
+        append_document_id = columns["document_id"].append
+        append_document_name = columns["document_name"].append
+        append_variable_name = columns["variable_name"].append
+        append_value = columns["value"].append
+        append_entity_index = columns["entity_index"].append
+        append_entity_text = columns["entity_text"].append
+        append_confidence = columns["confidence"].append if "confidence" in columns else None
+        append_source_text = columns["source_text"].append if "source_text" in columns else None
+
+        for row in rows:
+            # JSONB objects/arrays arrive pre-serialized on PostgreSQL;
+            # other backends serialize complex types here
+            value = row.value_json
+            if value is None:
+                value = row.value
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value, default=str)
+
+            append_document_id(str(row.document_id))
+            append_document_name(row.document_name)
+            append_variable_name(row.variable_name)
+            append_value(value)
+
+            # Entity info is only set for entity-level extractions
+            if row.entity_index is not None:
+                append_entity_index(row.entity_index)
+                append_entity_text(row.entity_text or "")
+            else:
+                append_entity_index(None)
+                append_entity_text(None)
+
+            if append_confidence is not None:
+                append_confidence(row.confidence)
+
+            if append_source_text is not None:
+                append_source_text(row.source_text)
+
+    async def _data_version(self, project_id: UUID) -> tuple:
+        """
+        Summarize the project's exportable data for cache invalidation.
+
+        Extractions are only ever inserted or deleted, so their count and
+        latest creation time change whenever the exported rows do; variable
+        renames are caught by the latest variable update time.
+        """
+        project_variables = Variable.project_id == project_id
+        result = await self.db.execute(
+            select(
+                func.count(Extraction.id),
+                func.max(Extraction.created_at),
+                select(func.count(Variable.id)).where(project_variables).scalar_subquery(),
+                select(func.max(Variable.updated_at)).where(project_variables).scalar_subquery(),
+            )
+            .select_from(Extraction)
+            .join(Document, Extraction.document_id == Document.id)
+            .where(Document.project_id == project_id)
+        )
+        return tuple(result.one())
+
+    async def _collect_columns(
+        self,
+        project_id: UUID,
+        include_confidence: bool,
+        include_source_text: bool,
+        min_confidence: Optional[float],
+    ) -> dict:
+        """
+        Load all exported extractions for a project into per-column lists.
+
+        Results of up to EXPORT_CACHE_MAX_EXPORT_ROWS extractions are cached
+        briefly per data version; callers must not modify the returned lists.
+
+        Raises:
+            ValueError: If project not found
+        """
+        data_version = await self._data_version(project_id)
+        if data_version[0] > EXPORT_CACHE_MAX_EXPORT_ROWS:
+            return await self._load_columns(
+                project_id, include_confidence, include_source_text, min_confidence
+            )
+
+        key = (project_id, include_confidence, include_source_text, min_confidence, data_version)
+        now = time.monotonic()
+        cached = _export_cache.get(key)
+        if cached is not None and now - cached[0] < EXPORT_CACHE_TTL_SECONDS:
+            _export_cache.move_to_end(key)
+            return cached[2]
+
+        columns = await self._load_columns(
+            project_id, include_confidence, include_source_text, min_confidence
+        )
+
+        # Drop expired entries, then the least recently used ones until the
+        # cache is within its entry and row limits
+        expired = [k for k, entry in _export_cache.items() if now - entry[0] >= EXPORT_CACHE_TTL_SECONDS]
+        for expired_key in expired:
+            del _export_cache[expired_key]
+        _export_cache[key] = (now, len(columns["value"]), columns)
+        total_rows = sum(rows for _, rows, _ in _export_cache.values())
+        while len(_export_cache) > EXPORT_CACHE_SIZE or total_rows > EXPORT_CACHE_MAX_ROWS:
+            _, (_, rows, _) = _export_cache.popitem(last=False)
+            total_rows -= rows
+
+        return columns
+
+    async def _load_columns(
+        self,
+        project_id: UUID,
+        include_confidence: bool,
+        include_source_text: bool,
+        min_confidence: Optional[float],
+    ) -> dict:
+        """Stream the project's exported extractions into per-column lists."""
+        query = await self._build_extractions_query(
+            project_id, include_confidence, include_source_text, min_confidence
+        )
+
+        # Stream rows through a server-side cursor into per-column lists
+        columns = self._new_columns(include_confidence, include_source_text)
+        result = await self.db.stream(query.execution_options(yield_per=5000))
+        async for partition in result.partitions():
+            self._append_rows(columns, partition)
 
-            # Include entity info if present
-            if extraction.entity_index is not None:
-                row["entity_index"] = extraction.entity_index
-                row["entity_text"] = extraction.entity_text or ""
+        # Only keep entity columns if any extraction is entity-level
+        if all(index is None for index in columns["entity_index"]):
+            del columns["entity_index"]
+            del columns["entity_text"]
+
+        return columns
+
+    async def aggregate_extractions(
+        self,
+        project_id: UUID,
+        include_confidence: bool = False,
+        include_source_text: bool = False,
+        min_confidence: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        Aggregate all extractions for a project into a pandas DataFrame.
 
-            if include_confidence:
-                row["confidence"] = extraction.confidence
+        Args:
+            project_id: Project UUID
+            include_confidence: Include confidence scores
+            include_source_text: Include source text excerpts
+            min_confidence: Optional minimum confidence threshold
 
-            if include_source_text:
-                row["source_text"] = extraction.source_text
+        Returns:
+            DataFrame with extractions
 
-            data.append(row)
+        Raises:
+            ValueError: If project not found
+        """
+        columns = await self._collect_columns(
+            project_id, include_confidence, include_source_text, min_confidence
+        )
 
-        # Create DataFrame
-        df = pd.DataFrame(data)
+        # Create DataFrame directly from the column lists. Document fields
+        # repeat once per variable and variable names once per document, so
+        # they are stored as categoricals rather than object strings. Entity
+        # text likewise repeats once per variable extracted for the entity.
+        categorical = ["document_id", "document_name", "variable_name"]
+        if "entity_text" in columns:
+            categorical.append("entity_text")
+        df = pd.DataFrame(columns, copy=False).astype(
+            dict.fromkeys(categorical, "category")
+        )
 
         logger.info(f"Aggregated {len(df)} extractions for project {project_id}")
 
         return df
 
-    async def generate_csv_wide(
+    async def _aggregate_records(
         self,
         project_id: UUID,
         include_confidence: bool = False,
         include_source_text: bool = False,
         min_confidence: Optional[float] = None,
-    ) -> bytes:
+    ) -> List[dict]:
         """
-        Generate CSV export in wide format (1 row per document, columns = variables).
+        Aggregate all extractions for a project into a list of records.
+
+        Same columns as aggregate_extractions, built straight from the
+        query rows for callers that don't need a DataFrame.
 
         Args:
             project_id: Project UUID
@@ -155,97 +513,232 @@ class ExportService:
             min_confidence: Optional minimum confidence threshold
 
         Returns:
-            CSV file content as bytes
+            One dict per extraction
+
+        Raises:
+            ValueError: If project not found
         """
-        # Get aggregated data
-        df = await self.aggregate_extractions(
-            project_id=project_id,
-            include_confidence=include_confidence,
-            include_source_text=include_source_text,
-            min_confidence=min_confidence,
+        columns = await self._collect_columns(
+            project_id, include_confidence, include_source_text, min_confidence
         )
+        keys = list(columns)
+        records = [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+        logger.info(f"Aggregated {len(records)} extractions for project {project_id}")
+
+        return records
+
+    @staticmethod
+    def _pivot_wide(df: pd.DataFrame, include_confidence: bool) -> pd.DataFrame:
+        """
+        Pivot long-format extractions to wide format (1 row per document/entity).
+
+        Each long row is numbered by its output row and variable column, and
+        values are scattered straight into a preallocated grid, so there is
+        no group-by over (row, variable) pairs, unstack or join. Rows and
+        variable columns keep their order of first appearance. Duplicate
+        (document, variable) pairs keep their first non-null value.
 
-        # Pivot to wide format
+        Args:
+            df: Long-format DataFrame from aggregate_extractions
+            include_confidence: Add a "<variable>_confidence" column per variable
+
+        Returns:
+            Wide-format DataFrame with the index columns first
+        """
         # Determine index columns based on whether entity data is present
         has_entities = "entity_index" in df.columns and df["entity_index"].notna().any()
         index_cols = ["document_id", "document_name"]
         if has_entities:
             index_cols.extend(["entity_index", "entity_text"])
 
+        row_codes = (
+            df.groupby(index_cols, sort=False, dropna=False, observed=True)
+            .ngroup()
+            .to_numpy()
+        )
+        var_codes, variables = pd.factorize(df["variable_name"])
+        n_rows = int(row_codes.max(initial=-1)) + 1
+        n_vars = len(variables)
+
+        # Key columns come from the first long row of each output row; a
+        # document's entity rows are kept together after its first row
+        first_rows = np.flatnonzero(~pd.Series(row_codes).duplicated().to_numpy())
+        doc_codes = pd.factorize(df["document_id"])[0]
+        first_rows = first_rows[np.argsort(doc_codes[first_rows], kind="stable")]
+        positions = np.empty(n_rows, dtype=np.int64)
+        positions[row_codes[first_rows]] = np.arange(n_rows)
+        cells = positions[row_codes] * n_vars + var_codes
+
+        wide_df = df[index_cols].iloc[first_rows].reset_index(drop=True)
+
+        def scatter(values: np.ndarray, dtype) -> np.ndarray:
+            present = pd.notna(values)
+            first = present & ~pd.Series(np.where(present, cells, -1)).duplicated().to_numpy()
+            grid = np.full(n_rows * n_vars, np.nan, dtype=dtype)
+            grid[cells[first]] = values[first]
+            return grid.reshape(n_rows, n_vars)
+
+        names = [str(variable) for variable in variables]
+        parts = [
+            wide_df,
+            pd.DataFrame(scatter(df["value"].to_numpy(), object), columns=names),
+        ]
         if include_confidence:
-            # Create separate columns for value and confidence
-            pivot_value = df.pivot(
-                index=index_cols,
-                columns="variable_name",
-                values="value"
-            )
+            confidence = df["confidence"].to_numpy(dtype=float, na_value=np.nan)
+            parts.append(pd.DataFrame(
+                scatter(confidence, float),
+                columns=[f"{name}_confidence" for name in names],
+            ))
 
-            pivot_confidence = df.pivot(
-                index=index_cols,
-                columns="variable_name",
-                values="confidence"
-            )
+        return pd.concat(parts, axis=1)
 
-            # Rename confidence columns
-            pivot_confidence.columns = [f"{col}_confidence" for col in pivot_confidence.columns]
-
-            # Merge value and confidence pivots
-            wide_df = pivot_value.join(pivot_confidence)
-        else:
-            # Simple pivot with just values
-            wide_df = df.pivot(
-                index=index_cols,
-                columns="variable_name",
-                values="value"
-            )
+    async def generate_csv_wide(
+        self,
+        project_id: UUID,
+        include_confidence: bool = False,
+        include_source_text: bool = False,
+        min_confidence: Optional[float] = None,
+    ) -> bytes:
+        """
+        Generate CSV export in wide format (1 row per document, columns = variables).
 
-        # Reset index to make document_id and document_name regular columns
-        wide_df = wide_df.reset_index()
+        Args:
+            project_id: Project UUID
+            include_confidence: Include confidence scores
+            include_source_text: Include source text excerpts
+            min_confidence: Optional minimum confidence threshold
+
+        Returns:
+            CSV file content as bytes
+        """
+        query, header = await self._build_wide_query(
+            project_id, include_confidence, min_confidence
+        )
 
-        # Convert to CSV
         csv_buffer = BytesIO()
-        wide_df.to_csv(csv_buffer, index=False)
+        text_buffer = TextIOWrapper(csv_buffer, encoding="utf-8", newline="", write_through=True)
+        writer = csv.writer(text_buffer, lineterminator="\n")
+        writer.writerow(header)
+        row_count = 0
+
+        result = await self.db.stream(query.execution_options(yield_per=5000))
+        async for partition in result.partitions():
+            writer.writerows(
+                [
+                    json.dumps(cell, default=str) if isinstance(cell, (dict, list)) else cell
+                    for cell in row
+                ]
+                for row in partition
+            )
+            row_count += len(partition)
+
+        text_buffer.detach()
         csv_bytes = csv_buffer.getvalue()
 
-        logger.info(f"Generated wide CSV with {len(wide_df)} rows")
+        logger.info(f"Generated wide CSV with {row_count} rows")
 
         return csv_bytes
 
-    async def generate_csv_long(
+    async def generate_csv_long_stream(
         self,
         project_id: UUID,
         include_confidence: bool = False,
         include_source_text: bool = False,
         min_confidence: Optional[float] = None,
-    ) -> bytes:
+        batch_size: int = 5000,
+    ) -> AsyncIterator[bytes]:
         """
-        Generate CSV export in long format (1 row per extraction).
+        Generate CSV export in long format as a stream of encoded chunks.
+
+        Rows are fetched with a server-side cursor and formatted one batch at a
+        time, so peak memory is bounded by batch_size rather than export size.
 
         Args:
             project_id: Project UUID
             include_confidence: Include confidence scores
             include_source_text: Include source text excerpts
             min_confidence: Optional minimum confidence threshold
+            batch_size: Number of rows formatted per chunk
 
-        Returns:
-            CSV file content as bytes
+        Yields:
+            CSV content chunks as bytes (the first chunk carries the header)
+
+        Raises:
+            ValueError: If project not found
         """
-        # Get aggregated data (already in long format)
-        df = await self.aggregate_extractions(
-            project_id=project_id,
-            include_confidence=include_confidence,
-            include_source_text=include_source_text,
-            min_confidence=min_confidence,
+        query = await self._build_extractions_query(
+            project_id, include_confidence, include_source_text, min_confidence
         )
 
-        # Convert to CSV
+        # Columns must be fixed up front since batches are written independently
+        columns = ["document_id", "document_name", "variable_name", "value"]
+        if await self._has_entity_extractions(project_id):
+            columns.extend(["entity_index", "entity_text"])
+        if include_confidence:
+            columns.append("confidence")
+        if include_source_text:
+            columns.append("source_text")
+
+        # Rows go straight from each batch to csv.writer, without a DataFrame.
+        # One buffer is reused for every batch. It is rewound rather than
+        # truncated, since truncate() releases the allocation and each batch
+        # would then regrow it from empty; only the bytes written for the
+        # current batch are read back.
         csv_buffer = BytesIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_bytes = csv_buffer.getvalue()
+        text_buffer = TextIOWrapper(csv_buffer, encoding="utf-8", newline="", write_through=True)
+        writer = csv.writer(text_buffer, lineterminator="\n")
+        writer.writerow(columns)
+        row_count = 0
+
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            batch = self._new_columns(include_confidence, include_source_text)
+            self._append_rows(batch, partition)
+            writer.writerows(zip(*(batch[column] for column in columns)))
+            row_count += len(partition)
+
+            size = csv_buffer.tell()
+            csv_buffer.seek(0)
+            yield csv_buffer.read(size)
+            csv_buffer.seek(0)
+
+        if row_count == 0:
+            # No extractions: emit the header row on its own
+            yield csv_buffer.getvalue()
+
+        text_buffer.detach()
+        logger.info(f"Generated long CSV with {row_count} rows")
 
-        logger.info(f"Generated long CSV with {len(df)} rows")
+    async def generate_csv_long(
+        self,
+        project_id: UUID,
+        include_confidence: bool = False,
+        include_source_text: bool = False,
+        min_confidence: Optional[float] = None,
+    ) -> bytes:
+        """
+        Generate CSV export in long format (1 row per extraction).
 
-        return csv_bytes
+        Args:
+            project_id: Project UUID
+            include_confidence: Include confidence scores
+            include_source_text: Include source text excerpts
+            min_confidence: Optional minimum confidence threshold
+
+        Returns:
+            CSV file content as bytes
+        """
+        chunks = [
+            chunk
+            async for chunk in self.generate_csv_long_stream(
+                project_id=project_id,
+                include_confidence=include_confidence,
+                include_source_text=include_source_text,
+                min_confidence=min_confidence,
+            )
+        ]
+        return b"".join(chunks)
 
     async def generate_excel(
         self,
@@ -255,7 +748,7 @@ class ExportService:
         min_confidence: Optional[float] = None,
     ) -> bytes:
         """
-        Generate Excel export using openpyxl.
+        Generate Excel export using xlsxwriter.
 
         Creates two sheets: one in wide format, one in long format.
 
@@ -277,29 +770,7 @@ class ExportService:
         )
 
         # Pivot to wide format (same logic as CSV wide)
-        index_cols = ["document_id", "document_name"]
-
-        if include_confidence:
-            pivot_value = df_long.pivot(
-                index=index_cols,
-                columns="variable_name",
-                values="value"
-            )
-
-            pivot_confidence = df_long.pivot(
-                index=index_cols,
-                columns="variable_name",
-                values="confidence"
-            )
-
-            pivot_confidence.columns = [f"{col}_confidence" for col in pivot_confidence.columns]
-            df_wide = pivot_value.join(pivot_confidence).reset_index()
-        else:
-            df_wide = df_long.pivot(
-                index=index_cols,
-                columns="variable_name",
-                values="value"
-            ).reset_index()
+        df_wide = self._pivot_wide(df_long, include_confidence)
 
         # Generate codebook
         try:
@@ -308,14 +779,11 @@ class ExportService:
             df_codebook = pd.DataFrame()
 
         # Create Excel file with three sheets
-        excel_buffer = BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df_wide.to_excel(writer, sheet_name='Wide Format', index=False)
-            df_long.to_excel(writer, sheet_name='Long Format', index=False)
-            if not df_codebook.empty:
-                df_codebook.to_excel(writer, sheet_name='Codebook', index=False)
+        sheets = {"Wide Format": df_wide, "Long Format": df_long}
+        if not df_codebook.empty:
+            sheets["Codebook"] = df_codebook
 
-        excel_bytes = excel_buffer.getvalue()
+        excel_bytes = write_excel(sheets)
 
         logger.info(f"Generated Excel with {len(df_wide)} wide rows, {len(df_long)} long rows, codebook")
 
@@ -413,19 +881,15 @@ class ExportService:
         Returns:
             JSON file content as bytes
         """
-        # Get aggregated data
-        df = await self.aggregate_extractions(
+        # Records come straight from the query rows; no DataFrame needed
+        json_data = await self._aggregate_records(
             project_id=project_id,
             include_confidence=include_confidence,
             include_source_text=include_source_text,
             min_confidence=min_confidence,
         )
 
-        # Convert to JSON (list of records)
-        json_data = df.to_dict(orient='records')
-
-        # Serialize to JSON bytes
-        json_bytes = json.dumps(json_data, indent=2, default=str).encode('utf-8')
+        json_bytes = orjson.dumps(json_data, default=str, option=orjson.OPT_INDENT_2)
 
         logger.info(f"Generated JSON with {len(json_data)} records")
 
@@ -0,0 +1,170 @@
+"""
+Durable cache of LLM extraction results.
+
+Results are keyed by the variable, a hash of the extracted text and the
+model name. Reprocessing a document whose text and variable definitions are
+unchanged, such as resuming a failed job or rerunning a project, reuses the
+stored result instead of calling the LLM again. Each row also records a hash
+of everything the LLM was told about the variable; editing the variable or
+its prompt changes that hash, so stale results are never served and are
+replaced on the next store. Rows older than EXTRACTION_CACHE_TTL_DAYS are
+removed by purge_cached_extractions.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.llm_extraction_cache import LLMExtractionCache
+from src.models.variable import Variable
+
+# Dialect inserts that support ON CONFLICT DO NOTHING
+_CONFLICT_IGNORING_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash the text sent to the LLM.
+
+    Args:
+        text: Document or chunk text
+
+    Returns:
+        32-character hex digest
+    """
+    return _digest(text.encode())
+
+
+def variable_hash(variable: Variable, prompt_text: Optional[str] = None) -> str:
+    """
+    Hash the parts of a variable that shape its extraction prompt.
+
+    Args:
+        variable: Variable to extract
+        prompt_text: Active stored prompt for the variable, if any
+
+    Returns:
+        32-character hex digest
+    """
+    definition = [
+        variable.name,
+        variable.type.value,
+        variable.instructions,
+        variable.classification_rules,
+        prompt_text,
+    ]
+    return _digest(json.dumps(definition, sort_keys=True, default=str).encode())
+
+
+async def load_cached_extractions(
+    db: AsyncSession,
+    content_hashes: Iterable[str],
+    variable_hashes: Mapping[UUID, str],
+    model: str,
+) -> Dict[Tuple[str, UUID], Dict[str, Any]]:
+    """
+    Load stored results for any combination of the given texts and variables.
+
+    Args:
+        db: Database session
+        content_hashes: Hashes of the texts to extract from
+        variable_hashes: Mapping of variable ID -> current variable_hash;
+            results stored for another definition are skipped
+        model: Model name the results must come from
+
+    Returns:
+        Mapping of (content_hash, variable_id) -> result dict with
+        value, confidence and source_text
+    """
+    result = await db.execute(
+        select(
+            LLMExtractionCache.content_hash,
+            LLMExtractionCache.variable_id,
+            LLMExtractionCache.variable_hash,
+            LLMExtractionCache.value,
+            LLMExtractionCache.confidence,
+            LLMExtractionCache.source_text,
+        ).where(
+            LLMExtractionCache.variable_id.in_(set(variable_hashes)),
+            LLMExtractionCache.content_hash.in_(set(content_hashes)),
+            LLMExtractionCache.model == model,
+        )
+    )
+    return {
+        (row.content_hash, row.variable_id): {
+            "value": row.value,
+            "confidence": row.confidence,
+            "source_text": row.source_text,
+        }
+        for row in result.all()
+        if row.variable_hash == variable_hashes[row.variable_id]
+    }
+
+
+async def store_cached_extractions(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    Store LLM results, replacing stored results only if they are stale.
+
+    A result already stored for the same variable, text and model is kept
+    unless it was produced for an older variable definition.
+
+    Args:
+        db: Database session; the caller commits
+        rows: Dicts with variable_id, content_hash, model, variable_hash,
+            value, confidence and source_text
+    """
+    if not rows:
+        return
+
+    dialect_insert = _CONFLICT_IGNORING_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        # Concurrent writers may race on the same key; without ON CONFLICT
+        # the losing insert fails, which callers treat as a cache miss
+        await db.execute(insert(LLMExtractionCache), rows)
+        return
+
+    stmt = dialect_insert(LLMExtractionCache)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["variable_id", "content_hash", "model"],
+            set_={
+                "variable_hash": stmt.excluded.variable_hash,
+                "value": stmt.excluded.value,
+                "confidence": stmt.excluded.confidence,
+                "source_text": stmt.excluded.source_text,
+                "created_at": stmt.excluded.created_at,
+            },
+            where=LLMExtractionCache.variable_hash != stmt.excluded.variable_hash,
+        ),
+        rows,
+    )
+
+
+async def purge_cached_extractions(db: AsyncSession, max_age_days: int) -> int:
+    """
+    Delete stored results older than max_age_days.
+
+    Args:
+        db: Database session; the caller commits
+        max_age_days: Age in days after which results are deleted
+
+    Returns:
+        Number of deleted rows
+    """
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    result = await db.execute(
+        delete(LLMExtractionCache).where(LLMExtractionCache.created_at < cutoff)
+    )
+    return result.rowcount
@@ -3,14 +3,19 @@ FeedbackAnalyzer service for analyzing user feedback and refining prompts.
 
 This service identifies patterns in user corrections to improve extraction quality.
 """
+import asyncio
+import functools
 import logging
+import re
 from collections import defaultdict
+from types import MappingProxyType
 from typing import Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.core.rls import bind_rls_context
 from src.models.extraction import Extraction
 from src.models.extraction_feedback import ExtractionFeedback, FeedbackType
 from src.models.prompt import Prompt
@@ -18,6 +23,56 @@ from src.models.variable import Variable
 
 logger = logging.getLogger(__name__)
 
+# Comment keywords mapped to the issue they indicate
+_ISSUE_KEYWORDS = {
+    'missing': 'extraction misses information',
+    'wrong': 'extraction returns incorrect value',
+    'format': 'extraction has formatting issues',
+    'null': 'extraction returns null when value exists',
+    'hallucination': 'extraction hallucinates non-existent information'
+}
+
+# Finds every keyword occurrence in a single scan; the lookahead lets
+# overlapping keywords match at the same position
+_ISSUE_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in _ISSUE_KEYWORDS) + "))"
+)
+
+
+# Prompt refinement text for each issue, in the order it is applied
+_REFINEMENT_SUGGESTIONS = MappingProxyType({
+    'extraction misses information': (
+        "Be more thorough when searching for the information. "
+        "Check the entire document, including headers, footers, and tables."
+    ),
+    'extraction returns incorrect value': (
+        "Pay closer attention to the specific field being requested. "
+        "Ensure the extracted value matches the exact criteria."
+    ),
+    'extraction has formatting issues': (
+        "Return the value in the exact format requested. "
+        "Do not add extra formatting or modify the original format."
+    ),
+    'extraction returns null when value exists': (
+        "Search more carefully - the value may be in a different format "
+        "or location than expected."
+    ),
+    'extraction hallucinates non-existent information': (
+        "CRITICAL: Only extract information that explicitly appears in the document. "
+        "Never infer or guess. If unsure, return null."
+    ),
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _join_suggestions(issues: frozenset) -> str:
+    """Join the refinement suggestions for a set of issues (at most 32 sets)."""
+    return "\n\n".join(
+        suggestion
+        for issue, suggestion in _REFINEMENT_SUGGESTIONS.items()
+        if issue in issues
+    )
+
 
 class FeedbackPattern:
     """
@@ -28,18 +83,21 @@ class FeedbackPattern:
         error_count: Number of incorrect extractions
         common_issues: List of common issues identified
         suggested_refinement: Suggested prompt refinement
+        current_prompt: Latest prompt the refinement applies to
     """
     def __init__(
         self,
         variable_id: UUID,
         error_count: int,
         common_issues: List[str],
-        suggested_refinement: Optional[str] = None
+        suggested_refinement: Optional[str] = None,
+        current_prompt: Optional[Prompt] = None
     ):
         self.variable_id = variable_id
         self.error_count = error_count
         self.common_issues = common_issues
         self.suggested_refinement = suggested_refinement
+        self.current_prompt = current_prompt
 
 
 class FeedbackAnalyzer:
@@ -59,62 +117,115 @@ class FeedbackAnalyzer:
     async def analyze_variable_feedback(
         self,
         variable_id: UUID,
-        min_feedback_count: int = 3
+        min_feedback_count: int = 3,
+        current_prompt: Optional[Prompt] = None
     ) -> Optional[FeedbackPattern]:
         """
         Analyze feedback for a specific variable to identify patterns.
         
+        When a refinement is suggested, the pattern carries the variable's
+        latest prompt so refining it needs no further lookup.
+        
         Args:
             variable_id: Variable UUID
             min_feedback_count: Minimum feedback entries needed for analysis
+            current_prompt: Latest prompt for the variable, if already loaded
         
         Returns:
             FeedbackPattern if patterns found, None otherwise
         """
-        # Get all feedback for this variable's extractions
+        # Count feedback and errors for this variable's extractions in SQL
+        is_error = ExtractionFeedback.feedback_type != FeedbackType.CORRECT
         result = await self.db.execute(
-            select(ExtractionFeedback, Extraction)
+            select(
+                func.count().label('total'),
+                func.count().filter(is_error).label('errors')
+            )
+            .select_from(ExtractionFeedback)
             .join(Extraction, ExtractionFeedback.extraction_id == Extraction.id)
             .where(Extraction.variable_id == variable_id)
         )
-        feedback_rows = result.all()
+        counts = result.one()
         
-        if len(feedback_rows) < min_feedback_count:
+        if counts.total < min_feedback_count:
             return None
         
-        # Analyze feedback
-        error_count = 0
-        incorrect_extractions = []
-        
-        for feedback, extraction in feedback_rows:
-            if feedback.feedback_type != FeedbackType.CORRECT:
-                error_count += 1
-                incorrect_extractions.append({
-                    'extraction': extraction,
-                    'feedback': feedback
-                })
-        
-        # Identify common issues from comments
-        common_issues = self._identify_common_issues(feedback_rows)
+        error_count = counts.errors
+        
+        # Identify common issues from error comments; an issue needs at
+        # least two comments, so fewer errors cannot produce one
+        common_issues = []
+        if error_count >= 2:
+            result = await self.db.execute(
+                select(ExtractionFeedback.user_comment)
+                .join(Extraction, ExtractionFeedback.extraction_id == Extraction.id)
+                .where(
+                    Extraction.variable_id == variable_id,
+                    is_error,
+                    ExtractionFeedback.user_comment.is_not(None)
+                )
+            )
+            common_issues = self._identify_common_issues(result.scalars().all())
         
         # Calculate error rate
-        error_rate = error_count / len(feedback_rows) if feedback_rows else 0
+        error_rate = error_count / counts.total if counts.total else 0
         
         # Generate refinement suggestion if error rate is significant
         suggested_refinement = None
         if error_rate > 0.3:  # More than 30% errors
-            suggested_refinement = self._generate_refinement_suggestion(
-                common_issues,
-                incorrect_extractions
-            )
+            suggested_refinement = self._generate_refinement_suggestion(common_issues)
+            if current_prompt is None:
+                current_prompt = (await self._latest_prompts([variable_id])).get(variable_id)
         
         return FeedbackPattern(
             variable_id=variable_id,
             error_count=error_count,
             common_issues=common_issues,
-            suggested_refinement=suggested_refinement
+            suggested_refinement=suggested_refinement,
+            current_prompt=current_prompt
         )
     
+    async def _latest_prompts(self, variable_ids: List[UUID]) -> Dict[UUID, Prompt]:
+        """
+        Get the highest-version prompt for each variable in one query.
+        
+        Args:
+            variable_ids: Variable UUIDs
+        
+        Returns:
+            Dictionary mapping variable_id to its latest prompt
+        """
+        if not variable_ids:
+            return {}
+        
+        if self.db.get_bind().dialect.name == "postgresql":
+            query = (
+                select(Prompt)
+                .where(Prompt.variable_id.in_(variable_ids))
+                .order_by(Prompt.variable_id, Prompt.version.desc())
+                .distinct(Prompt.variable_id)
+            )
+        else:
+            ranked = (
+                select(
+                    Prompt.id,
+                    func.row_number().over(
+                        partition_by=Prompt.variable_id,
+                        order_by=Prompt.version.desc()
+                    ).label('rank')
+                )
+                .where(Prompt.variable_id.in_(variable_ids))
+                .subquery()
+            )
+            query = (
+                select(Prompt)
+                .join(ranked, Prompt.id == ranked.c.id)
+                .where(ranked.c.rank == 1)
+            )
+        
+        result = await self.db.execute(query)
+        return {prompt.variable_id: prompt for prompt in result.scalars()}
+    
     async def refine_prompt_from_feedback(
         self,
         variable_id: UUID,
@@ -134,14 +245,11 @@ class FeedbackAnalyzer:
             logger.info(f"No refinement suggested for variable {variable_id}")
             return None
         
-        # Get current prompt
-        result = await self.db.execute(
-            select(Prompt)
-            .where(Prompt.variable_id == variable_id)
-            .order_by(Prompt.version.desc())
-            .limit(1)
-        )
-        current_prompt = result.scalar_one_or_none()
+        # Use the prompt loaded during analysis; look it up only for
+        # patterns built elsewhere
+        current_prompt = pattern.current_prompt
+        if current_prompt is None:
+            current_prompt = (await self._latest_prompts([variable_id])).get(variable_id)
         
         if not current_prompt:
             logger.error(f"No prompt found for variable {variable_id}")
@@ -157,7 +265,7 @@ class FeedbackAnalyzer:
         new_prompt = Prompt(
             variable_id=variable_id,
             prompt_text=refined_prompt_text,
-            model_config=current_prompt.model_config,
+            model_config_=current_prompt.model_config_,
             version=current_prompt.version + 1
         )
         
@@ -173,91 +281,47 @@ class FeedbackAnalyzer:
     
     def _identify_common_issues(
         self,
-        feedback_rows: List[tuple]
+        comments: List[str]
     ) -> List[str]:
         """
         Identify common issues from feedback comments.
         
         Args:
-            feedback_rows: List of (feedback, extraction) tuples
+            comments: User comments on incorrect extractions
         
         Returns:
             List of common issue descriptions
         """
         issues = []
-        issue_keywords = {
-            'missing': 'extraction misses information',
-            'wrong': 'extraction returns incorrect value',
-            'format': 'extraction has formatting issues',
-            'null': 'extraction returns null when value exists',
-            'hallucination': 'extraction hallucinates non-existent information'
-        }
-        
-        # Count keyword occurrences in comments
+        
+        # Count comments mentioning each keyword
         keyword_counts = defaultdict(int)
         
-        for feedback, extraction in feedback_rows:
-            if feedback.feedback_type != FeedbackType.CORRECT and feedback.user_comment:
-                comment_lower = feedback.user_comment.lower()
-                for keyword in issue_keywords:
-                    if keyword in comment_lower:
-                        keyword_counts[keyword] += 1
+        for comment in comments:
+            for keyword in set(_ISSUE_PATTERN.findall(comment.lower())):
+                keyword_counts[keyword] += 1
         
         # Add issues that appear in multiple feedback entries
         for keyword, count in keyword_counts.items():
             if count >= 2:  # At least 2 occurrences
-                issues.append(issue_keywords[keyword])
+                issues.append(_ISSUE_KEYWORDS[keyword])
         
         return issues
     
     def _generate_refinement_suggestion(
         self,
-        common_issues: List[str],
-        incorrect_extractions: List[Dict]
+        common_issues: List[str]
     ) -> str:
         """
         Generate prompt refinement suggestion based on common issues.
         
         Args:
             common_issues: List of identified common issues
-            incorrect_extractions: List of incorrect extraction data
         
         Returns:
             Refinement suggestion text
         """
-        suggestions = []
-        
-        if 'extraction misses information' in common_issues:
-            suggestions.append(
-                "Be more thorough when searching for the information. "
-                "Check the entire document, including headers, footers, and tables."
-            )
-        
-        if 'extraction returns incorrect value' in common_issues:
-            suggestions.append(
-                "Pay closer attention to the specific field being requested. "
-                "Ensure the extracted value matches the exact criteria."
-            )
-        
-        if 'extraction has formatting issues' in common_issues:
-            suggestions.append(
-                "Return the value in the exact format requested. "
-                "Do not add extra formatting or modify the original format."
-            )
-        
-        if 'extraction returns null when value exists' in common_issues:
-            suggestions.append(
-                "Search more carefully - the value may be in a different format "
-                "or location than expected."
-            )
-        
-        if 'extraction hallucinates non-existent information' in common_issues:
-            suggestions.append(
-                "CRITICAL: Only extract information that explicitly appears in the document. "
-                "Never infer or guess. If unsure, return null."
-            )
-        
-        return "\n\n".join(suggestions)
+        return _join_suggestions(frozenset(common_issues))
     
     def _apply_refinement(
         self,
@@ -282,47 +346,70 @@ class FeedbackAnalyzer:
 
 async def analyze_and_refine_prompts(
     db: AsyncSession,
-    variable_ids: Optional[List[UUID]] = None
+    variable_ids: Optional[List[UUID]] = None,
+    max_concurrency: int = 10,
+    user_id: Optional[UUID] = None
 ) -> Dict[UUID, Optional[Prompt]]:
     """
     Convenience function to analyze feedback and refine prompts for multiple variables.
     
+    Variables are analyzed concurrently, each in its own session on the same
+    engine (a single AsyncSession cannot be shared between tasks). Those
+    sessions are new connections without the caller's RLS context, so
+    request-scoped callers must pass user_id; workers running without RLS
+    context may omit it.
+    
     Args:
         db: Database session
         variable_ids: List of variable IDs to analyze (None = all variables)
+        max_concurrency: Maximum variables analyzed at once; keep at or below
+            the connection pool size
+        user_id: User whose RLS context each variable's session applies
     
     Returns:
         Dictionary mapping variable_id to new prompt (if created)
     """
-    analyzer = FeedbackAnalyzer(db)
-    results = {}
-    
     # Get variables to analyze
-    if variable_ids:
-        query = select(Variable).where(Variable.id.in_(variable_ids))
+    if variable_ids is not None:
+        query = select(Variable.id).where(Variable.id.in_(variable_ids))
     else:
-        query = select(Variable)
+        query = select(Variable.id)
     
     result = await db.execute(query)
-    variables = result.scalars().all()
+    ids = result.scalars().all()
+    
+    # Load every variable's current prompt up front in a single query
+    current_prompts = await FeedbackAnalyzer(db)._latest_prompts(ids)
     
-    for variable in variables:
-        try:
-            # Analyze feedback
-            pattern = await analyzer.analyze_variable_feedback(variable.id)
-            
-            # Refine prompt if pattern suggests it
-            new_prompt = None
-            if pattern and pattern.suggested_refinement:
-                new_prompt = await analyzer.refine_prompt_from_feedback(
-                    variable.id,
-                    pattern
+    session_factory = async_sessionmaker(
+        db.bind,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _analyze_one(variable_id: UUID) -> Optional[Prompt]:
+        async with semaphore, session_factory() as session:
+            if user_id is not None:
+                bind_rls_context(session, user_id)
+            try:
+                analyzer = FeedbackAnalyzer(session)
+                
+                # Analyze feedback
+                pattern = await analyzer.analyze_variable_feedback(
+                    variable_id,
+                    current_prompt=current_prompts.get(variable_id)
                 )
-            
-            results[variable.id] = new_prompt
-            
-        except Exception as e:
-            logger.exception(f"Error analyzing feedback for variable {variable.id}: {str(e)}")
-            results[variable.id] = None
+                
+                # Refine prompt if pattern suggests it
+                if pattern and pattern.suggested_refinement:
+                    return await analyzer.refine_prompt_from_feedback(variable_id, pattern)
+                return None
+                
+            except Exception as e:
+                logger.exception(f"Error analyzing feedback for variable {variable_id}: {str(e)}")
+                return None
+    
+    new_prompts = await asyncio.gather(*[_analyze_one(v) for v in ids])
     
-    return results
+    return dict(zip(ids, new_prompts))
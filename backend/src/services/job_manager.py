@@ -69,18 +69,14 @@ class JobManager:
         from src.core.config import settings
 
         try:
-            from arq.connections import create_pool
-            from src.workers.settings import parse_redis_url
-
-            pool = await create_pool(parse_redis_url(settings.REDIS_URL))
-            try:
-                await pool.enqueue_job(
-                    "process_extraction_job",
-                    job_id=str(job_id),
-                )
-                logger.info(f"Enqueued extraction job {job_id}")
-            finally:
-                await pool.close()
+            from src.core.redis import get_arq_pool
+
+            pool = await get_arq_pool()
+            await pool.enqueue_job(
+                "process_extraction_job",
+                job_id=str(job_id),
+            )
+            logger.info(f"Enqueued extraction job {job_id}")
 
         except Exception as e:
             if not settings.DEBUG:
@@ -1,24 +1,117 @@
 """
-LLM client service with LangChain integration and retry logic.
+LLM client service with structured output parsing and retry logic.
 
 This service provides a unified interface for calling LLM APIs (OpenAI, Anthropic)
-with structured output parsing, retry logic, and error handling.
+with structured output parsing, retry logic, and error handling. Completions
+are streamed straight from the OpenAI SDK; LangChain's ChatOpenAI can be
+enabled with LLM_USE_LANGCHAIN for setups that rely on its callbacks.
 """
 import asyncio
+import functools
+import hashlib
 import json
 import logging
 import random
-from typing import Any, Dict, Optional
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
+import httpx
+import openai
+from openai import AsyncOpenAI
 from pydantic import BaseModel, Field, ValidationError
 
 from src.core.config import settings
+from src.core.rate_limiter import estimate_tokens, get_llm_throttle
 
 logger = logging.getLogger(__name__)
 
+# Extractions are cached in Redis only when sampling is near-deterministic.
+# This covers LLMClient callers only; the extraction worker calls the LLM
+# through TextExtractionService and reuses results via extraction_cache
+LLM_CACHE_MAX_TEMPERATURE = 0.2
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_KEY_PREFIX = "llm:v2"
+
+# Static system message; with the document right after it, every prompt for
+# the same document shares a prefix the provider can cache
+EXTRACTION_SYSTEM_PROMPT = (
+    "You extract structured information from documents. "
+    "Answer with a single JSON object as instructed."
+)
+DOCUMENT_PLACEHOLDER = "{{document_text}}"
+DOCUMENT_REFERENCE = "(the document above)"
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Provider-requested waits longer than this are capped
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+# Transient failures worth another attempt; the SDK's own retries are off
+_RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    asyncio.TimeoutError,
+)
+
+# Durations in OpenAI rate-limit reset headers, e.g. "1s", "200ms", "1m30s"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse a duration like "1m30s" or "200ms" into seconds."""
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read how long the provider asked us to wait from an API error.
+
+    Checks retry-after-ms, retry-after (seconds) and the OpenAI
+    x-ratelimit-reset-requests / x-ratelimit-reset-tokens headers.
+
+    Args:
+        error: Exception raised by the LLM call
+
+    Returns:
+        Seconds to wait, or None if the error carries no hint
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    resets = [
+        _parse_duration(value)
+        for value in (
+            headers.get("x-ratelimit-reset-requests"),
+            headers.get("x-ratelimit-reset-tokens"),
+        )
+        if value
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
 
 class ExtractionResult(BaseModel):
     """Structured output format for LLM extractions."""
@@ -46,6 +139,71 @@ class LLMParseError(LLMClientError):
     pass
 
 
+class _JsonObjectScanner:
+    """
+    Track JSON object nesting across streamed text.
+
+    Braces inside JSON strings are ignored; quotes only open strings once
+    an object has started, so apostrophes in leading prose are harmless.
+    """
+    __slots__ = ("depth", "in_string", "escaped")
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        """
+        Consume more text.
+
+        Returns:
+            True if a top-level object closed within this text
+        """
+        closed = False
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = self.depth > 0
+            elif char == "{":
+                self.depth += 1
+            elif char == "}" and self.depth:
+                self.depth -= 1
+                closed = closed or self.depth == 0
+        return closed
+
+
+# One connection pool shared by every LLMClient, whatever its model config
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client used for LLM API calls."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=30.0,
+        )
+    return _http_client
+
+
+async def close_llm_http_client() -> None:
+    """Close the shared LLM HTTP client (call on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    # Cached clients hold the closed connection pool
+    _cached_llm_client.cache_clear()
+
+
 class LLMClient:
     """
     LLM client with retry logic and structured output parsing.
@@ -78,21 +236,40 @@ class LLMClient:
         self.base_delay = base_delay
         self.max_delay = max_delay
 
-        # Initialize LangChain ChatOpenAI (or mock for dev)
+        # Call the OpenAI SDK directly; LangChain's ChatOpenAI (or the mock
+        # for dev) is used only when configured. Retries are handled by
+        # extract(), so neither backend retries on its own.
         from src.core.mock_llm import is_mock_mode, MockChatOpenAI
-        if is_mock_mode():
+        mock_mode = is_mock_mode()
+        self.openai: Optional[AsyncOpenAI] = None
+        self.llm = None
+        if mock_mode:
             self.llm = MockChatOpenAI()
-        else:
+        elif settings.LLM_USE_LANGCHAIN:
+            from langchain_openai import ChatOpenAI
+
             self.llm = ChatOpenAI(
                 model=model,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 openai_api_key=settings.OPENAI_API_KEY,
                 request_timeout=30.0,
+                max_retries=0,
+                http_async_client=_get_http_client(),
+            )
+        else:
+            self.openai = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=_get_http_client(),
+                timeout=30.0,
+                max_retries=0,
             )
 
-        # Initialize output parser for structured extraction
-        self.output_parser = PydanticOutputParser(pydantic_object=ExtractionResult)
+        # Shared per-model request/token budget (None when disabled)
+        self.throttle = get_llm_throttle(model)
+
+        # Identical prompts give (near-)identical answers at low temperature
+        self.cache_enabled = not mock_mode and temperature <= LLM_CACHE_MAX_TEMPERATURE
 
     async def extract(
         self, prompt_text: str, document_text: str
@@ -104,7 +281,8 @@ class LLMClient:
 
         Args:
             prompt_text: Extraction prompt (contains {{document_text}} placeholder)
-            document_text: Document content to extract from
+            document_text: Document content to extract from, sent ahead of
+                the prompt (see _build_messages)
 
         Returns:
             ExtractionResult with value, confidence, and source_text
@@ -114,21 +292,37 @@ class LLMClient:
             LLMRateLimitError: If rate limit exceeded
             LLMParseError: If response cannot be parsed
         """
-        # Replace placeholder in prompt
-        full_prompt = prompt_text.replace("{{document_text}}", document_text)
+        messages = self._build_messages(prompt_text, document_text)
+
+        # Serve repeated prompts from the cache
+        cache_key = self._cache_key(messages) if self.cache_enabled else None
+        if cache_key:
+            cached = await self._get_cached(cache_key)
+            if cached is not None:
+                return cached
+
+        # Providers count max_tokens against the token budget up front
+        if self.throttle:
+            estimated_tokens = sum(
+                estimate_tokens(message["content"]) for message in messages
+            ) + self.max_tokens
 
         # Retry loop with exponential backoff
         last_error = None
+        delay = self.base_delay
 
         for attempt in range(self.max_retries):
             try:
-                # Call LLM
-                response = await self.llm.ainvoke(full_prompt)
+                # Wait for budget instead of running into 429s
+                if self.throttle:
+                    await self.throttle.acquire(estimated_tokens)
 
-                # Parse response
-                result = self._parse_response(response.content)
+                # Call LLM and parse the response
+                result = await self._stream_extraction(messages)
 
                 logger.info(f"Extraction successful on attempt {attempt + 1}")
+                if cache_key:
+                    await self._set_cached(cache_key, result)
                 return result
 
             except LLMRateLimitError as e:
@@ -161,55 +355,219 @@ class LLMClient:
                     logger.error(f"Non-retryable error: {str(e)}")
                     raise LLMClientError(f"LLM request failed: {str(e)}")
 
-            # Calculate delay with exponential backoff and jitter
+            # Back off with jitter, but never retry before the provider
+            # said the limit resets
             if attempt < self.max_retries - 1:
-                delay = self._calculate_backoff_delay(attempt)
-                logger.info(f"Waiting {delay:.2f}s before retry {attempt + 2}")
-                await asyncio.sleep(delay)
+                delay = self._calculate_backoff_delay(delay)
+                wait = delay
+                retry_after = _retry_after_seconds(last_error)
+                if retry_after is not None:
+                    wait = max(wait, min(retry_after, MAX_RETRY_AFTER_SECONDS))
+                logger.info(f"Waiting {wait:.2f}s before retry {attempt + 2}")
+                await asyncio.sleep(wait)
 
         # All retries exhausted
         raise LLMClientError(
             f"Extraction failed after {self.max_retries} attempts: {str(last_error)}"
         )
 
-    def _parse_response(self, response_text: str) -> ExtractionResult:
+    async def _stream_extraction(self, messages: List[Dict[str, str]]) -> ExtractionResult:
         """
-        Parse LLM response into ExtractionResult.
+        Stream a completion and stop as soon as it holds the answer.
+
+        The answer is one short JSON object, but models often keep writing
+        after it. Each time a top-level object closes, the text so far is
+        parsed; once it yields an ExtractionResult the stream is closed, so
+        trailing output is neither waited for nor billed.
 
         Args:
-            response_text: Raw LLM response
+            messages: Chat messages from _build_messages
 
         Returns:
             Parsed ExtractionResult
 
         Raises:
-            LLMParseError: If parsing fails
+            LLMParseError: If the full response cannot be parsed
         """
+        scanner = _JsonObjectScanner()
+        parts: List[str] = []
+        stream = self._stream_text(messages)
         try:
-            # Try to extract JSON from response
-            # Handle cases where LLM adds explanatory text before/after JSON
-            json_start = response_text.find("{")
-            json_end = response_text.rfind("}") + 1
+            async for content in stream:
+                parts.append(content)
+                if scanner.feed(content):
+                    try:
+                        return self._parse_response("".join(parts))
+                    except LLMParseError:
+                        # Braces in prose, or an incomplete answer; keep reading
+                        pass
+        finally:
+            await stream.aclose()
+
+        return self._parse_response("".join(parts))
+
+    async def _stream_text(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Stream completion text from the configured backend.
 
-            if json_start == -1 or json_end == 0:
-                raise LLMParseError("No JSON object found in response")
+        Closing this generator closes the underlying HTTP stream.
 
-            json_text = response_text[json_start:json_end]
+        Args:
+            messages: Chat messages from _build_messages
 
-            # Parse JSON
-            data = json.loads(json_text)
+        Yields:
+            Pieces of the completion text
+        """
+        if self.openai is None:
+            stream = self.llm.astream(messages)
+            try:
+                async for chunk in stream:
+                    yield chunk.content or ""
+            finally:
+                await stream.aclose()
+            return
+
+        stream = await self.openai.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
+        finally:
+            await stream.response.aclose()
 
-            # Validate with Pydantic
-            result = ExtractionResult(**data)
+    def _build_messages(self, prompt_text: str, document_text: str) -> List[Dict[str, str]]:
+        """
+        Build chat messages with the document text as a stable prefix.
+
+        Providers cache repeated prompt prefixes. The system message and
+        document come first, so every variable extracted from the same
+        document after the first reuses the cached document tokens. The
+        {{document_text}} placeholder in the prompt is replaced with a
+        reference to the document message.
 
-            return result
+        Args:
+            prompt_text: Extraction prompt (contains {{document_text}} placeholder)
+            document_text: Document content to extract from
+
+        Returns:
+            Chat messages for the LLM
+        """
+        return [
+            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Document:\n{document_text}"},
+            {"role": "user", "content": prompt_text.replace(DOCUMENT_PLACEHOLDER, DOCUMENT_REFERENCE)},
+        ]
 
-        except json.JSONDecodeError as e:
-            raise LLMParseError(f"Invalid JSON in response: {str(e)}")
-        except ValidationError as e:
-            raise LLMParseError(f"Response validation failed: {str(e)}")
+    def _cache_key(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Build the Redis key for a prompt under this client's configuration.
+
+        Args:
+            messages: Chat messages from _build_messages
+
+        Returns:
+            Cache key
+        """
+        payload = json.dumps(
+            {
+                "model": self.model,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+                "messages": messages,
+            },
+            sort_keys=True,
+        )
+        return f"{LLM_CACHE_KEY_PREFIX}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    async def _get_cached(self, key: str) -> Optional[ExtractionResult]:
+        """
+        Look up a cached extraction. Cache errors are treated as misses.
+
+        Args:
+            key: Cache key from _cache_key
+
+        Returns:
+            Cached ExtractionResult, or None on a miss
+        """
+        try:
+            from src.core.redis import get_redis
+
+            redis = await get_redis()
+            data = await redis.get(key)
+            if data:
+                return ExtractionResult.model_validate_json(data)
         except Exception as e:
-            raise LLMParseError(f"Failed to parse response: {str(e)}")
+            logger.debug(f"LLM cache lookup failed: {str(e)}")
+        return None
+
+    async def _set_cached(self, key: str, result: ExtractionResult) -> None:
+        """
+        Store an extraction in the cache. Cache errors are ignored.
+
+        Args:
+            key: Cache key from _cache_key
+            result: Parsed extraction to store
+        """
+        try:
+            from src.core.redis import get_redis
+
+            redis = await get_redis()
+            await redis.set(key, result.model_dump_json(), ex=LLM_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.debug(f"LLM cache store failed: {str(e)}")
+
+    def _parse_response(self, response_text: str) -> ExtractionResult:
+        """
+        Parse LLM response into ExtractionResult.
+
+        Scans the response for JSON objects with a decoder rather than
+        slicing between the first "{" and last "}", so prose containing
+        braces or several JSON blocks around the answer still parses.
+        The first object that validates as an ExtractionResult wins.
+
+        Args:
+            response_text: Raw LLM response
+
+        Returns:
+            Parsed ExtractionResult
+
+        Raises:
+            LLMParseError: If parsing fails
+        """
+        try:
+            # Fast path: the whole response is the JSON object
+            return ExtractionResult.model_validate_json(response_text)
+        except ValidationError:
+            pass
+
+        last_error: Optional[Exception] = None
+        index = response_text.find("{")
+        while index != -1:
+            try:
+                data, end = _JSON_DECODER.raw_decode(response_text, index)
+            except json.JSONDecodeError as e:
+                last_error = e
+                index = response_text.find("{", index + 1)
+                continue
+
+            if isinstance(data, dict):
+                try:
+                    return ExtractionResult(**data)
+                except ValidationError as e:
+                    last_error = e
+            index = response_text.find("{", end)
+
+        if last_error is None:
+            raise LLMParseError("No JSON object found in response")
+        if isinstance(last_error, ValidationError):
+            raise LLMParseError(f"Response validation failed: {str(last_error)}")
+        raise LLMParseError(f"Invalid JSON in response: {str(last_error)}")
 
     def _is_retryable_error(self, error: Exception) -> bool:
         """
@@ -221,11 +579,15 @@ class LLMClient:
         Returns:
             True if error is retryable, False otherwise
         """
+        if isinstance(error, _RETRYABLE_ERRORS):
+            return True
+
         error_str = str(error).lower()
 
-        # Retryable errors
+        # Retryable errors from backends that wrap the SDK's exceptions
         retryable_patterns = [
             "timeout",
+            "timed out",
             "connection",
             "503",  # Service unavailable
             "502",  # Bad gateway
@@ -235,34 +597,51 @@ class LLMClient:
 
         return any(pattern in error_str for pattern in retryable_patterns)
 
-    def _calculate_backoff_delay(self, attempt: int) -> float:
+    def _calculate_backoff_delay(self, previous_delay: float) -> float:
         """
-        Calculate delay for exponential backoff with jitter.
+        Calculate the next retry delay with decorrelated jitter.
 
-        Formula: min(base_delay * 2^attempt + jitter, max_delay)
-        Jitter: random(0, delay * 0.1)
+        Formula: min(max_delay, random(base_delay, previous_delay * 3))
+        Spreads concurrent retries apart better than a fixed exponential
+        schedule with a small jitter.
 
         Args:
-            attempt: Current attempt number (0-indexed)
+            previous_delay: Delay used before the previous attempt
+                (base_delay before the first retry)
 
         Returns:
             Delay in seconds
         """
-        # Exponential backoff
-        delay = self.base_delay * (2**attempt)
+        return min(self.max_delay, random.uniform(self.base_delay, previous_delay * 3))
 
-        # Add jitter (10% of delay)
-        jitter = random.uniform(0, delay * 0.1)
-        delay += jitter
 
-        # Cap at max_delay
-        return min(delay, self.max_delay)
+@functools.lru_cache(maxsize=32)
+def _cached_llm_client(model: str, temperature: float, max_tokens: int) -> LLMClient:
+    """Build an LLMClient once per (model, temperature, max_tokens)."""
+    return LLMClient(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        max_retries=3,
+        base_delay=1.0,
+        max_delay=10.0,
+    )
 
 
 def create_llm_client(model_config: Dict[str, Any]) -> LLMClient:
     """
     Factory function to create LLM client from model configuration.
 
+    Clients are cached by the configuration values they use, so repeated
+    extractions with the same config share one client (and its underlying
+    HTTP connection pool) instead of rebuilding it per call. LLMClient keeps
+    no per-request state, so sharing is safe.
+
+    Prompt contract: extract() sends the document as its own message ahead
+    of the prompt, so prompts should refer to "the document above" rather
+    than rely on where {{document_text}} sits. The placeholder is still
+    accepted and replaced with that reference.
+
     Args:
         model_config: Model configuration dictionary with keys:
             - model: Model name
@@ -272,11 +651,8 @@ def create_llm_client(model_config: Dict[str, Any]) -> LLMClient:
     Returns:
         Configured LLMClient instance
     """
-    return LLMClient(
-        model=model_config.get("model", "gpt-4"),
-        temperature=model_config.get("temperature", 0.2),
-        max_tokens=model_config.get("max_tokens", 1000),
-        max_retries=3,
-        base_delay=1.0,
-        max_delay=10.0,
+    return _cached_llm_client(
+        model_config.get("model", "gpt-4"),
+        model_config.get("temperature", 0.2),
+        model_config.get("max_tokens", 1000),
     )
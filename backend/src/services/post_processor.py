@@ -4,15 +4,134 @@ Post-processing service for extraction results.
 Applies type coercion, validation, defaults, confidence checks,
 and multi-value handling per CODERAI_REFERENCE.md Section 4.4.
 """
+import calendar
+import functools
 import logging
 import re
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from src.models.variable import Variable, VariableType
 
 logger = logging.getLogger(__name__)
 
+# Characters stripped from numeric strings (everything but digits, "." and "-")
+_NON_NUMERIC = re.compile(r"[^\d.\-]")
+
+# Accepted date shapes, tried in order; ISO first. Each mirrors what
+# datetime.strptime accepts for the format in its comment, so dates are
+# recognized without raising and catching ValueError per attempt.
+_YEAR = r"(\d\d\d\d)"
+_MONTH = r"(1[0-2]|0[1-9]|[1-9])"
+_DAY = r"(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+_DATE_PATTERNS = (
+    # %Y-%m-%d
+    (re.compile(rf"{_YEAR}-{_MONTH}-{_DAY}", re.IGNORECASE), (0, 1, 2)),
+    # %Y-%m-%dT%H:%M:%S
+    (
+        re.compile(
+            rf"{_YEAR}-{_MONTH}-{_DAY}T(?:2[0-3]|[01]\d|\d):(?:[0-5]\d|\d):(?:[0-5]\d|\d)",
+            re.IGNORECASE,
+        ),
+        (0, 1, 2),
+    ),
+    # %m/%d/%Y
+    (re.compile(rf"{_MONTH}/{_DAY}/{_YEAR}", re.IGNORECASE), (2, 0, 1)),
+    # %d/%m/%Y
+    (re.compile(rf"{_DAY}/{_MONTH}/{_YEAR}", re.IGNORECASE), (2, 1, 0)),
+)
+
+
+def _normalize_date(value: str) -> Optional[str]:
+    """
+    Normalize a date string in an accepted format to YYYY-MM-DD.
+
+    Args:
+        value: Stripped date string
+
+    Returns:
+        ISO date, or None if no format matches a real calendar date
+    """
+    for pattern, (year_group, month_group, day_group) in _DATE_PATTERNS:
+        match = pattern.fullmatch(value)
+        if match is None:
+            continue
+        groups = match.groups()
+        year = int(groups[year_group])
+        month = int(groups[month_group])
+        day = int(groups[day_group])
+        if year >= 1 and day <= calendar.monthrange(year, month)[1]:
+            return f"{year:04d}-{month:02d}-{day:02d}"
+    return None
+
+# Recognized boolean strings (lowercase, stripped)
+_BOOLEAN_STRINGS = {
+    "true": True, "yes": True, "1": True,
+    "false": False, "no": False, "0": False,
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_rule_pattern(pattern: str) -> re.Pattern:
+    """Compile a validation rule's regex once per pattern string."""
+    return re.compile(pattern)
+
+
+class CompiledVariable:
+    """
+    Post-processing settings of a Variable, resolved once.
+
+    Variables keep these settings in JSON columns (edge_cases,
+    uncertainty_handling). Compiling a variable reads them once, so
+    per-extraction post-processing uses plain attribute access.
+
+    Attributes:
+        type: Variable type used for coercion
+        validation_rules: (rule_type, parameters, error_message) tuples
+        default_value: Value applied when extraction returns null
+        confidence_threshold: Minimum confidence, or None for no check
+        uncertain_action: Action below threshold ('flag' or 'skip')
+        multiple_values_action: Multi-value strategy
+        max_values: Maximum values kept by multi-value strategies
+    """
+    __slots__ = (
+        "type", "validation_rules", "default_value", "confidence_threshold",
+        "uncertain_action", "multiple_values_action", "max_values",
+    )
+
+    def __init__(self, variable: Variable):
+        edge_cases = variable.edge_cases or {}
+        uncertainty = variable.uncertainty_handling or {}
+
+        self.type = variable.type
+        self.validation_rules = tuple(
+            (
+                rule.get("rule_type"),
+                rule.get("parameters", {}),
+                rule.get("error_message", f"Validation failed: {rule.get('rule_type')}"),
+            )
+            for rule in edge_cases.get("validation_rules", [])
+        )
+        self.default_value = variable.default_value
+        self.confidence_threshold = uncertainty.get("confidence_threshold")
+        self.uncertain_action = uncertainty.get("if_uncertain_action", "flag")
+        self.multiple_values_action = uncertainty.get("multiple_values_action", "return_first")
+        self.max_values = variable.max_values or 1
+
+
+def compile_variable(variable: Union[Variable, CompiledVariable]) -> CompiledVariable:
+    """
+    Resolve a variable's post-processing settings.
+
+    Args:
+        variable: Variable definition, or an already compiled variable
+
+    Returns:
+        CompiledVariable for the variable
+    """
+    if isinstance(variable, CompiledVariable):
+        return variable
+    return CompiledVariable(variable)
+
 
 def coerce_type(value: Any, variable_type: VariableType) -> Any:
     """
@@ -32,7 +151,7 @@ def coerce_type(value: Any, variable_type: VariableType) -> Any:
         if variable_type == VariableType.NUMBER:
             # Handle string numbers, strip non-numeric chars (except . and -)
             if isinstance(value, str):
-                cleaned = re.sub(r"[^\d.\-]", "", value)
+                cleaned = _NON_NUMERIC.sub("", value)
                 if not cleaned:
                     return None
                 if "." in cleaned:
@@ -42,27 +161,19 @@ def coerce_type(value: Any, variable_type: VariableType) -> Any:
 
         if variable_type == VariableType.DATE:
             if isinstance(value, str):
-                # Try ISO format first
-                for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%m/%d/%Y", "%d/%m/%Y"):
-                    try:
-                        dt = datetime.strptime(value.strip(), fmt)
-                        return dt.strftime("%Y-%m-%d")
-                    except ValueError:
-                        continue
                 # Return as-is if no format matches
-                return value
+                return _normalize_date(value.strip()) or value
             return value
 
         if variable_type == VariableType.BOOLEAN:
             if isinstance(value, bool):
                 return value
             if isinstance(value, str):
-                lower = value.lower().strip()
-                if lower in ("true", "yes", "1"):
-                    return True
-                if lower in ("false", "no", "0"):
-                    return False
-                return None
+                # Already-canonical strings skip the lower()/strip() copies
+                flag = _BOOLEAN_STRINGS.get(value)
+                if flag is None:
+                    flag = _BOOLEAN_STRINGS.get(value.strip().lower())
+                return flag
             return bool(value)
 
         # TEXT, CATEGORY, LOCATION — return as-is
@@ -75,14 +186,14 @@ def coerce_type(value: Any, variable_type: VariableType) -> Any:
 
 def validate_value(
     value: Any,
-    variable: Variable,
+    variable: Union[Variable, CompiledVariable],
 ) -> tuple[bool, Optional[str]]:
     """
     Validate an extracted value against variable rules.
 
     Args:
         value: Extracted value
-        variable: Variable with edge_cases config
+        variable: Variable with edge_cases config, or its compiled form
 
     Returns:
         (is_valid, error_message)
@@ -90,17 +201,12 @@ def validate_value(
     if value is None:
         return True, None
 
-    edge_cases = variable.edge_cases or {}
-    rules = edge_cases.get("validation_rules", [])
+    rules = compile_variable(variable).validation_rules
 
     if not rules:
         return True, None
 
-    for rule in rules:
-        rule_type = rule.get("rule_type")
-        params = rule.get("parameters", {})
-        error_msg = rule.get("error_message", f"Validation failed: {rule_type}")
-
+    for rule_type, params, error_msg in rules:
         if rule_type == "range":
             try:
                 num_val = float(value)
@@ -116,7 +222,7 @@ def validate_value(
         elif rule_type == "regex":
             pattern = params.get("pattern")
             if pattern and isinstance(value, str):
-                if not re.match(pattern, value):
+                if not _compile_rule_pattern(pattern).match(value):
                     return False, error_msg
 
         elif rule_type == "enum":
@@ -127,13 +233,13 @@ def validate_value(
     return True, None
 
 
-def apply_default(value: Any, variable: Variable) -> Any:
+def apply_default(value: Any, variable: Union[Variable, CompiledVariable]) -> Any:
     """
     Apply default value if extraction returned null.
 
     Args:
         value: Extracted value (may be None)
-        variable: Variable with default_value
+        variable: Variable with default_value, or its compiled form
 
     Returns:
         Default value if value is None and default exists, else original value
@@ -145,20 +251,20 @@ def apply_default(value: Any, variable: Variable) -> Any:
 
 def check_confidence(
     confidence: int,
-    variable: Variable,
+    variable: Union[Variable, CompiledVariable],
 ) -> tuple[bool, str]:
     """
     Check if confidence meets threshold.
 
     Args:
         confidence: Confidence score (0-100)
-        variable: Variable with uncertainty_handling config
+        variable: Variable with uncertainty_handling config, or its compiled form
 
     Returns:
         (meets_threshold, action) where action is 'flag', 'skip', or 'accept'
     """
-    uncertainty = variable.uncertainty_handling or {}
-    threshold = uncertainty.get("confidence_threshold")
+    compiled = compile_variable(variable)
+    threshold = compiled.confidence_threshold
 
     if threshold is None:
         return True, "accept"
@@ -166,20 +272,19 @@ def check_confidence(
     if confidence >= threshold:
         return True, "accept"
 
-    action = uncertainty.get("if_uncertain_action", "flag")
-    return False, action
+    return False, compiled.uncertain_action
 
 
 def handle_multiple_values(
     values: List[Any],
-    variable: Variable,
+    variable: Union[Variable, CompiledVariable],
 ) -> Any:
     """
     Apply multi-value strategy based on variable config.
 
     Args:
         values: List of extracted values
-        variable: Variable with uncertainty_handling config
+        variable: Variable with uncertainty_handling config, or its compiled form
 
     Returns:
         Processed value(s) according to strategy
@@ -187,10 +292,9 @@ def handle_multiple_values(
     if not values:
         return None
 
-    uncertainty = variable.uncertainty_handling or {}
-    strategy = uncertainty.get("multiple_values_action", "return_first")
-
-    max_values = variable.max_values or 1
+    compiled = compile_variable(variable)
+    strategy = compiled.multiple_values_action
+    max_values = compiled.max_values
 
     if strategy == "return_all":
         return values[:max_values]
@@ -206,7 +310,7 @@ def handle_multiple_values(
 def post_process_extraction(
     value: Any,
     confidence: int,
-    variable: Variable,
+    variable: Union[Variable, CompiledVariable],
 ) -> Dict[str, Any]:
     """
     Run the full post-processing pipeline on a single extraction.
@@ -214,11 +318,14 @@ def post_process_extraction(
     Args:
         value: Raw extracted value
         confidence: Confidence score (0-100)
-        variable: Variable definition
+        variable: Variable definition; pass compile_variable(variable)
+            when processing many extractions of the same variable
 
     Returns:
         Dict with processed value, confidence, status flags
     """
+    variable = compile_variable(variable)
+
     result = {
         "value": value,
         "confidence": confidence,
@@ -5,11 +5,242 @@ This service transforms user's natural language extraction instructions into
 structured, optimized prompts for different LLM models.
 """
 import json
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.models.project import Project
 from src.models.variable import Variable, VariableType
 
+# Project sections of recent prompts, keyed by the project fields they read
+PROJECT_SECTIONS_CACHE_SIZE = 512
+_project_sections_cache: "OrderedDict[tuple, Tuple[str, str, str]]" = OrderedDict()
+
+# Prompt templates per variable type, filled in with str.format_map. Literal
+# braces are doubled, so {{document_text}} renders as {document_text}.
+_TEXT_PROMPT_TEMPLATE = """You are a precise data extraction assistant. Extract the following information from the provided {input_label_lower}.
+
+{project_context}
+{uoo_framing}
+
+**Extraction Task:**
+Variable Name: {variable_name}
+Variable Type: Text (free-form text)
+
+**Instructions:**
+{instructions}
+{uncertainty_instructions}
+{edge_case_instructions}
+{golden_examples_section}
+
+**Output Format:**
+You must respond with a valid JSON object in this exact format:
+{{
+    "value": "extracted text here",
+    "confidence": 95,
+    "source_text": "relevant excerpt from document that supports this extraction"
+}}
+
+**Guidelines:**
+1. Extract the exact text as it appears in the document (preserve formatting, spelling, punctuation)
+2. If multiple instances exist, extract the most relevant or comprehensive one
+3. If information is not found or unclear, set value to null
+4. confidence: 0-100 scale (100 = certain, 50 = moderate, 0 = not found)
+5. source_text: Include the surrounding context (max 200 characters)
+6. Be precise and faithful to the source document
+
+**{input_label}:**
+{{document_text}}"""
+
+_CATEGORY_PROMPT_TEMPLATE = """You are a precise classification assistant. Categorize the following information from the provided {input_label_lower}.
+
+{project_context}
+{uoo_framing}
+
+**Classification Task:**
+Variable Name: {variable_name}
+Variable Type: Category (classification)
+
+**Instructions:**
+{instructions}
+{uncertainty_instructions}
+{edge_case_instructions}
+{golden_examples_section}
+
+**Available Categories:**
+{categories_list}{other_option}
+
+**Selection Rules:**
+- Select {selection_type} from the list above
+- Base your decision strictly on evidence in the document
+- If no category fits and 'allow_other' is false, respond with null
+
+**Output Format:**
+You must respond with a valid JSON object in this exact format:
+{{
+    "value": {value_example},
+    "confidence": 95,
+    "source_text": "relevant excerpt from document that supports this classification"
+}}
+
+**Guidelines:**
+1. confidence: 0-100 scale (100 = clear match, 50 = ambiguous, 0 = not found)
+2. source_text: Include the passage that supports your classification (max 200 characters)
+3. Be conservative - only classify if you have clear evidence
+4. For ambiguous cases, reduce confidence score rather than forcing a category
+
+**{input_label}:**
+{{document_text}}"""
+
+_NUMBER_PROMPT_TEMPLATE = """You are a precise numerical data extraction assistant. Extract the following numerical value from the provided {input_label_lower}.
+
+{project_context}
+{uoo_framing}
+
+**Extraction Task:**
+Variable Name: {variable_name}
+Variable Type: Number (integer or decimal)
+
+**Instructions:**
+{instructions}
+{uncertainty_instructions}
+{edge_case_instructions}
+{golden_examples_section}
+
+**Output Format:**
+You must respond with a valid JSON object in this exact format:
+{{
+    "value": 42.5,
+    "confidence": 95,
+    "source_text": "relevant excerpt from document containing this number"
+}}
+
+**Guidelines:**
+1. Extract only the numerical value (no currency symbols, units, or formatting)
+2. Use decimal notation (e.g., 1234.56, not "1,234.56")
+3. If multiple numbers exist, extract the one most relevant to the instructions
+4. If the value is not found or ambiguous, set value to null
+5. confidence: 0-100 scale (100 = explicit number, 50 = calculated/inferred, 0 = not found)
+6. source_text: Include the exact phrase containing the number (max 200 characters)
+7. Be precise - do not estimate or calculate unless explicitly instructed
+
+**{input_label}:**
+{{document_text}}"""
+
+_DATE_PROMPT_TEMPLATE = """You are a precise date extraction assistant. Extract the following date from the provided {input_label_lower}.
+
+{project_context}
+{uoo_framing}
+
+**Extraction Task:**
+Variable Name: {variable_name}
+Variable Type: Date
+
+**Instructions:**
+{instructions}
+{uncertainty_instructions}
+{edge_case_instructions}
+{golden_examples_section}
+
+**Output Format:**
+You must respond with a valid JSON object in this exact format:
+{{
+    "value": "2024-03-15",
+    "confidence": 95,
+    "source_text": "relevant excerpt from document containing this date"
+}}
+
+**Guidelines:**
+1. Always format dates as YYYY-MM-DD (ISO 8601 standard)
+2. If only year is available, use YYYY-01-01
+3. If only year and month are available, use YYYY-MM-01
+4. Convert all date formats (e.g., "March 15, 2024", "15/03/2024", "Mar 15 2024") to YYYY-MM-DD
+5. If multiple dates exist, extract the one most relevant to the instructions
+6. If date is not found or ambiguous, set value to null
+7. confidence: 0-100 scale (100 = explicit date, 50 = partial/inferred, 0 = not found)
+8. source_text: Include the exact phrase containing the date (max 200 characters)
+9. Be careful with ambiguous formats (e.g., "03/04/2024" could be Mar 4 or Apr 3)
+
+**{input_label}:**
+{{document_text}}"""
+
+_BOOLEAN_PROMPT_TEMPLATE = """You are a precise boolean assessment assistant. Determine whether the following condition is true or false based on the provided {input_label_lower}.
+
+{project_context}
+{uoo_framing}
+
+**Assessment Task:**
+Variable Name: {variable_name}
+Variable Type: Boolean (true/false)
+
+**Instructions:**
+{instructions}
+{uncertainty_instructions}
+{edge_case_instructions}
+{golden_examples_section}
+
+**Output Format:**
+You must respond with a valid JSON object in this exact format:
+{{
+    "value": true,
+    "confidence": 95,
+    "source_text": "relevant excerpt from document that supports this assessment"
+}}
+
+**Guidelines:**
+1. Respond with true or false (boolean, not string)
+2. true = condition is explicitly or implicitly present/affirmed in document
+3. false = condition is explicitly denied or absent from document
+4. If evidence is insufficient or contradictory, set value to null
+5. confidence: 0-100 scale (100 = explicit statement, 50 = inferred, 0 = unclear)
+6. source_text: Include the passage that supports your assessment (max 200 characters)
+7. Be conservative - only return true/false if you have clear evidence
+8. Do not assume or infer beyond what the document explicitly states
+
+**{input_label}:**
+{{document_text}}"""
+
+_LOCATION_PROMPT_TEMPLATE = """You are a precise data extraction assistant. Extract geographical location information from the provided {input_label_lower}.
+
+{project_context}
+{uoo_framing}
+
+**Extraction Task:**
+Variable Name: {variable_name}
+Variable Type: Location (geographical location, address, or place name)
+
+**Instructions:**
+{instructions}
+{uncertainty_instructions}
+{edge_case_instructions}
+{golden_examples_section}
+
+**Output Format:**
+You must respond with a valid JSON object in this exact format:
+{{
+    "value": "extracted location here",
+    "confidence": 95,
+    "source_text": "relevant excerpt from document mentioning this location"
+}}
+
+**Guidelines:**
+1. Extract the location name exactly as it appears in the document (preserve spelling, capitalization)
+2. Locations may be:
+   - Countries (e.g., "United States", "Jordan")
+   - Cities/towns (e.g., "Amman", "New York City")
+   - Regions/provinces (e.g., "Balqa Governorate", "California")
+   - Addresses (e.g., "123 King Abdullah St, Amman")
+   - Landmarks/buildings (e.g., "Parliament Building", "Central Market")
+   - Geographical features (e.g., "Jordan River", "Dead Sea")
+3. If multiple locations are mentioned, extract the most relevant one based on the instructions
+4. If no location is found, set value to null
+5. confidence: 0-100 scale (100 = explicitly mentioned, 50 = inferred from context, 0 = not found)
+6. source_text: Include the full sentence or phrase mentioning the location (max 200 characters)
+7. Be precise - only extract locations, not general directional terms (e.g., "north", "south")
+8. Preserve original language/script if the document uses non-Latin characters
+
+**{input_label}:**
+{{document_text}}"""
+
 
 def generate_prompt(variable: Variable, project: Optional[Project] = None) -> Dict[str, Any]:
     """
@@ -23,24 +254,13 @@ def generate_prompt(variable: Variable, project: Optional[Project] = None) -> Di
         Dictionary with 'prompt_text' and 'model_config' keys
     """
     # Get project context and UoO framing
-    project_context = _build_project_context(project) if project else ""
-    uoo_framing, input_label = _build_uoo_framing(project)
+    project_context, uoo_framing, input_label = _project_sections(project)
 
     # Generate prompt based on variable type
-    if variable.type == VariableType.TEXT:
-        prompt_text = _generate_text_prompt(variable, project_context, uoo_framing, input_label)
-    elif variable.type == VariableType.CATEGORY:
-        prompt_text = _generate_category_prompt(variable, project_context, uoo_framing, input_label)
-    elif variable.type == VariableType.NUMBER:
-        prompt_text = _generate_number_prompt(variable, project_context, uoo_framing, input_label)
-    elif variable.type == VariableType.DATE:
-        prompt_text = _generate_date_prompt(variable, project_context, uoo_framing, input_label)
-    elif variable.type == VariableType.BOOLEAN:
-        prompt_text = _generate_boolean_prompt(variable, project_context, uoo_framing, input_label)
-    elif variable.type == VariableType.LOCATION:
-        prompt_text = _generate_location_prompt(variable, project_context, uoo_framing, input_label)
-    else:
+    builder = _PROMPT_BUILDERS.get(variable.type)
+    if builder is None:
         raise ValueError(f"Unknown variable type: {variable.type}")
+    prompt_text = builder(variable, project_context, uoo_framing, input_label)
 
     # Generate model configuration
     model_config = _generate_model_config(variable)
@@ -51,6 +271,47 @@ def generate_prompt(variable: Variable, project: Optional[Project] = None) -> Di
     }
 
 
+def _project_sections(project: Optional[Project]) -> Tuple[str, str, str]:
+    """
+    Get the project context and UoO framing, reusing recent results.
+
+    Prompts for every variable of a project share these sections. They are
+    cached by the values of the project fields they are built from, so an
+    edited project never reuses stale text.
+
+    Args:
+        project: Optional project model
+
+    Returns:
+        (project_context, uoo_framing, input_label)
+    """
+    if not project:
+        return "", "", "Document"
+
+    uoo = project.unit_of_observation or {}
+    key = (
+        project.name,
+        project.domain,
+        project.language,
+        project.scale,
+        bool(project.unit_of_observation),
+        uoo.get("rows_per_document"),
+        uoo.get("what_each_row_represents"),
+        uoo.get("entity_identification_pattern"),
+    )
+    sections = _project_sections_cache.get(key)
+    if sections is not None:
+        _project_sections_cache.move_to_end(key)
+        return sections
+
+    sections = (_build_project_context(project), *_build_uoo_framing(project))
+    _project_sections_cache[key] = sections
+    while len(_project_sections_cache) > PROJECT_SECTIONS_CACHE_SIZE:
+        _project_sections_cache.popitem(last=False)
+
+    return sections
+
+
 def _build_project_context(project: Project) -> str:
     """
     Build context string from project metadata.
@@ -223,10 +484,13 @@ def _build_golden_examples(variable: Variable) -> str:
     ]
     for i, ex in enumerate(examples[:5], 1):
         source = ex.get("source_text", "")[:300]
-        value = ex.get("value")
+        # Examples pinned through the API carry their value pre-serialized
+        value_json = ex.get("value_json")
+        if value_json is None:
+            value_json = json.dumps(ex.get("value"))
         lines.append(f"\nExample {i}:")
         lines.append(f'  Source text: "{source}"')
-        lines.append(f"  Expected output: {json.dumps(value)}")
+        lines.append(f"  Expected output: {value_json}")
 
     return "\n".join(lines)
 
@@ -240,49 +504,42 @@ def _build_common_sections(variable: Variable) -> tuple[str, str, str]:
     )
 
 
-def _generate_text_prompt(variable: Variable, project_context: str, uoo_framing: str = "", input_label: str = "Document") -> str:
+def _prompt_fields(variable: Variable, project_context: str, uoo_framing: str, input_label: str) -> Dict[str, str]:
     """
-    Generate prompt for TEXT variable type.
+    Collect the template fields shared by every variable type.
 
-    TEXT variables extract free-form text passages (e.g., descriptions, quotes, summaries).
+    Args:
+        variable: Variable model
+        project_context: Context string from _build_project_context
+        uoo_framing: Framing section from _build_uoo_framing
+        input_label: Label for the input text, e.g. "Document"
+
+    Returns:
+        Mapping of template field name to text
     """
     uncertainty_instructions, edge_case_instructions, golden_examples_section = _build_common_sections(variable)
+    return {
+        "input_label": input_label,
+        "input_label_lower": input_label.lower(),
+        "project_context": project_context,
+        "uoo_framing": uoo_framing,
+        "variable_name": variable.name,
+        "instructions": variable.instructions,
+        "uncertainty_instructions": uncertainty_instructions,
+        "edge_case_instructions": edge_case_instructions,
+        "golden_examples_section": golden_examples_section,
+    }
 
-    prompt = f"""You are a precise data extraction assistant. Extract the following information from the provided {input_label.lower()}.
-
-{project_context}
-{uoo_framing}
-
-**Extraction Task:**
-Variable Name: {variable.name}
-Variable Type: Text (free-form text)
-
-**Instructions:**
-{variable.instructions}
-{uncertainty_instructions}
-{edge_case_instructions}
-{golden_examples_section}
-
-**Output Format:**
-You must respond with a valid JSON object in this exact format:
-{{
-    "value": "extracted text here",
-    "confidence": 95,
-    "source_text": "relevant excerpt from document that supports this extraction"
-}}
 
-**Guidelines:**
-1. Extract the exact text as it appears in the document (preserve formatting, spelling, punctuation)
-2. If multiple instances exist, extract the most relevant or comprehensive one
-3. If information is not found or unclear, set value to null
-4. confidence: 0-100 scale (100 = certain, 50 = moderate, 0 = not found)
-5. source_text: Include the surrounding context (max 200 characters)
-6. Be precise and faithful to the source document
+def _generate_text_prompt(variable: Variable, project_context: str, uoo_framing: str = "", input_label: str = "Document") -> str:
+    """
+    Generate prompt for TEXT variable type.
 
-**{input_label}:**
-{{document_text}}
-"""
-    return prompt.strip()
+    TEXT variables extract free-form text passages (e.g., descriptions, quotes, summaries).
+    """
+    return _TEXT_PROMPT_TEMPLATE.format_map(
+        _prompt_fields(variable, project_context, uoo_framing, input_label)
+    )
 
 
 def _generate_category_prompt(variable: Variable, project_context: str, uoo_framing: str = "", input_label: str = "Document") -> str:
@@ -291,7 +548,7 @@ def _generate_category_prompt(variable: Variable, project_context: str, uoo_fram
 
     CATEGORY variables classify text into predefined categories.
     """
-    uncertainty_instructions, edge_case_instructions, golden_examples_section = _build_common_sections(variable)
+    fields = _prompt_fields(variable, project_context, uoo_framing, input_label)
 
     # Extract classification rules
     rules = variable.classification_rules or {}
@@ -300,53 +557,14 @@ def _generate_category_prompt(variable: Variable, project_context: str, uoo_fram
     allow_other = rules.get("allow_other", True)
 
     # Format categories list
-    categories_list = "\n".join([f"- {cat}" for cat in categories])
+    fields["categories_list"] = "\n".join([f"- {cat}" for cat in categories])
 
     # Build selection instructions
-    selection_type = "one or more categories" if allow_multiple else "exactly one category"
-    other_option = "\n- You may respond with a category not in the list if 'allow_other' is true and none fit well" if allow_other else ""
+    fields["selection_type"] = "one or more categories" if allow_multiple else "exactly one category"
+    fields["other_option"] = "\n- You may respond with a category not in the list if 'allow_other' is true and none fit well" if allow_other else ""
+    fields["value_example"] = '["category1", "category2"]' if allow_multiple else '"category_name"'
 
-    prompt = f"""You are a precise classification assistant. Categorize the following information from the provided {input_label.lower()}.
-
-{project_context}
-{uoo_framing}
-
-**Classification Task:**
-Variable Name: {variable.name}
-Variable Type: Category (classification)
-
-**Instructions:**
-{variable.instructions}
-{uncertainty_instructions}
-{edge_case_instructions}
-{golden_examples_section}
-
-**Available Categories:**
-{categories_list}{other_option}
-
-**Selection Rules:**
-- Select {selection_type} from the list above
-- Base your decision strictly on evidence in the document
-- If no category fits and 'allow_other' is false, respond with null
-
-**Output Format:**
-You must respond with a valid JSON object in this exact format:
-{{
-    "value": {"[\"category1\", \"category2\"]" if allow_multiple else "\"category_name\""},
-    "confidence": 95,
-    "source_text": "relevant excerpt from document that supports this classification"
-}}
-
-**Guidelines:**
-1. confidence: 0-100 scale (100 = clear match, 50 = ambiguous, 0 = not found)
-2. source_text: Include the passage that supports your classification (max 200 characters)
-3. Be conservative - only classify if you have clear evidence
-4. For ambiguous cases, reduce confidence score rather than forcing a category
-
-**{input_label}:**
-{{document_text}}
-"""
-    return prompt.strip()
+    return _CATEGORY_PROMPT_TEMPLATE.format_map(fields)
 
 
 def _generate_number_prompt(variable: Variable, project_context: str, uoo_framing: str = "", input_label: str = "Document") -> str:
@@ -355,44 +573,9 @@ def _generate_number_prompt(variable: Variable, project_context: str, uoo_framin
 
     NUMBER variables extract numerical values (integers or floats).
     """
-    uncertainty_instructions, edge_case_instructions, golden_examples_section = _build_common_sections(variable)
-
-    prompt = f"""You are a precise numerical data extraction assistant. Extract the following numerical value from the provided {input_label.lower()}.
-
-{project_context}
-{uoo_framing}
-
-**Extraction Task:**
-Variable Name: {variable.name}
-Variable Type: Number (integer or decimal)
-
-**Instructions:**
-{variable.instructions}
-{uncertainty_instructions}
-{edge_case_instructions}
-{golden_examples_section}
-
-**Output Format:**
-You must respond with a valid JSON object in this exact format:
-{{
-    "value": 42.5,
-    "confidence": 95,
-    "source_text": "relevant excerpt from document containing this number"
-}}
-
-**Guidelines:**
-1. Extract only the numerical value (no currency symbols, units, or formatting)
-2. Use decimal notation (e.g., 1234.56, not "1,234.56")
-3. If multiple numbers exist, extract the one most relevant to the instructions
-4. If the value is not found or ambiguous, set value to null
-5. confidence: 0-100 scale (100 = explicit number, 50 = calculated/inferred, 0 = not found)
-6. source_text: Include the exact phrase containing the number (max 200 characters)
-7. Be precise - do not estimate or calculate unless explicitly instructed
-
-**{input_label}:**
-{{document_text}}
-"""
-    return prompt.strip()
+    return _NUMBER_PROMPT_TEMPLATE.format_map(
+        _prompt_fields(variable, project_context, uoo_framing, input_label)
+    )
 
 
 def _generate_date_prompt(variable: Variable, project_context: str, uoo_framing: str = "", input_label: str = "Document") -> str:
@@ -401,46 +584,9 @@ def _generate_date_prompt(variable: Variable, project_context: str, uoo_framing:
 
     DATE variables extract dates in ISO 8601 format (YYYY-MM-DD).
     """
-    uncertainty_instructions, edge_case_instructions, golden_examples_section = _build_common_sections(variable)
-
-    prompt = f"""You are a precise date extraction assistant. Extract the following date from the provided {input_label.lower()}.
-
-{project_context}
-{uoo_framing}
-
-**Extraction Task:**
-Variable Name: {variable.name}
-Variable Type: Date
-
-**Instructions:**
-{variable.instructions}
-{uncertainty_instructions}
-{edge_case_instructions}
-{golden_examples_section}
-
-**Output Format:**
-You must respond with a valid JSON object in this exact format:
-{{
-    "value": "2024-03-15",
-    "confidence": 95,
-    "source_text": "relevant excerpt from document containing this date"
-}}
-
-**Guidelines:**
-1. Always format dates as YYYY-MM-DD (ISO 8601 standard)
-2. If only year is available, use YYYY-01-01
-3. If only year and month are available, use YYYY-MM-01
-4. Convert all date formats (e.g., "March 15, 2024", "15/03/2024", "Mar 15 2024") to YYYY-MM-DD
-5. If multiple dates exist, extract the one most relevant to the instructions
-6. If date is not found or ambiguous, set value to null
-7. confidence: 0-100 scale (100 = explicit date, 50 = partial/inferred, 0 = not found)
-8. source_text: Include the exact phrase containing the date (max 200 characters)
-9. Be careful with ambiguous formats (e.g., "03/04/2024" could be Mar 4 or Apr 3)
-
-**{input_label}:**
-{{document_text}}
-"""
-    return prompt.strip()
+    return _DATE_PROMPT_TEMPLATE.format_map(
+        _prompt_fields(variable, project_context, uoo_framing, input_label)
+    )
 
 
 def _generate_boolean_prompt(variable: Variable, project_context: str, uoo_framing: str = "", input_label: str = "Document") -> str:
@@ -449,45 +595,9 @@ def _generate_boolean_prompt(variable: Variable, project_context: str, uoo_frami
 
     BOOLEAN variables extract yes/no or true/false values.
     """
-    uncertainty_instructions, edge_case_instructions, golden_examples_section = _build_common_sections(variable)
-
-    prompt = f"""You are a precise boolean assessment assistant. Determine whether the following condition is true or false based on the provided {input_label.lower()}.
-
-{project_context}
-{uoo_framing}
-
-**Assessment Task:**
-Variable Name: {variable.name}
-Variable Type: Boolean (true/false)
-
-**Instructions:**
-{variable.instructions}
-{uncertainty_instructions}
-{edge_case_instructions}
-{golden_examples_section}
-
-**Output Format:**
-You must respond with a valid JSON object in this exact format:
-{{
-    "value": true,
-    "confidence": 95,
-    "source_text": "relevant excerpt from document that supports this assessment"
-}}
-
-**Guidelines:**
-1. Respond with true or false (boolean, not string)
-2. true = condition is explicitly or implicitly present/affirmed in document
-3. false = condition is explicitly denied or absent from document
-4. If evidence is insufficient or contradictory, set value to null
-5. confidence: 0-100 scale (100 = explicit statement, 50 = inferred, 0 = unclear)
-6. source_text: Include the passage that supports your assessment (max 200 characters)
-7. Be conservative - only return true/false if you have clear evidence
-8. Do not assume or infer beyond what the document explicitly states
-
-**{input_label}:**
-{{document_text}}
-"""
-    return prompt.strip()
+    return _BOOLEAN_PROMPT_TEMPLATE.format_map(
+        _prompt_fields(variable, project_context, uoo_framing, input_label)
+    )
 
 
 def _generate_location_prompt(variable: Variable, project_context: str, uoo_framing: str = "", input_label: str = "Document") -> str:
@@ -496,51 +606,36 @@ def _generate_location_prompt(variable: Variable, project_context: str, uoo_fram
 
     LOCATION variables extract geographical locations, addresses, or place names.
     """
-    uncertainty_instructions, edge_case_instructions, golden_examples_section = _build_common_sections(variable)
-
-    prompt = f"""You are a precise data extraction assistant. Extract geographical location information from the provided {input_label.lower()}.
-
-{project_context}
-{uoo_framing}
-
-**Extraction Task:**
-Variable Name: {variable.name}
-Variable Type: Location (geographical location, address, or place name)
-
-**Instructions:**
-{variable.instructions}
-{uncertainty_instructions}
-{edge_case_instructions}
-{golden_examples_section}
-
-**Output Format:**
-You must respond with a valid JSON object in this exact format:
-{{
-    "value": "extracted location here",
-    "confidence": 95,
-    "source_text": "relevant excerpt from document mentioning this location"
-}}
+    return _LOCATION_PROMPT_TEMPLATE.format_map(
+        _prompt_fields(variable, project_context, uoo_framing, input_label)
+    )
 
-**Guidelines:**
-1. Extract the location name exactly as it appears in the document (preserve spelling, capitalization)
-2. Locations may be:
-   - Countries (e.g., "United States", "Jordan")
-   - Cities/towns (e.g., "Amman", "New York City")
-   - Regions/provinces (e.g., "Balqa Governorate", "California")
-   - Addresses (e.g., "123 King Abdullah St, Amman")
-   - Landmarks/buildings (e.g., "Parliament Building", "Central Market")
-   - Geographical features (e.g., "Jordan River", "Dead Sea")
-3. If multiple locations are mentioned, extract the most relevant one based on the instructions
-4. If no location is found, set value to null
-5. confidence: 0-100 scale (100 = explicitly mentioned, 50 = inferred from context, 0 = not found)
-6. source_text: Include the full sentence or phrase mentioning the location (max 200 characters)
-7. Be precise - only extract locations, not general directional terms (e.g., "north", "south")
-8. Preserve original language/script if the document uses non-Latin characters
 
-**{input_label}:**
-{{document_text}}
-"""
-    return prompt.strip()
+# Prompt builder per variable type
+_PROMPT_BUILDERS: Dict[VariableType, Callable[[Variable, str, str, str], str]] = {
+    VariableType.TEXT: _generate_text_prompt,
+    VariableType.CATEGORY: _generate_category_prompt,
+    VariableType.NUMBER: _generate_number_prompt,
+    VariableType.DATE: _generate_date_prompt,
+    VariableType.BOOLEAN: _generate_boolean_prompt,
+    VariableType.LOCATION: _generate_location_prompt,
+}
+
+# Sampling settings per variable type
+_MODEL_CONFIGS: Dict[VariableType, Dict[str, Any]] = {
+    # Text extraction: moderate temperature, longer output
+    VariableType.TEXT: {"temperature": 0.2, "max_tokens": 2000},
+    # Classification: very low temperature for consistency
+    VariableType.CATEGORY: {"temperature": 0.1, "max_tokens": 500},
+    # Numerical extraction: lowest temperature for precision
+    VariableType.NUMBER: {"temperature": 0.0, "max_tokens": 300},
+    # Date extraction: lowest temperature for precision
+    VariableType.DATE: {"temperature": 0.0, "max_tokens": 300},
+    # Boolean assessment: very low temperature
+    VariableType.BOOLEAN: {"temperature": 0.1, "max_tokens": 300},
+    # Location extraction: low temperature for precision
+    VariableType.LOCATION: {"temperature": 0.1, "max_tokens": 500},
+}
 
 
 def _generate_model_config(variable: Variable) -> Dict[str, Any]:
@@ -553,41 +648,9 @@ def _generate_model_config(variable: Variable) -> Dict[str, Any]:
     Returns:
         Dictionary with model configuration parameters
     """
-    # Base configuration for all types
-    config = {
+    # Base configuration for all types, plus type-specific settings
+    return {
         "model": "gpt-4",
         "top_p": 1.0,
+        **_MODEL_CONFIGS.get(variable.type, {}),
     }
-
-    # Type-specific configuration
-    if variable.type == VariableType.TEXT:
-        # Text extraction: moderate temperature, longer output
-        config["temperature"] = 0.2
-        config["max_tokens"] = 2000
-
-    elif variable.type == VariableType.CATEGORY:
-        # Classification: very low temperature for consistency
-        config["temperature"] = 0.1
-        config["max_tokens"] = 500
-
-    elif variable.type == VariableType.NUMBER:
-        # Numerical extraction: lowest temperature for precision
-        config["temperature"] = 0.0
-        config["max_tokens"] = 300
-
-    elif variable.type == VariableType.DATE:
-        # Date extraction: lowest temperature for precision
-        config["temperature"] = 0.0
-        config["max_tokens"] = 300
-
-    elif variable.type == VariableType.BOOLEAN:
-        # Boolean assessment: very low temperature
-        config["temperature"] = 0.1
-        config["max_tokens"] = 300
-
-    elif variable.type == VariableType.LOCATION:
-        # Location extraction: low temperature for precision
-        config["temperature"] = 0.1
-        config["max_tokens"] = 500
-
-    return config
@@ -2,25 +2,39 @@
 Robust JSON response parser for LLM extraction outputs.
 
 Ported from reference_backend/response_openai.py clean_response() and enhanced
-with fallback brace-matching and key validation.
+with embedded-object fallback and key validation.
 """
 import json
 import logging
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Opening and closing markdown code fences around the whole response
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```\s*$")
+
+# Python literals rewritten to their JSON spelling
+_PYTHON_LITERALS = re.compile(r"True|False|None")
+_JSON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Whitespace after an opening brace or bracket
+_OPEN_BRACKET_WHITESPACE = re.compile(r"([\{\[])\s+")
+
 
 def clean_response(response: Optional[str]) -> Optional[Dict[str, Any]]:
     """
     Clean and parse an LLM JSON response.
 
     Steps:
-    1. Strip markdown code fences (```json ... ```)
-    2. Normalize Python booleans/None to JSON equivalents
-    3. json.loads with fallback brace-matching
-    4. Return parsed dict or None on failure
+    1. Reject responses without a "{", which cannot hold an object;
+       otherwise json.loads the stripped response as is (most are clean)
+    2. Otherwise strip markdown code fences (```json ... ```)
+    3. Normalize Python booleans/None to JSON equivalents
+    4. json.loads, falling back to the first embedded JSON object
+    5. Return parsed dict or None on failure
 
     Args:
         response: Raw LLM response string
@@ -33,17 +47,28 @@ def clean_response(response: Optional[str]) -> Optional[Dict[str, Any]]:
 
     cleaned = response.strip()
 
+    # Without a brace there is no object to recover, so empty responses,
+    # refusals and other plain-text answers are rejected before any parsing
+    if "{" not in cleaned:
+        logger.warning("Failed to parse LLM response: %s...", response[:200])
+        return None
+
+    # Fast path: already valid JSON, so no cleanup is needed (and none
+    # can rewrite "None" or "True" inside string values)
+    try:
+        parsed = json.loads(cleaned)
+        return parsed if isinstance(parsed, dict) else None
+    except json.JSONDecodeError:
+        pass
+
     # Strip markdown code fences
-    cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned)
-    cleaned = re.sub(r"\s*```\s*$", "", cleaned)
-    cleaned = cleaned.strip()
+    cleaned = _CODE_FENCE.sub("", cleaned).strip()
 
-    # Normalize Python booleans/None to JSON
-    cleaned = cleaned.replace("True", "true").replace("False", "false")
-    cleaned = cleaned.replace("None", "null")
+    # Normalize Python booleans/None to JSON in one pass
+    cleaned = _PYTHON_LITERALS.sub(lambda match: _JSON_LITERALS[match.group()], cleaned)
 
     # Remove newlines inside JSON (preserve structure)
-    cleaned = re.sub(r"(\{|\[)\s+", r"\1", cleaned)
+    cleaned = _OPEN_BRACKET_WHITESPACE.sub(r"\1", cleaned)
     cleaned = cleaned.replace("\n", " ")
 
     # Attempt JSON parse
@@ -55,18 +80,22 @@ def clean_response(response: Optional[str]) -> Optional[Dict[str, Any]]:
     except json.JSONDecodeError:
         pass
 
-    # Fallback: extract first JSON object via brace matching
+    # Fallback: extract the first JSON object embedded in the text
     result = _extract_json_object(cleaned)
     if result is not None:
         return result
 
-    logger.warning(f"Failed to parse LLM response: {response[:200]}...")
+    logger.warning("Failed to parse LLM response: %s...", response[:200])
     return None
 
 
 def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
     """
-    Extract the first JSON object from text using brace matching.
+    Extract the first JSON object embedded in text.
+
+    Decodes from each "{" in turn with the C-accelerated JSON decoder, so
+    braces in surrounding prose or in an invalid block do not hide a valid
+    object further on.
 
     Args:
         text: Text potentially containing a JSON object
@@ -75,42 +104,47 @@ def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
         Parsed dict or None
     """
     start = text.find("{")
-    if start == -1:
-        return None
-
-    depth = 0
-    in_string = False
-    escape_next = False
+    while start != -1:
+        try:
+            parsed, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+        start = text.find("{", start + 1)
 
-    for i in range(start, len(text)):
-        char = text[i]
+    return None
 
-        if escape_next:
-            escape_next = False
-            continue
 
-        if char == "\\":
-            escape_next = True
-            continue
+def _normalize_extraction(parsed: Dict[str, Any], response_text: str) -> Dict[str, Any]:
+    """
+    Build a standardized result dict from one parsed extraction object.
 
-        if char == '"':
-            in_string = not in_string
-            continue
+    Args:
+        parsed: Parsed object with value, confidence and source_text keys
+        response_text: Raw response the object was parsed from
 
-        if in_string:
-            continue
+    Returns:
+        Dict with keys: value, confidence, source_text, raw_response
+    """
+    # Extract and validate fields
+    value = parsed.get("value")
+    confidence = parsed.get("confidence", 50)
+    source_text = parsed.get("source_text")
 
-        if char == "{":
-            depth += 1
-        elif char == "}":
-            depth -= 1
-            if depth == 0:
-                try:
-                    return json.loads(text[start : i + 1])
-                except json.JSONDecodeError:
-                    return None
+    # Ensure confidence is an integer in range
+    try:
+        confidence = int(confidence)
+    except (TypeError, ValueError):
+        confidence = 50
+    confidence = max(0, min(100, confidence))
 
-    return None
+    return {
+        "value": value,
+        "confidence": confidence,
+        "source_text": source_text,
+        "raw_response": response_text,
+    }
 
 
 def parse_extraction_response(response_text: str) -> Dict[str, Any]:
@@ -137,21 +171,50 @@ def parse_extraction_response(response_text: str) -> Dict[str, Any]:
             "raw_response": response_text,
         }
 
-    # Extract and validate fields
-    value = parsed.get("value")
-    confidence = parsed.get("confidence", 50)
-    source_text = parsed.get("source_text")
+    return _normalize_extraction(parsed, response_text)
 
-    # Ensure confidence is an integer in range
-    try:
-        confidence = int(confidence)
-    except (TypeError, ValueError):
-        confidence = 50
-    confidence = max(0, min(100, confidence))
 
-    return {
-        "value": value,
-        "confidence": confidence,
-        "source_text": source_text,
-        "raw_response": response_text,
-    }
+def parse_batch_extraction_response(
+    response_text: str,
+    variable_names: List[str],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse an LLM response that extracts several variables at once.
+
+    The response is expected to hold one extraction object per variable,
+    keyed by variable name, under an "extractions" key (a bare mapping is
+    also accepted). Each object is validated like parse_extraction_response.
+
+    Args:
+        response_text: Raw response from LLM
+        variable_names: Names of the variables that were requested
+
+    Returns:
+        Dict mapping each variable name to a standardized result dict;
+        variables missing from the response get an error result
+    """
+    parsed = clean_response(response_text)
+
+    if parsed is None:
+        error = "Failed to parse JSON response"
+        entries = {}
+    else:
+        error = "Variable missing from batch response"
+        entries = parsed.get("extractions", parsed)
+        if not isinstance(entries, dict):
+            entries = {}
+
+    results = {}
+    for name in variable_names:
+        entry = entries.get(name)
+        if isinstance(entry, dict):
+            results[name] = _normalize_extraction(entry, response_text)
+        else:
+            results[name] = {
+                "value": None,
+                "confidence": 0,
+                "source_text": None,
+                "error": error,
+                "raw_response": response_text,
+            }
+    return results
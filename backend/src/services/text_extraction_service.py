@@ -2,6 +2,8 @@
 Text Extraction Service using OpenAI API with circuit breaker protection.
 """
 import asyncio
+import functools
+import json
 import logging
 import time
 from enum import Enum
@@ -10,9 +12,13 @@ from typing import Any, Dict, List, Optional
 from openai import AsyncOpenAI
 
 from src.core.config import settings
+from src.core.rate_limiter import estimate_tokens, get_llm_throttle
 from src.core.tracing import get_tracer
 from src.models.variable import Variable, VariableType
-from src.services.response_parser import parse_extraction_response
+from src.services.response_parser import (
+    parse_batch_extraction_response,
+    parse_extraction_response,
+)
 
 _tracer = get_tracer(__name__)
 
@@ -91,7 +97,8 @@ class TextExtractionService:
 
     def __init__(self, api_key: Optional[str] = None):
         from src.core.mock_llm import is_mock_mode, MockOpenAIClient
-        if is_mock_mode():
+        mock_mode = is_mock_mode()
+        if mock_mode:
             self.client = MockOpenAIClient()
             logger.info("[MockLLM] TextExtractionService using mock client (no real API key)")
         else:
@@ -100,6 +107,31 @@ class TextExtractionService:
         self.default_temperature = 0.1
         self.default_top_p = 0.2
 
+        # Shared per-model request/token budget (None when disabled)
+        self.throttle = None if mock_mode else get_llm_throttle(self.default_model)
+
+    async def _create_completion(self, messages: List[Dict[str, str]], **kwargs):
+        """
+        Call the chat completions API with the default model.
+
+        Concurrent documents share one budget per model, so each call waits
+        for it here instead of running into 429s.
+
+        Args:
+            messages: Chat messages
+            **kwargs: Further arguments for chat.completions.create
+
+        Returns:
+            Chat completion response
+        """
+        if self.throttle:
+            await self.throttle.acquire(
+                sum(estimate_tokens(message["content"]) for message in messages)
+            )
+        return await self.client.chat.completions.create(
+            model=self.default_model, messages=messages, **kwargs,
+        )
+
     async def extract_variable(
         self,
         text: str,
@@ -143,8 +175,7 @@ class TextExtractionService:
 
         for attempt in range(max_retries):
             try:
-                response = await self.client.chat.completions.create(
-                    model=self.default_model,
+                response = await self._create_completion(
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt},
@@ -253,8 +284,7 @@ Rules:
 
         for attempt in range(max_retries):
             try:
-                response = await self.client.chat.completions.create(
-                    model=self.default_model,
+                response = await self._create_completion(
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt},
@@ -263,7 +293,6 @@ Rules:
                     response_format={"type": "json_object"},
                 )
 
-                import json
                 response_text = response.choices[0].message.content
                 if not response_text:
                     continue
@@ -325,8 +354,7 @@ Rules:
 
         for attempt in range(max_retries):
             try:
-                response = await self.client.chat.completions.create(
-                    model=self.default_model,
+                response = await self._create_completion(
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt},
@@ -445,6 +473,176 @@ Rules:
                 results.append(extraction)
             return results
 
+    async def extract_document(
+        self,
+        text: str,
+        variables: List[Variable],
+        prompts: Optional[Dict[str, str]] = None,
+        max_concurrency: int = 5,
+        max_retries: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract all variables from text, batching variables into one LLM call.
+
+        Variables without a stored prompt are requested together in a single
+        completion, so the document text is sent once rather than once per
+        variable. Variables with a stored prompt keep their own call, since
+        that prompt is written for a single value.
+
+        Args:
+            text: Document text
+            variables: List of variables to extract
+            prompts: Optional mapping of variable_id -> prompt_text
+            max_concurrency: Max concurrent LLM calls for prompted variables
+            max_retries: Max retry attempts for the batched call
+
+        Returns:
+            List of extraction result dicts, in the order of variables
+        """
+        prompts = prompts or {}
+        batched = [v for v in variables if not prompts.get(str(v.id))]
+        if len(batched) < 2:
+            # Nothing to batch; extract each variable with its own call
+            return await self.extract_all_variables(
+                text, variables, prompts or None, max_concurrency=max_concurrency,
+            )
+        prompted = [v for v in variables if prompts.get(str(v.id))]
+
+        with _tracer.start_as_current_span("extract_document") as span:
+            span.set_attribute("text.length", len(text))
+            span.set_attribute("variables.count", len(variables))
+            span.set_attribute("variables.batched", len(batched))
+            batch_results, prompted_results = await asyncio.gather(
+                self._extract_batch_impl(text, batched, max_retries),
+                self._extract_all_variables_impl(
+                    text, prompted, prompts, True, max_concurrency,
+                ),
+            )
+
+        results_by_id = {r["variable_id"]: r for r in prompted_results}
+        for variable in batched:
+            extraction = batch_results[variable.name]
+            extraction["variable_id"] = str(variable.id)
+            extraction["variable_name"] = variable.name
+            results_by_id[str(variable.id)] = extraction
+
+        return [results_by_id[str(v.id)] for v in variables]
+
+    async def _extract_batch_impl(
+        self,
+        text: str,
+        variables: List[Variable],
+        max_retries: int,
+    ) -> Dict[str, Dict[str, Any]]:
+        names = [v.name for v in variables]
+
+        def _failed(error: str) -> Dict[str, Dict[str, Any]]:
+            return {
+                name: {"value": None, "confidence": 0, "source_text": None, "error": error}
+                for name in names
+            }
+
+        if not _circuit_breaker.check():
+            logger.warning("Circuit breaker OPEN — skipping batched LLM call")
+            return _failed("Circuit breaker open — LLM temporarily unavailable")
+
+        system_prompt = self._build_batch_system_prompt(variables)
+        user_prompt = self._build_batch_user_prompt(text, variables)
+
+        for attempt in range(max_retries):
+            try:
+                response = await self._create_completion(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    temperature=self.default_temperature,
+                    top_p=self.default_top_p,
+                    response_format={"type": "json_object"},
+                )
+
+                response_text = response.choices[0].message.content
+                if not response_text:
+                    continue
+
+                results = parse_batch_extraction_response(response_text, names)
+                _circuit_breaker.record_success()
+                return results
+
+            except Exception as e:
+                _circuit_breaker.record_failure()
+                if attempt < max_retries - 1:
+                    delay = min(2 ** attempt, settings.LLM_RETRY_MAX_DELAY)
+                    logger.warning(
+                        f"Batched API call failed (attempt {attempt + 1}/{max_retries}): {e}. "
+                        f"Retrying in {delay}s..."
+                    )
+                    await asyncio.sleep(delay)
+                    if not _circuit_breaker.check():
+                        return _failed("Circuit breaker open — LLM temporarily unavailable")
+                else:
+                    logger.error(f"Batched API call failed after {max_retries} attempts: {e}")
+                    return _failed(str(e))
+
+        return _failed("Max retries exceeded")
+
+    def _build_batch_system_prompt(self, variables: List[Variable]) -> str:
+        """Build a system prompt requesting several variables in one response."""
+        variable_lines = []
+        for variable in variables:
+            line = f"- {variable.name} ({variable.type.value}): {variable.instructions}"
+            if variable.type == VariableType.CATEGORY and variable.classification_rules:
+                categories = variable.classification_rules.get("categories", [])
+                line += f" Categories: {', '.join(categories)}"
+            variable_lines.append(line)
+        variable_list = "\n".join(variable_lines)
+
+        return f"""You are a data extraction assistant. Your task is to extract several pieces of information from text.
+
+Variables to extract:
+{variable_list}
+
+Value formats by type:
+- DATE: ISO format (YYYY-MM-DD)
+- NUMBER: the number as a string, without units unless specifically required
+- BOOLEAN: "true" or "false"
+- CATEGORY: exactly one of the listed categories
+- TEXT: the requested information as text
+
+Return your response as JSON with one entry per variable, keyed by variable name:
+{{
+    "extractions": {{
+        "variable_name": {{
+            "value": "extracted value or null if not found",
+            "confidence": 85,  // confidence score 0-100
+            "source_text": "the exact text segment where this information was found"
+        }}
+    }}
+}}
+
+IMPORTANT RULES:
+1. Only extract information explicitly stated or strongly implied in the text
+2. If information is not present, set value to null
+3. Provide realistic confidence scores (0-100)
+4. Always include the source_text showing where you found the information
+5. Include every variable listed above
+6. Respond ONLY with valid JSON, no additional text
+"""
+
+    def _build_batch_user_prompt(self, text: str, variables: List[Variable]) -> str:
+        """Build user prompt for a batched extraction."""
+        return f"""Please analyze the following text and extract the requested information:
+
+TEXT TO ANALYZE:
+---
+{text}
+---
+
+Extract: {', '.join(v.name for v in variables)}
+
+Remember to respond with valid JSON only.
+"""
+
     def _build_system_prompt(self, variable: Variable) -> str:
         """Build system prompt based on variable type and instructions."""
         base_prompt = f"""You are a data extraction assistant. Your task is to extract specific information from text.
@@ -552,6 +750,13 @@ Remember to respond with valid JSON only.
 """
 
 
+@functools.lru_cache(maxsize=8)
 def create_extraction_service(api_key: Optional[str] = None) -> TextExtractionService:
-    """Create and return a TextExtractionService instance."""
+    """
+    Create and return a TextExtractionService instance.
+
+    Services are cached per API key, so every job in a worker process shares
+    one OpenAI client and its connection pool. The service keeps no
+    per-request state, so sharing is safe.
+    """
     return TextExtractionService(api_key=api_key)
@@ -10,7 +10,7 @@ from uuid import UUID
 from sqlalchemy import select
 
 from src.models.project import Project
-from src.services.export_service import ExportService
+from src.services.export_service import ExportService, write_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -48,9 +48,8 @@ async def process_export_job(
                 )
                 ext = "csv"
             elif format == "CSV_LONG":
-                content = await export_service.generate_csv_long(
-                    pid, include_confidence, include_source_text, min_confidence
-                )
+                # Streamed straight to disk below
+                content = None
                 ext = "csv"
             elif format == "EXCEL":
                 content = await export_service.generate_excel(
@@ -71,15 +70,24 @@ async def process_export_job(
             temp_dir = tempfile.gettempdir()
             file_path = os.path.join(temp_dir, filename)
 
-            with open(file_path, "wb") as f:
-                f.write(content)
+            if content is None:
+                size_bytes = await write_chunks(
+                    file_path,
+                    export_service.generate_csv_long_stream(
+                        pid, include_confidence, include_source_text, min_confidence
+                    ),
+                )
+            else:
+                with open(file_path, "wb") as f:
+                    f.write(content)
+                size_bytes = len(content)
 
-            logger.info(f"Export completed: {filename} ({len(content)} bytes)")
+            logger.info(f"Export completed: {filename} ({size_bytes} bytes)")
             return {
                 "status": "completed",
                 "filename": filename,
                 "download_url": f"/api/v1/exports/download/{filename}",
-                "size_bytes": len(content),
+                "size_bytes": size_bytes,
             }
 
         except Exception as e:
@@ -5,12 +5,15 @@ Moves the extraction logic from job_manager.process_job_background into an ARQ t
 Supports parallel document processing with configurable concurrency.
 """
 import asyncio
+import json
 import logging
 import time
+from datetime import datetime
+from itertools import islice
 from typing import Dict, List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.document import Document
@@ -22,7 +25,15 @@ from src.models.project import Project
 from src.models.prompt import Prompt
 from src.models.variable import Variable
 from src.core.config import settings
-from src.services.post_processor import post_process_extraction
+from src.core.mock_llm import is_mock_mode
+from src.services.extraction_cache import (
+    content_hash,
+    load_cached_extractions,
+    purge_cached_extractions,
+    store_cached_extractions,
+    variable_hash,
+)
+from src.services.post_processor import compile_variable, post_process_extraction
 from src.services.text_extraction_service import create_extraction_service
 
 logger = logging.getLogger(__name__)
@@ -30,6 +41,47 @@ logger = logging.getLogger(__name__)
 MAX_CONSECUTIVE_FAILURES = 10
 MAX_PARALLEL_DOCUMENTS = 5  # Concurrent documents per job
 CHECKPOINT_INTERVAL = settings.WORKER_CHECKPOINT_INTERVAL
+MAX_SOURCE_TEXT_LENGTH = 2000  # Characters of LLM source_text kept per extraction
+COPY_MIN_ROWS = 100  # Extraction batches at least this large use COPY on asyncpg
+
+# Columns written by COPY; defaults applied by the ORM must be supplied here
+_EXTRACTION_COPY_COLUMNS = (
+    "id", "job_id", "document_id", "variable_id", "value", "confidence",
+    "source_text", "status", "error_message", "entity_index", "entity_text",
+    "prompt_version", "created_at",
+)
+
+# Extraction status by (should_skip, should_flag, has value): skipped values
+# fail, flagged values are flagged, otherwise a value counts as extracted
+_EXTRACTION_STATUS = {
+    (True, True, True): ExtractionStatus.FAILED,
+    (True, True, False): ExtractionStatus.FAILED,
+    (True, False, True): ExtractionStatus.FAILED,
+    (True, False, False): ExtractionStatus.FAILED,
+    (False, True, True): ExtractionStatus.FLAGGED,
+    (False, True, False): ExtractionStatus.FLAGGED,
+    (False, False, True): ExtractionStatus.EXTRACTED,
+    (False, False, False): ExtractionStatus.FAILED,
+}
+
+
+def _log_row(
+    job_id: UUID,
+    level: LogLevel,
+    event_type: EventType,
+    message: str,
+    document_id: Optional[str] = None,
+    metadata: Optional[dict] = None,
+) -> dict:
+    """Helper to build a structured processing log entry as insert values."""
+    return {
+        "job_id": job_id,
+        "document_id": document_id,
+        "log_level": level,
+        "event_type": event_type,
+        "message": message,
+        "metadata_": metadata,
+    }
 
 
 def _create_log(
@@ -41,30 +93,88 @@ def _create_log(
     metadata: Optional[dict] = None,
 ) -> ProcessingLog:
     """Helper to create a structured processing log entry."""
-    return ProcessingLog(
-        job_id=job_id,
-        document_id=document_id,
-        log_level=level,
-        event_type=event_type,
-        message=message,
-        metadata_=metadata,
+    return ProcessingLog(**_log_row(job_id, level, event_type, message, document_id, metadata))
+
+
+def _clip_source_text(source_text):
+    """Truncate an LLM source excerpt before it is stored."""
+    if isinstance(source_text, str):
+        return source_text[:MAX_SOURCE_TEXT_LENGTH]
+    return source_text
+
+
+async def _insert_extractions(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    Insert extraction rows in bulk.
+
+    Large batches on asyncpg go through the binary COPY protocol on the
+    session's own connection, so they stay inside the current savepoint.
+    Smaller batches and other drivers use a multi-row INSERT.
+    """
+    if len(rows) < COPY_MIN_ROWS or db.get_bind().dialect.driver != "asyncpg":
+        await db.execute(insert(Extraction), rows)
+        return
+
+    created_at = datetime.utcnow()
+    records = [
+        (
+            uuid4(), row["job_id"], row["document_id"], row["variable_id"],
+            # JSONB is passed as JSON text; None is stored as JSON null, as
+            # the ORM does
+            json.dumps(row["value"], default=str), row["confidence"],
+            row["source_text"], row["status"].value, row["error_message"],
+            row.get("entity_index"), row.get("entity_text"),
+            row["prompt_version"], created_at,
+        )
+        for row in rows
+    ]
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        Extraction.__tablename__,
+        records=records,
+        columns=_EXTRACTION_COPY_COLUMNS,
     )
 
 
 async def _load_active_prompts(db: AsyncSession, variables: list) -> Dict[str, tuple]:
-    """Load the active (highest version) prompt for each variable."""
-    prompts: Dict[str, tuple] = {}
-    for variable in variables:
-        result = await db.execute(
-            select(Prompt)
-            .where(Prompt.variable_id == variable.id, Prompt.is_active == True)
-            .order_by(Prompt.version.desc())
-            .limit(1)
+    """Load the active (highest version) prompt for each variable in one query."""
+    variable_ids = [variable.id for variable in variables]
+    if not variable_ids:
+        return {}
+
+    is_active = Prompt.is_active == True
+    if db.get_bind().dialect.name == "postgresql":
+        query = (
+            select(Prompt.variable_id, Prompt.prompt_text, Prompt.version)
+            .where(Prompt.variable_id.in_(variable_ids), is_active)
+            .order_by(Prompt.variable_id, Prompt.version.desc())
+            .distinct(Prompt.variable_id)
+        )
+    else:
+        ranked = (
+            select(
+                Prompt.variable_id,
+                Prompt.prompt_text,
+                Prompt.version,
+                func.row_number().over(
+                    partition_by=Prompt.variable_id,
+                    order_by=Prompt.version.desc(),
+                ).label("rank"),
+            )
+            .where(Prompt.variable_id.in_(variable_ids), is_active)
+            .subquery()
+        )
+        query = (
+            select(ranked.c.variable_id, ranked.c.prompt_text, ranked.c.version)
+            .where(ranked.c.rank == 1)
         )
-        prompt = result.scalar_one_or_none()
-        if prompt:
-            prompts[str(variable.id)] = (prompt.prompt_text, prompt.version)
-    return prompts
+
+    result = await db.execute(query)
+    return {
+        str(variable_id): (prompt_text, version)
+        for variable_id, prompt_text, version in result.all()
+    }
 
 
 async def _get_processed_doc_ids(db: AsyncSession, job_id: UUID) -> set:
@@ -79,7 +189,6 @@ async def _get_processed_doc_ids(db: AsyncSession, job_id: UUID) -> set:
 
 async def _publish_progress(ctx: dict, job_id: UUID, event_type: str, data: dict) -> None:
     """Publish job progress event to Redis pub/sub."""
-    import json
     redis = ctx.get("redis")
     if redis:
         channel = f"job:{job_id}:progress"
@@ -92,10 +201,12 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
     ARQ task: process an extraction job.
 
     Features:
-    - Atomic per-document savepoints
+    - Up to MAX_PARALLEL_DOCUMENTS documents extracted concurrently
+    - Atomic per-document transactions
     - Auto-pause on consecutive failures
     - Skip already-processed documents (for resume)
     - Idempotent reprocessing (delete-before-insert)
+    - Stored LLM results reused across retries and reruns
     - Prompt version tracking
     - Structured event logging
     - Redis pub/sub progress events
@@ -105,21 +216,35 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
 
     async with session_factory() as db:
         try:
-            # Load job
+            # Claim the job: transition PENDING/PAUSED -> PROCESSING and load
+            # it in one UPDATE ... RETURNING, so a job dispatched twice is
+            # only started once
             result = await db.execute(
-                select(ProcessingJob).where(ProcessingJob.id == job_uuid)
+                update(ProcessingJob)
+                .where(
+                    ProcessingJob.id == job_uuid,
+                    ProcessingJob.status.in_([JobStatus.PENDING, JobStatus.PAUSED]),
+                )
+                .values(
+                    status=JobStatus.PROCESSING,
+                    started_at=func.coalesce(ProcessingJob.started_at, datetime.utcnow()),
+                )
+                .returning(ProcessingJob)
             )
             job = result.scalar_one_or_none()
 
             if not job:
-                logger.error(f"Job {job_id} not found")
-                return {"status": "error", "message": "Job not found"}
+                status = (await db.execute(
+                    select(ProcessingJob.status).where(ProcessingJob.id == job_uuid)
+                )).scalar_one_or_none()
+                if status is None:
+                    logger.error(f"Job {job_id} not found")
+                    return {"status": "error", "message": "Job not found"}
 
-            # Transition to PROCESSING
-            job.transition_to(JobStatus.PROCESSING)
-            await db.commit()
+                logger.warning(f"Job {job_id} is {status.value}, not starting")
+                return {"status": "skipped", "message": f"Job is {status.value}"}
 
-            # Log start/resume
+            # Log start/resume; committed together with the claim
             is_resume = job.documents_processed > 0
             event = EventType.JOB_RESUMED if is_resume else EventType.JOB_STARTED
             db.add(_create_log(
@@ -159,20 +284,301 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
             # Get already-processed doc IDs (resumability)
             processed_doc_ids = await _get_processed_doc_ids(db, job.id)
 
-            # Build variable lookup
+            # Build variable lookups once per job rather than per row
             variable_by_id = {str(v.id): v for v in variables}
+            compiled_by_id = {vid: compile_variable(v) for vid, v in variable_by_id.items()}
+            variable_list = list(variables)
+            prompts_arg = prompt_texts or None
+            entity_variables = [
+                (variable, compiled_by_id[vid], prompt_texts.get(vid), prompt_versions.get(vid))
+                for vid, variable in variable_by_id.items()
+            ]
 
             # Initialize extraction service
             text_extraction_service = create_extraction_service()
+            if settings.EXTRACTION_BATCH_VARIABLES:
+                extract_document = text_extraction_service.extract_document
+            else:
+                extract_document = text_extraction_service.extract_all_variables
+
+            # Reuse stored LLM results for text and variables extracted
+            # before; mock results are never stored
+            use_cache = settings.EXTRACTION_CACHE_ENABLED and not is_mock_mode()
+            cache_model = text_extraction_service.default_model
+            variable_hashes = {
+                variable.id: variable_hash(variable, prompt_texts.get(vid))
+                for vid, variable in variable_by_id.items()
+            }
+
+            async def extract_segment(
+                text: str, text_hash: Optional[str], cached: dict
+            ) -> List[dict]:
+                """
+                Extract all variables from one text segment.
+
+                Variables with a stored result for this text are not sent to
+                the LLM. New results are stored in their own session right
+                away, so they survive a later failure of the document.
+
+                Args:
+                    text: Segment text
+                    text_hash: content_hash of text, or None when the cache
+                        is disabled
+                    cached: Stored results from load_cached_extractions
+
+                Returns:
+                    Extraction result dicts, in the order of variables
+                """
+                if text_hash is None:
+                    return await extract_document(
+                        text=text, variables=variable_list, prompts=prompts_arg,
+                    )
+
+                results: Dict[str, dict] = {}
+                missing = []
+                for vid, variable in variable_by_id.items():
+                    hit = cached.get((text_hash, variable.id))
+                    if hit is None:
+                        missing.append(variable)
+                    else:
+                        results[vid] = {**hit, "variable_id": vid, "variable_name": variable.name}
+
+                if missing:
+                    extractions = await extract_document(
+                        text=text, variables=missing, prompts=prompts_arg,
+                    )
+                    results.update((ext["variable_id"], ext) for ext in extractions)
+
+                    # Failed calls are not stored, so they are retried
+                    cache_rows = []
+                    for ext in extractions:
+                        if ext.get("error"):
+                            continue
+                        variable = variable_by_id[ext["variable_id"]]
+                        cache_rows.append({
+                            "variable_id": variable.id,
+                            "content_hash": text_hash,
+                            "model": cache_model,
+                            "variable_hash": variable_hashes[variable.id],
+                            "value": ext.get("value"),
+                            "confidence": ext.get("confidence"),
+                            "source_text": _clip_source_text(ext.get("source_text")),
+                        })
+                    if cache_rows:
+                        try:
+                            async with session_factory() as cache_db:
+                                await store_cached_extractions(cache_db, cache_rows)
+                                await cache_db.commit()
+                        except Exception as e:
+                            logger.warning(f"Failed to store LLM results: {str(e)}")
+
+                return [results[vid] for vid in variable_by_id]
 
             total_documents = len(job.document_ids)
 
-            for document_id in job.document_ids:
-                doc_uuid = UUID(document_id) if isinstance(document_id, str) else document_id
+            async def process_document(document_id: str, document) -> Optional[tuple]:
+                """
+                Extract and store one document in sessions of its own.
+
+                Documents run concurrently, and an AsyncSession cannot be
+                shared between tasks. The document is read in one short
+                session and written in another, so no connection is held
+                during LLM calls. The delete and inserts commit together,
+                so a failed document leaves no partial extractions.
+
+                Args:
+                    document_id: Document ID as stored on the job
+                    document: Preloaded (id, name, chunk_count) row, or None
+                        if missing
+
+                Returns:
+                    (document name, extraction count), or None if the
+                    document no longer exists
+                """
+                if document is None:
+                    return None
+
+                doc_uuid = document.id
+
+                # Reads and writes use short sessions of their own, so no
+                # pooled connection sits idle while the LLM is called
+                async with session_factory() as doc_db:
+                    # Resolve text source (chunks or full)
+                    chunk_texts = []
+                    if (document.chunk_count or 0) > 1:
+                        chunk_result = await doc_db.execute(
+                            select(DocumentChunk.text)
+                            .where(DocumentChunk.document_id == doc_uuid)
+                            .order_by(DocumentChunk.chunk_index)
+                        )
+                        chunk_texts = chunk_result.scalars().all()
+
+                    # The full body can be several MB, so it is only read
+                    # when there are no chunks or entities must be identified
+                    content = None
+                    if not chunk_texts or (is_entity_mode and entity_pattern):
+                        content = (await doc_db.execute(
+                            select(Document.content).where(Document.id == doc_uuid)
+                        )).scalar_one()
+
+                    text_segments = chunk_texts or [content]
+
+                    # Stored LLM results for document-level extraction
+                    segment_hashes = [None] * len(text_segments)
+                    cached = {}
+                    if use_cache and not (is_entity_mode and entity_pattern):
+                        segment_hashes = [content_hash(segment) for segment in text_segments]
+                        cached = await load_cached_extractions(
+                            doc_db, segment_hashes, variable_hashes, cache_model,
+                        )
+
+                extraction_rows: List[dict] = []
+                extraction_count = 0
+                if is_entity_mode and entity_pattern:
+                    # Entity-level extraction
+                    entities = await text_extraction_service.identify_entities(
+                        text=content,
+                        entity_pattern=entity_pattern,
+                    )
+
+                    if not entities:
+                        # Fallback: treat whole doc as single entity
+                        entities = [{"index": 0, "label": document.name, "text": ""}]
+
+                    for entity in entities:
+                        entity_index = entity.get("index")
+                        entity_text = entity.get("text", "")[:500]
+                        for variable, compiled, prompt_text, prompt_version in entity_variables:
+                            # Extract from best text segment
+                            best_result = None
+                            for segment in text_segments:
+                                result_data = await text_extraction_service.extract_variable_for_entity(
+                                    text=segment,
+                                    variable=variable,
+                                    entity=entity,
+                                    prompt_text=prompt_text,
+                                )
+                                if best_result is None or (result_data.get("confidence") or 0) > (best_result.get("confidence") or 0):
+                                    best_result = result_data
+
+                            extraction_data = best_result or {"value": None, "confidence": 0}
+                            extraction_data["variable_id"] = str(variable.id)
+                            extraction_data["variable_name"] = variable.name
+
+                            raw_value = extraction_data.get("value")
+                            raw_confidence = extraction_data.get("confidence", 0) or 0
+
+                            pp = post_process_extraction(raw_value, raw_confidence, compiled)
+                            final_value = pp["value"]
+                            final_confidence = pp["confidence"]
+                            error_msg = pp.get("error_message") or extraction_data.get("error")
+
+                            ex_status = _EXTRACTION_STATUS[
+                                pp["should_skip"], pp["should_flag"], final_value is not None
+                            ]
+
+                            extraction_rows.append({
+                                "job_id": job.id,
+                                "document_id": doc_uuid,
+                                "variable_id": variable.id,
+                                "value": final_value,
+                                "confidence": final_confidence,
+                                "source_text": _clip_source_text(extraction_data.get("source_text")),
+                                "prompt_version": prompt_version,
+                                "status": ex_status,
+                                "error_message": error_msg,
+                                "entity_index": entity_index,
+                                "entity_text": entity_text,
+                            })
+                            extraction_count += 1
+                else:
+                    # Document-level extraction (with chunk merging)
+                    if len(text_segments) > 1:
+                        merged: Dict[str, Dict] = {}
+                        for segment, segment_hash in zip(text_segments, segment_hashes):
+                            chunk_extractions = await extract_segment(
+                                segment, segment_hash, cached,
+                            )
+                            for ext in chunk_extractions:
+                                vid = ext["variable_id"]
+                                existing = merged.get(vid)
+                                if existing is None or (ext.get("confidence") or 0) > (existing.get("confidence") or 0):
+                                    merged[vid] = ext
+                        extractions = list(merged.values())
+                    else:
+                        extractions = await extract_segment(
+                            text_segments[0], segment_hashes[0], cached,
+                        )
+
+                    extraction_count = len(extractions)
+                    # Post-process and save extractions
+                    for extraction_data in extractions:
+                        var_id = extraction_data["variable_id"]
+                        variable = variable_by_id.get(var_id)
+
+                        raw_value = extraction_data.get("value")
+                        raw_confidence = extraction_data.get("confidence", 0) or 0
+
+                        if variable:
+                            pp = post_process_extraction(
+                                raw_value, raw_confidence, compiled_by_id[var_id]
+                            )
+                            final_value = pp["value"]
+                            final_confidence = pp["confidence"]
+                            error_msg = pp.get("error_message") or extraction_data.get("error")
+
+                            ex_status = _EXTRACTION_STATUS[
+                                pp["should_skip"], pp["should_flag"], final_value is not None
+                            ]
+                        else:
+                            final_value = raw_value
+                            final_confidence = raw_confidence
+                            error_msg = extraction_data.get("error")
+                            ex_status = _EXTRACTION_STATUS[False, False, final_value is not None]
+
+                        extraction_rows.append({
+                            "job_id": job.id,
+                            "document_id": doc_uuid,
+                            "variable_id": variable.id if variable else UUID(var_id),
+                            "value": final_value,
+                            "confidence": final_confidence,
+                            "source_text": _clip_source_text(extraction_data.get("source_text")),
+                            "prompt_version": prompt_versions.get(var_id),
+                            "status": ex_status,
+                            "error_message": error_msg,
+                        })
+
+                async with session_factory() as doc_db:
+                    # Idempotent: delete existing extractions for this
+                    # job+document
+                    await doc_db.execute(
+                        delete(Extraction).where(
+                            Extraction.job_id == job.id,
+                            Extraction.document_id == doc_uuid,
+                        )
+                    )
+
+                    # Insert the document's extractions in bulk rather
+                    # than tracking an ORM object per row
+                    if extraction_rows:
+                        await _insert_extractions(doc_db, extraction_rows)
+
+                    await doc_db.commit()
+                    return document.name, extraction_count
+
+            def pending_documents():
+                """Yield (stored ID, UUID) for each document not yet processed."""
+                for document_id in job.document_ids:
+                    doc_uuid = UUID(document_id) if isinstance(document_id, str) else document_id
+                    if doc_uuid not in processed_doc_ids:
+                        yield document_id, doc_uuid
 
-                # Skip already-processed documents
-                if doc_uuid in processed_doc_ids:
-                    continue
+            # Documents are extracted MAX_PARALLEL_DOCUMENTS at a time; job
+            # bookkeeping stays on this session and runs in document order.
+            # Windows are drawn lazily, so only one window of parsed IDs is
+            # held at a time
+            pending = pending_documents()
+            while window := list(islice(pending, MAX_PARALLEL_DOCUMENTS)):
 
                 # Check for graceful shutdown signal
                 if ctx.get("shutdown_requested"):
@@ -190,9 +596,12 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
                     })
                     return {"status": "paused", "reason": "system_shutdown"}
 
-                # Check if job was cancelled or paused
-                await db.refresh(job)
-                if job.status == JobStatus.CANCELLED:
+                # Check if job was cancelled or paused; only the status
+                # column is read, the rest of the row is already current
+                status = (await db.execute(
+                    select(ProcessingJob.status).where(ProcessingJob.id == job.id)
+                )).scalar_one()
+                if status == JobStatus.CANCELLED:
                     logger.info(f"Job {job_id} was cancelled, stopping")
                     db.add(_create_log(
                         job_id=job.id, level=LogLevel.INFO,
@@ -202,7 +611,7 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
                     await db.commit()
                     return {"status": "cancelled"}
 
-                if job.status == JobStatus.PAUSED:
+                if status == JobStatus.PAUSED:
                     logger.info(f"Job {job_id} was paused, stopping")
                     db.add(_create_log(
                         job_id=job.id, level=LogLevel.INFO,
@@ -212,264 +621,138 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
                     await db.commit()
                     return {"status": "paused"}
 
-                # Load document
+                # Time the window for ETA tracking; documents overlap, so
+                # each one costs the window time divided by its size
+                window_start_time = time.monotonic()
+
+                # Load the window's document metadata in one query; each
+                # document task reads its own content
                 doc_result = await db.execute(
-                    select(Document).where(Document.id == doc_uuid)
+                    select(
+                        Document.id, Document.name, Document.chunk_count,
+                    ).where(Document.id.in_([doc_uuid for _, doc_uuid in window]))
                 )
-                document = doc_result.scalar_one_or_none()
-
-                if not document:
-                    logger.warning(f"Document {document_id} not found, skipping")
-                    continue
-
-                # Start per-document timer for ETA tracking
-                doc_start = time.monotonic()
-                extraction_count = 0
+                documents = {document.id: document for document in doc_result.all()}
+                # End the read transaction so the job session holds no
+                # connection while the window's documents are extracted
+                await db.commit()
 
-                # Atomic per-document extraction using savepoint
-                try:
-                    async with db.begin_nested():
-                        # Idempotent: delete existing extractions for this job+document
-                        await db.execute(
-                            delete(Extraction).where(
-                                Extraction.job_id == job.id,
-                                Extraction.document_id == doc_uuid,
-                            )
+                outcomes = await asyncio.gather(
+                    *(
+                        process_document(document_id, documents.get(doc_uuid))
+                        for document_id, doc_uuid in window
+                    ),
+                    return_exceptions=True,
+                )
+                doc_elapsed = (time.monotonic() - window_start_time) / len(window)
+
+                # Document logs are inserted together with the window commit.
+                # An auto-pause takes effect only after the whole window is
+                # accounted for, since later documents in it may already
+                # have committed their extractions
+                window_logs: List[dict] = []
+                pause_failures = None
+                for (document_id, _), outcome in zip(window, outcomes):
+                    if outcome is None:
+                        logger.warning(f"Document {document_id} not found, skipping")
+                        continue
+
+                    if isinstance(outcome, Exception):
+                        # Document transaction rolled back
+                        job.documents_failed += 1
+                        job.consecutive_failures += 1
+
+                        window_logs.append(_log_row(
+                            job_id=job.id, level=LogLevel.ERROR,
+                            event_type=EventType.DOC_FAILED,
+                            message=f"Document failed: {str(outcome)}",
+                            document_id=document_id,
+                        ))
+                        logger.error(
+                            f"Error processing document {document_id}",
+                            exc_info=outcome,
                         )
 
-                        # Resolve text source (chunks or full)
-                        def _get_doc_text(doc, chunks_list):
-                            if (doc.chunk_count or 0) > 1 and chunks_list:
-                                return [c.text for c in chunks_list]
-                            return [doc.content]
-
-                        doc_chunks_list = []
-                        if (document.chunk_count or 0) > 1:
-                            chunk_result = await db.execute(
-                                select(DocumentChunk)
-                                .where(DocumentChunk.document_id == doc_uuid)
-                                .order_by(DocumentChunk.chunk_index)
-                            )
-                            doc_chunks_list = chunk_result.scalars().all()
-
-                        text_segments = _get_doc_text(document, doc_chunks_list)
+                        await _publish_progress(ctx, job.id, "document_failed", {
+                            "document_id": document_id,
+                            "error": str(outcome),
+                        })
 
-                        if is_entity_mode and entity_pattern:
-                            # Entity-level extraction
-                            entities = await text_extraction_service.identify_entities(
-                                text=document.content,
-                                entity_pattern=entity_pattern,
-                            )
+                        # Auto-pause on too many consecutive failures
+                        if pause_failures is None and job.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                            pause_failures = job.consecutive_failures
+                    else:
+                        document_name, extraction_count = outcome
+                        job.documents_processed += 1
+                        job.consecutive_failures = 0
 
-                            if not entities:
-                                # Fallback: treat whole doc as single entity
-                                entities = [{"index": 0, "label": document.name, "text": ""}]
-
-                            for entity in entities:
-                                for variable in variables:
-                                    prompt_text = prompt_texts.get(str(variable.id))
-
-                                    # Extract from best text segment
-                                    best_result = None
-                                    for segment in text_segments:
-                                        result_data = await text_extraction_service.extract_variable_for_entity(
-                                            text=segment,
-                                            variable=variable,
-                                            entity=entity,
-                                            prompt_text=prompt_text,
-                                        )
-                                        if best_result is None or (result_data.get("confidence") or 0) > (best_result.get("confidence") or 0):
-                                            best_result = result_data
-
-                                    extraction_data = best_result or {"value": None, "confidence": 0}
-                                    extraction_data["variable_id"] = str(variable.id)
-                                    extraction_data["variable_name"] = variable.name
-
-                                    raw_value = extraction_data.get("value")
-                                    raw_confidence = extraction_data.get("confidence", 0) or 0
-
-                                    pp = post_process_extraction(raw_value, raw_confidence, variable)
-                                    final_value = pp["value"]
-                                    final_confidence = pp["confidence"]
-                                    error_msg = pp.get("error_message") or extraction_data.get("error")
-
-                                    if pp["should_skip"]:
-                                        ex_status = ExtractionStatus.FAILED
-                                    elif pp["should_flag"]:
-                                        ex_status = ExtractionStatus.FLAGGED
-                                    elif final_value is not None:
-                                        ex_status = ExtractionStatus.EXTRACTED
-                                    else:
-                                        ex_status = ExtractionStatus.FAILED
-
-                                    extraction = Extraction(
-                                        job_id=job.id,
-                                        document_id=doc_uuid,
-                                        variable_id=variable.id,
-                                        value=final_value,
-                                        confidence=final_confidence,
-                                        source_text=extraction_data.get("source_text"),
-                                        prompt_version=prompt_versions.get(str(variable.id)),
-                                        status=ex_status,
-                                        error_message=error_msg,
-                                        entity_index=entity.get("index"),
-                                        entity_text=entity.get("text", "")[:500],
-                                    )
-                                    db.add(extraction)
-                                    extraction_count += 1
+                        # EMA update on success only (exclude failed documents)
+                        if job.avg_seconds_per_doc is None:
+                            job.avg_seconds_per_doc = doc_elapsed
                         else:
-                            # Document-level extraction (with chunk merging)
-                            if len(text_segments) > 1:
-                                merged: Dict[str, Dict] = {}
-                                for segment in text_segments:
-                                    chunk_extractions = await text_extraction_service.extract_all_variables(
-                                        text=segment,
-                                        variables=list(variables),
-                                        prompts=prompt_texts if prompt_texts else None,
-                                    )
-                                    for ext in chunk_extractions:
-                                        vid = ext["variable_id"]
-                                        existing = merged.get(vid)
-                                        if existing is None or (ext.get("confidence") or 0) > (existing.get("confidence") or 0):
-                                            merged[vid] = ext
-                                extractions = list(merged.values())
-                            else:
-                                extractions = await text_extraction_service.extract_all_variables(
-                                    text=text_segments[0],
-                                    variables=list(variables),
-                                    prompts=prompt_texts if prompt_texts else None,
-                                )
+                            job.avg_seconds_per_doc = 0.7 * job.avg_seconds_per_doc + 0.3 * doc_elapsed
+
+                        window_logs.append(_log_row(
+                            job_id=job.id, level=LogLevel.INFO,
+                            event_type=EventType.DOC_COMPLETED,
+                            message=f"Document processed: {document_name}",
+                            document_id=document_id,
+                            metadata={"extractions": extraction_count},
+                        ))
 
-                            extraction_count = len(extractions)
-                            # Post-process and save extractions
-                            for extraction_data in extractions:
-                                var_id = extraction_data["variable_id"]
-                                variable = variable_by_id.get(var_id)
-
-                                raw_value = extraction_data.get("value")
-                                raw_confidence = extraction_data.get("confidence", 0) or 0
-
-                                if variable:
-                                    pp = post_process_extraction(raw_value, raw_confidence, variable)
-                                    final_value = pp["value"]
-                                    final_confidence = pp["confidence"]
-                                    error_msg = pp.get("error_message") or extraction_data.get("error")
-
-                                    if pp["should_skip"]:
-                                        ex_status = ExtractionStatus.FAILED
-                                    elif pp["should_flag"]:
-                                        ex_status = ExtractionStatus.FLAGGED
-                                    elif final_value is not None:
-                                        ex_status = ExtractionStatus.EXTRACTED
-                                    else:
-                                        ex_status = ExtractionStatus.FAILED
-                                else:
-                                    final_value = raw_value
-                                    final_confidence = raw_confidence
-                                    error_msg = extraction_data.get("error")
-                                    ex_status = ExtractionStatus.EXTRACTED if final_value is not None else ExtractionStatus.FAILED
-
-                                extraction = Extraction(
-                                    job_id=job.id,
-                                    document_id=doc_uuid,
-                                    variable_id=UUID(var_id),
-                                    value=final_value,
-                                    confidence=final_confidence,
-                                    source_text=extraction_data.get("source_text"),
-                                    prompt_version=prompt_versions.get(var_id),
-                                    status=ex_status,
-                                    error_message=error_msg,
-                                )
-                                db.add(extraction)
+                        await _publish_progress(ctx, job.id, "document_completed", {
+                            "document_id": document_id,
+                            "document_name": document_name,
+                            "documents_processed": job.documents_processed,
+                            "total_documents": total_documents,
+                        })
 
-                    # Savepoint succeeded
-                    job.documents_processed += 1
-                    job.consecutive_failures = 0
+                    # Update progress and ETA
+                    docs_done = job.documents_processed + job.documents_failed
+                    job.progress = int((docs_done / total_documents) * 100)
 
-                    # EMA update on success only (exclude failed documents)
-                    doc_elapsed = time.monotonic() - doc_start
-                    if job.avg_seconds_per_doc is None:
-                        job.avg_seconds_per_doc = doc_elapsed
-                    else:
-                        job.avg_seconds_per_doc = 0.7 * job.avg_seconds_per_doc + 0.3 * doc_elapsed
+                    docs_remaining = total_documents - docs_done
+                    eta_seconds = int(job.avg_seconds_per_doc * docs_remaining) if job.avg_seconds_per_doc and docs_remaining > 0 else 0
 
-                    db.add(_create_log(
-                        job_id=job.id, level=LogLevel.INFO,
-                        event_type=EventType.DOC_COMPLETED,
-                        message=f"Document processed: {document.name}",
-                        document_id=document_id,
-                        metadata={"extractions": extraction_count},
-                    ))
+                    # Periodic checkpoint log
+                    if docs_done % CHECKPOINT_INTERVAL == 0:
+                        logger.info(
+                            f"Job {job_id}: checkpoint at {docs_done}/{total_documents} documents"
+                        )
 
-                    await _publish_progress(ctx, job.id, "document_completed", {
-                        "document_id": document_id,
-                        "document_name": document.name,
+                    await _publish_progress(ctx, job.id, "progress", {
+                        "progress": job.progress,
                         "documents_processed": job.documents_processed,
+                        "documents_failed": job.documents_failed,
                         "total_documents": total_documents,
+                        "eta_seconds": eta_seconds,
                     })
 
-                except Exception as e:
-                    # Savepoint rolled back
-                    job.documents_failed += 1
-                    job.consecutive_failures += 1
-
-                    db.add(_create_log(
-                        job_id=job.id, level=LogLevel.ERROR,
-                        event_type=EventType.DOC_FAILED,
-                        message=f"Document failed: {str(e)}",
-                        document_id=document_id,
+                if pause_failures is not None:
+                    logger.warning(f"Job {job_id}: auto-pausing after {MAX_CONSECUTIVE_FAILURES} consecutive failures")
+                    job.transition_to(JobStatus.PAUSED)
+                    window_logs.append(_log_row(
+                        job_id=job.id, level=LogLevel.WARNING,
+                        event_type=EventType.JOB_PAUSED,
+                        message=f"Auto-paused after {MAX_CONSECUTIVE_FAILURES} consecutive failures",
+                        metadata={"consecutive_failures": pause_failures},
                     ))
-                    logger.exception(f"Error processing document {document_id}")
-
-                    await _publish_progress(ctx, job.id, "document_failed", {
-                        "document_id": document_id,
-                        "error": str(e),
-                    })
-
-                    # Auto-pause on too many consecutive failures
-                    if job.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                        logger.warning(f"Job {job_id}: auto-pausing after {MAX_CONSECUTIVE_FAILURES} consecutive failures")
-                        job.transition_to(JobStatus.PAUSED)
-                        db.add(_create_log(
-                            job_id=job.id, level=LogLevel.WARNING,
-                            event_type=EventType.JOB_PAUSED,
-                            message=f"Auto-paused after {MAX_CONSECUTIVE_FAILURES} consecutive failures",
-                            metadata={"consecutive_failures": job.consecutive_failures},
-                        ))
-                        await db.commit()
-                        await _publish_progress(ctx, job.id, "job_paused", {
-                            "reason": "consecutive_failures",
-                        })
-                        return {"status": "paused", "reason": "consecutive_failures"}
-
-                # Update progress and ETA
-                docs_done = job.documents_processed + job.documents_failed
-                job.progress = int((docs_done / total_documents) * 100)
-
-                docs_remaining = total_documents - docs_done
-                eta_seconds = int(job.avg_seconds_per_doc * docs_remaining) if job.avg_seconds_per_doc and docs_remaining > 0 else 0
 
+                # One commit covers the window's counters and logs; the
+                # extractions themselves were committed by each document
+                if window_logs:
+                    await db.execute(insert(ProcessingLog), window_logs)
                 await db.commit()
 
-                # Periodic checkpoint log
-                if docs_done % CHECKPOINT_INTERVAL == 0:
-                    logger.info(
-                        f"Job {job_id}: checkpoint at {docs_done}/{total_documents} documents"
-                    )
-
-                await _publish_progress(ctx, job.id, "progress", {
-                    "progress": job.progress,
-                    "documents_processed": job.documents_processed,
-                    "documents_failed": job.documents_failed,
-                    "total_documents": total_documents,
-                    "eta_seconds": eta_seconds,
-                })
+                if pause_failures is not None:
+                    await _publish_progress(ctx, job.id, "job_paused", {
+                        "reason": "consecutive_failures",
+                    })
+                    return {"status": "paused", "reason": "consecutive_failures"}
 
-            # Mark job as complete
+            # Mark job as complete; the status and its log commit together
             job.transition_to(JobStatus.COMPLETE)
             job.progress = 100
-            await db.commit()
-
             db.add(_create_log(
                 job_id=job.id, level=LogLevel.INFO,
                 event_type=EventType.JOB_COMPLETED,
@@ -494,8 +777,6 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
 
             try:
                 job.transition_to(JobStatus.FAILED)
-                await db.commit()
-
                 db.add(_create_log(
                     job_id=job.id, level=LogLevel.ERROR,
                     event_type=EventType.JOB_FAILED,
@@ -510,3 +791,21 @@ async def process_extraction_job(ctx: dict, job_id: str) -> dict:
                 logger.exception(f"Failed to update job {job_id} status to FAILED")
 
             return {"status": "failed", "error": str(e)}
+
+
+async def purge_extraction_cache(ctx: dict) -> dict:
+    """
+    ARQ cron task: delete stored LLM results older than EXTRACTION_CACHE_TTL_DAYS.
+
+    Args:
+        ctx: ARQ context with session_factory
+
+    Returns:
+        Dict with the number of deleted rows
+    """
+    async with ctx["session_factory"]() as db:
+        deleted = await purge_cached_extractions(db, settings.EXTRACTION_CACHE_TTL_DAYS)
+        await db.commit()
+
+    logger.info(f"Purged {deleted} stored LLM results")
+    return {"deleted": deleted}
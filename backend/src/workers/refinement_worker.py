@@ -10,7 +10,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.variable import Variable
-from src.services.feedback_analyzer import FeedbackAnalyzer
+from src.services.feedback_analyzer import FeedbackAnalyzer, analyze_and_refine_prompts
 
 logger = logging.getLogger(__name__)
 
@@ -73,3 +73,46 @@ async def process_refinement_job(ctx: dict, variable_id: str) -> dict:
         except Exception as e:
             logger.exception(f"Refinement job failed for variable {variable_id}: {e}")
             return {"status": "failed", "error": str(e)}
+
+
+async def process_project_refinement_job(ctx: dict, project_id: str) -> dict:
+    """
+    ARQ task: analyze feedback and refine prompts for every variable of a project.
+
+    Variables are analyzed concurrently, each in its own session (see
+    analyze_and_refine_prompts). Workers run without an RLS context, so
+    no user is bound to those sessions.
+
+    Args:
+        ctx: ARQ context with session_factory
+        project_id: Project UUID string
+
+    Returns:
+        Dict with status and the new prompt version per refined variable
+    """
+    session_factory = ctx["session_factory"]
+
+    async with session_factory() as db:
+        try:
+            variable_ids = (await db.execute(
+                select(Variable.id).where(Variable.project_id == UUID(project_id))
+            )).scalars().all()
+
+            if not variable_ids:
+                return {"status": "skipped", "message": "Project has no variables"}
+
+            new_prompts = await analyze_and_refine_prompts(db, variable_ids)
+
+            refined = {
+                str(variable_id): prompt.version
+                for variable_id, prompt in new_prompts.items()
+                if prompt is not None
+            }
+            logger.info(
+                f"Refined {len(refined)}/{len(variable_ids)} prompts for project {project_id}"
+            )
+            return {"status": "completed", "refined": refined}
+
+        except Exception as e:
+            logger.exception(f"Refinement job failed for project {project_id}: {e}")
+            return {"status": "failed", "error": str(e)}
@@ -2,6 +2,7 @@
 ARQ worker settings and configuration.
 """
 import logging
+from arq import cron
 from arq.connections import RedisSettings
 
 from src.core.config import settings
@@ -44,6 +45,10 @@ class WorkerSettings:
         "src.workers.extraction_worker.process_extraction_job",
         "src.workers.export_worker.process_export_job",
         "src.workers.refinement_worker.process_refinement_job",
+        "src.workers.refinement_worker.process_project_refinement_job",
+    ]
+    cron_jobs = [
+        cron("src.workers.extraction_worker.purge_extraction_cache", hour=3, minute=0),
     ]
     redis_settings = parse_redis_url(settings.REDIS_URL)
     max_jobs = settings.ARQ_MAX_JOBS
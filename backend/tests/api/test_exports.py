@@ -0,0 +1,121 @@
+"""
+API tests for export downloads.
+"""
+import gzip
+import os
+import tempfile
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.api.routes.exports import _accepts_gzip
+from src.main import app
+
+
+@pytest.fixture
+def export_file():
+    """Write an export file to the temp directory and remove it afterwards."""
+    paths = []
+
+    def write(extension: str, content: bytes) -> str:
+        filename = f"export_test_{uuid4().hex}.{extension}"
+        path = os.path.join(tempfile.gettempdir(), filename)
+        with open(path, "wb") as f:
+            f.write(content)
+        paths.extend([path, f"{path}.gz"])
+        return filename
+
+    yield write
+    for path in paths:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+async def _download(filename: str, accept_encoding: str):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(
+            f"/api/v1/exports/download/{filename}",
+            headers={"Accept-Encoding": accept_encoding},
+        )
+
+
+CSV = b"document,actor\n" + b"doc.pdf,police\n" * 500
+
+
+@pytest.mark.asyncio
+async def test_csv_download_is_gzipped(export_file):
+    filename = export_file("csv", CSV)
+
+    response = await _download(filename, "gzip, deflate")
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(CSV)
+    assert response.content == CSV  # httpx decodes the body
+
+
+@pytest.mark.asyncio
+async def test_csv_download_without_gzip_support(export_file):
+    filename = export_file("csv", CSV)
+
+    response = await _download(filename, "identity")
+
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == len(CSV)
+    assert response.content == CSV
+
+
+@pytest.mark.asyncio
+async def test_xlsx_download_is_not_compressed(export_file):
+    content = b"PK\x03\x04" + os.urandom(2000)
+    filename = export_file("xlsx", content)
+
+    response = await _download(filename, "gzip")
+
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == len(content)
+    assert response.content == content
+
+
+@pytest.mark.asyncio
+async def test_gzip_copy_is_refreshed_when_export_changes(export_file):
+    filename = export_file("json", b'[{"actor": "police"}]')
+    path = os.path.join(tempfile.gettempdir(), filename)
+    await _download(filename, "gzip")
+
+    with open(path, "wb") as f:
+        f.write(b'[{"actor": "army"}]')
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+    response = await _download(filename, "gzip")
+
+    assert response.content == b'[{"actor": "army"}]'
+    with gzip.open(f"{path}.gz") as f:
+        assert f.read() == b'[{"actor": "army"}]'
+
+
+@pytest.mark.asyncio
+async def test_gzip_refused_with_zero_quality(export_file):
+    filename = export_file("csv", CSV)
+
+    response = await _download(filename, "gzip;q=0, identity")
+
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == len(CSV)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("GZIP ; Q=1.0", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.0, *", False),
+    ("*;q=0", False),
+    ("gzip;q=oops", False),
+    ("x-gzipped, identity", False),
+    ("", False),
+])
+def test_accepts_gzip(header, expected):
+    assert _accepts_gzip(header) is expected
@@ -0,0 +1,118 @@
+"""
+Tests for the in-process LLM throttle.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.core.rate_limiter as rate_limiter
+from src.core.config import settings
+from src.core.rate_limiter import (
+    AsyncTokenBucket,
+    LLMThrottle,
+    estimate_tokens,
+    get_llm_throttle,
+)
+
+
+class _FakeClock:
+    """Monotonic clock that only advances when the code under test sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=clock.sleep))
+    return clock
+
+
+class TestAsyncTokenBucket:
+    """Tests for AsyncTokenBucket."""
+
+    @pytest.mark.asyncio
+    async def test_within_capacity_does_not_wait(self, clock):
+        bucket = AsyncTokenBucket(capacity=60, period_seconds=60)
+
+        for _ in range(60):
+            await bucket.acquire()
+
+        assert clock.sleeps == []
+
+    @pytest.mark.asyncio
+    async def test_waits_for_refill(self, clock):
+        bucket = AsyncTokenBucket(capacity=60, period_seconds=60)
+        await bucket.acquire(60)
+
+        await bucket.acquire(3)
+
+        assert clock.sleeps == [pytest.approx(3.0)]
+        assert clock.now == pytest.approx(3.0)
+
+    @pytest.mark.asyncio
+    async def test_refill_is_capped_at_capacity(self, clock):
+        bucket = AsyncTokenBucket(capacity=10, period_seconds=10)
+        await bucket.acquire(10)
+        clock.now += 1000
+
+        await bucket.acquire(10)
+        await bucket.acquire(1)
+
+        assert clock.sleeps == [pytest.approx(1.0)]
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_is_capped(self, clock):
+        bucket = AsyncTokenBucket(capacity=10, period_seconds=10)
+
+        await bucket.acquire(50)
+
+        assert clock.sleeps == []
+
+
+class TestLLMThrottle:
+    """Tests for LLMThrottle, estimate_tokens and get_llm_throttle."""
+
+    @pytest.mark.asyncio
+    async def test_waits_on_tightest_budget(self, clock):
+        throttle = LLMThrottle(requests_per_minute=600, tokens_per_minute=60)
+
+        await throttle.acquire(60)
+        await throttle.acquire(30)
+
+        assert clock.sleeps == [pytest.approx(30.0)]
+
+    def test_zero_disables_budget(self):
+        throttle = LLMThrottle(requests_per_minute=10)
+
+        assert throttle.requests is not None
+        assert throttle.tokens is None
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("x" * 400) == 101
+
+    def test_get_llm_throttle(self, monkeypatch):
+        monkeypatch.setattr(rate_limiter, "_llm_throttles", {})
+        monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+        monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+        assert get_llm_throttle("gpt-4o") is None
+
+        monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 1000)
+        throttle = get_llm_throttle("gpt-4o")
+
+        assert throttle is get_llm_throttle("gpt-4o")
+        assert throttle is not get_llm_throttle("gpt-4o-mini")
+        assert throttle.requests is None
+        assert throttle.tokens.capacity == 1000
@@ -0,0 +1,137 @@
+"""
+Tests for the document processor service.
+"""
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from io import BytesIO
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.services.document_processor as document_processor
+from src.core.database import Base
+from src.models.document_chunk import DocumentChunk
+from src.services.document_processor import (
+    DocumentProcessingError,
+    chunk_text,
+    create_chunks_for_document,
+    parse_pdfs_async,
+)
+
+
+@asynccontextmanager
+async def _session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+def _words(n: int) -> str:
+    return " ".join(f"w{i}" for i in range(n))
+
+
+class TestChunkText:
+    """Tests for chunk_text function."""
+
+    def test_short_text_single_chunk(self):
+        text = _words(5)
+        assert chunk_text(text, max_words=10, overlap_words=2) == [
+            {"text": text, "token_count": 5, "overlap_tokens": 0}
+        ]
+
+    def test_overlapping_windows(self):
+        chunks = chunk_text(_words(12), max_words=5, overlap_words=2)
+
+        assert [c["text"] for c in chunks] == [
+            "w0 w1 w2 w3 w4",
+            "w3 w4 w5 w6 w7",
+            "w6 w7 w8 w9 w10",
+            "w9 w10 w11",
+        ]
+        assert [c["token_count"] for c in chunks] == [5, 5, 5, 3]
+        assert [c["overlap_tokens"] for c in chunks] == [0, 2, 2, 2]
+
+    def test_last_window_reaches_end_exactly(self):
+        chunks = chunk_text(_words(8), max_words=5, overlap_words=2)
+
+        assert [c["text"] for c in chunks] == ["w0 w1 w2 w3 w4", "w3 w4 w5 w6 w7"]
+
+    def test_no_overlap(self):
+        chunks = chunk_text(_words(10), max_words=5, overlap_words=0)
+
+        assert [c["text"] for c in chunks] == ["w0 w1 w2 w3 w4", "w5 w6 w7 w8 w9"]
+        assert [c["overlap_tokens"] for c in chunks] == [0, 0]
+
+
+class TestCreateChunksForDocument:
+    """Tests for create_chunks_for_document."""
+
+    @pytest.mark.asyncio
+    async def test_small_document_is_not_chunked(self):
+        document = SimpleNamespace(id=uuid4(), content=_words(10), word_count=10, chunk_count=None)
+        async with _session() as db:
+            assert await create_chunks_for_document(db, document, min_word_count=5) == 0
+            rows = (await db.execute(select(DocumentChunk))).scalars().all()
+
+        assert rows == []
+        assert document.chunk_count is None
+
+    @pytest.mark.asyncio
+    async def test_large_document_is_chunked(self):
+        document = SimpleNamespace(id=uuid4(), content=_words(6000), word_count=6000, chunk_count=None)
+        async with _session() as db:
+            assert await create_chunks_for_document(db, document) == 3
+            rows = (await db.execute(
+                select(DocumentChunk).order_by(DocumentChunk.chunk_index)
+            )).scalars().all()
+
+        assert [row.token_count for row in rows] == [3000, 3000, 600]
+        assert [row.overlap_tokens for row in rows] == [0, 300, 300]
+        assert rows[1].text.split()[0] == "w2700"
+        assert document.chunk_count == 3
+
+
+class _BrokenPool(Executor):
+    """Executor whose workers have all died."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+class TestPdfPool:
+    """Tests for the PDF parsing process pool."""
+
+    def test_pool_size_is_capped(self, monkeypatch):
+        monkeypatch.setattr(document_processor, "_pdf_pool", None)
+        monkeypatch.setattr(document_processor.os, "cpu_count", lambda: 64)
+        monkeypatch.setattr(document_processor.settings, "PDF_PARSE_WORKERS", 3)
+        try:
+            assert document_processor._get_pdf_pool()._max_workers == 3
+        finally:
+            document_processor.shutdown_pdf_pool()
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_raises_processing_error_and_resets(self, monkeypatch):
+        pool = _BrokenPool()
+        monkeypatch.setattr(document_processor, "_pdf_pool", pool)
+
+        with pytest.raises(DocumentProcessingError, match="crashed"):
+            await parse_pdfs_async([BytesIO(b"%PDF-1.4")])
+
+        assert document_processor._pdf_pool is None
+        assert pool.shut_down
@@ -0,0 +1,341 @@
+"""
+Tests for the export service.
+"""
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from io import BytesIO
+from uuid import uuid4
+
+import orjson
+import pandas as pd
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.core.database import Base
+from src.models.document import ContentType, Document
+from src.models.extraction import Extraction
+from src.models.project import Project, ProjectScale
+from src.models.variable import Variable, VariableType
+import src.services.export_service as export_service
+from src.services.export_service import ExportService, write_excel
+
+
+@asynccontextmanager
+async def _session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+async def _seed_project(db, extractions):
+    """
+    Create a project with variables "actor", "city", "size", two documents,
+    and extractions given as (document_index, variable_name, value, confidence).
+    """
+    project = Project(name="Export", scale=ProjectScale.SMALL)
+    db.add(project)
+    await db.flush()
+
+    variables = {
+        name: Variable(
+            project_id=project.id, name=name, type=VariableType.TEXT,
+            instructions="x", order=order,
+        )
+        for order, name in enumerate(["actor", "city", "size"])
+    }
+    documents = [
+        Document(
+            project_id=project.id, name=f"Doc {i}", content="text",
+            content_type=ContentType.TXT, size_bytes=4,
+        )
+        for i in range(2)
+    ]
+    db.add_all([*variables.values(), *documents])
+    await db.flush()
+
+    job_id = uuid4()
+    db.add_all([
+        Extraction(
+            job_id=job_id, document_id=documents[doc].id,
+            variable_id=variables[name].id, value=value, confidence=confidence,
+        )
+        for doc, name, value, confidence in extractions
+    ])
+    await db.commit()
+    return project
+
+
+def _long_frame(rows):
+    return pd.DataFrame(
+        rows,
+        columns=["document_id", "document_name", "variable_name", "value", "confidence"],
+    )
+
+
+class TestPivotWide:
+    """Tests for ExportService._pivot_wide."""
+
+    def test_one_row_per_document(self):
+        df = _long_frame([
+            ("d1", "Doc 1", "actor", "police", 90),
+            ("d1", "Doc 1", "city", "Cairo", 80),
+            ("d2", "Doc 2", "actor", "army", 70),
+        ])
+        wide = ExportService._pivot_wide(df, include_confidence=False)
+
+        assert list(wide.columns) == ["document_id", "document_name", "actor", "city"]
+        assert len(wide) == 2
+        row = wide.set_index("document_id").loc["d1"]
+        assert row["actor"] == "police"
+        assert row["city"] == "Cairo"
+
+    def test_confidence_columns(self):
+        df = _long_frame([
+            ("d1", "Doc 1", "actor", "police", 90),
+            ("d1", "Doc 1", "city", "Cairo", 80),
+        ])
+        wide = ExportService._pivot_wide(df, include_confidence=True)
+
+        assert list(wide.columns) == [
+            "document_id", "document_name",
+            "actor", "city", "actor_confidence", "city_confidence",
+        ]
+        assert wide.loc[0, "city_confidence"] == 80
+
+    def test_keeps_all_null_variable(self):
+        df = _long_frame([
+            ("d1", "Doc 1", "actor", "police", 90),
+            ("d1", "Doc 1", "city", None, None),
+        ])
+        wide = ExportService._pivot_wide(df, include_confidence=True)
+
+        assert "city" in wide.columns
+        assert pd.isna(wide.loc[0, "city"])
+
+    def test_categorical_keys(self):
+        df = _long_frame([
+            ("d1", "Doc 1", "actor", "police", 90),
+            ("d2", "Doc 2", "city", "Cairo", 80),
+        ]).astype({"document_id": "category", "variable_name": "category"})
+        wide = ExportService._pivot_wide(df, include_confidence=False)
+
+        # Only observed (document, variable) combinations produce rows
+        assert len(wide) == 2
+        row = wide.set_index("document_id").loc["d2"]
+        assert row["city"] == "Cairo"
+        assert pd.isna(row["actor"])
+
+    def test_duplicate_pairs_keep_first_value(self):
+        df = _long_frame([
+            ("d1", "Doc 1", "actor", "police", 90),
+            ("d1", "Doc 1", "actor", "army", 60),
+        ])
+        wide = ExportService._pivot_wide(df, include_confidence=False)
+
+        assert len(wide) == 1
+        assert wide.loc[0, "actor"] == "police"
+
+    def test_entity_rows_follow_their_document(self):
+        df = pd.DataFrame(
+            [
+                ("d1", "Doc 1", None, None, "actor", "police"),
+                ("d2", "Doc 2", None, None, "actor", "army"),
+                ("d1", "Doc 1", 0, "crowd", "actor", "protesters"),
+            ],
+            columns=[
+                "document_id", "document_name", "entity_index", "entity_text",
+                "variable_name", "value",
+            ],
+        )
+        wide = ExportService._pivot_wide(df, include_confidence=False)
+
+        assert list(wide.columns) == [
+            "document_id", "document_name", "entity_index", "entity_text", "actor",
+        ]
+        assert list(wide["document_id"]) == ["d1", "d1", "d2"]
+        assert list(wide["actor"]) == ["police", "protesters", "army"]
+
+
+class TestWriteExcel:
+    """Tests for write_excel."""
+
+    def test_round_trip(self):
+        df = pd.DataFrame({"name": ["a", None, "c"], "score": [1.5, float("nan"), 3]})
+        content = write_excel({"Wide Format": df, "Codebook": df[["name"]]})
+
+        sheets = pd.read_excel(BytesIO(content), sheet_name=None)
+        assert list(sheets) == ["Wide Format", "Codebook"]
+        wide = sheets["Wide Format"]
+        assert list(wide.columns) == ["name", "score"]
+        assert wide.loc[0, "name"] == "a"
+        assert wide.loc[0, "score"] == 1.5
+        assert pd.isna(wide.loc[1, "name"])
+        assert pd.isna(wide.loc[1, "score"])
+        assert len(wide) == 3
+
+
+class TestGenerateCsvWide:
+    """Tests for ExportService.generate_csv_wide."""
+
+    @pytest.mark.asyncio
+    async def test_one_row_per_document(self):
+        async with _session() as db:
+            project = await _seed_project(db, [
+                (0, "actor", "police", 90),
+                (0, "size", [1, 2], 40),
+                (1, "actor", "army", 70),
+            ])
+            content = await ExportService(db).generate_csv_wide(
+                project.id, include_confidence=True
+            )
+
+        lines = content.decode().splitlines()
+        assert lines[0] == (
+            "document_id,document_name,actor,city,size,"
+            "actor_confidence,city_confidence,size_confidence"
+        )
+        rows = {line.split(",")[1]: line for line in lines[1:]}
+        assert len(rows) == 2
+        assert rows["Doc 0"].endswith(',police,,"[1, 2]",90,,40')
+        assert rows["Doc 1"].endswith(",army,,,70,,")
+
+    @pytest.mark.asyncio
+    async def test_min_confidence_filters_cells(self):
+        async with _session() as db:
+            project = await _seed_project(db, [
+                (0, "actor", "police", 90),
+                (0, "city", "Cairo", 20),
+            ])
+            content = await ExportService(db).generate_csv_wide(
+                project.id, min_confidence=50
+            )
+
+        lines = content.decode().splitlines()
+        assert len(lines) == 2
+        assert lines[1].endswith(",Doc 0,police,,")
+
+
+class TestGenerateCsvLongStream:
+    """Tests for ExportService.generate_csv_long_stream."""
+
+    @pytest.mark.asyncio
+    async def test_one_chunk_per_batch(self):
+        async with _session() as db:
+            project = await _seed_project(db, [
+                (0, "actor", "police", 90),
+                (0, "size", [1, 2], 40),
+                (1, "actor", "army", 70),
+            ])
+            chunks = [
+                chunk
+                async for chunk in ExportService(db).generate_csv_long_stream(
+                    project.id, include_confidence=True, batch_size=2
+                )
+            ]
+
+        assert len(chunks) == 2
+        lines = b"".join(chunks).decode().splitlines()
+        assert lines[0] == "document_id,document_name,variable_name,value,confidence"
+        assert sorted(line.split(",", 2)[2] for line in lines[1:]) == [
+            "actor,army,70", "actor,police,90", 'size,"[1, 2]",40',
+        ]
+
+    @pytest.mark.asyncio
+    async def test_header_only_without_extractions(self):
+        async with _session() as db:
+            project = await _seed_project(db, [])
+            chunks = [
+                chunk
+                async for chunk in ExportService(db).generate_csv_long_stream(project.id)
+            ]
+
+        assert chunks == [b"document_id,document_name,variable_name,value\n"]
+
+
+class TestGenerateJson:
+    """Tests for ExportService.generate_json."""
+
+    @pytest.mark.asyncio
+    async def test_records_without_entity_columns(self):
+        async with _session() as db:
+            project = await _seed_project(db, [
+                (0, "actor", "police", 90),
+                (0, "size", [1, 2], None),
+            ])
+            content = await ExportService(db).generate_json(
+                project.id, include_confidence=True
+            )
+
+        records = sorted(orjson.loads(content), key=lambda r: r["variable_name"])
+        assert [
+            {k: v for k, v in r.items() if k != "document_id"} for r in records
+        ] == [
+            {"document_name": "Doc 0", "variable_name": "actor",
+             "value": "police", "confidence": 90},
+            {"document_name": "Doc 0", "variable_name": "size",
+             "value": "[1, 2]", "confidence": None},
+        ]
+
+
+class TestExportCache:
+    """Tests for ExportService._collect_columns caching."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(export_service, "_export_cache", OrderedDict())
+
+    @pytest.mark.asyncio
+    async def test_reuses_rows_until_data_changes(self):
+        async with _session() as db:
+            project = await _seed_project(db, [(0, "actor", "police", 90)])
+            service = ExportService(db)
+
+            first = await service._collect_columns(project.id, False, False, None)
+            assert await service._collect_columns(project.id, False, False, None) is first
+
+            variable_id = (await db.execute(
+                select(Variable.id).where(Variable.project_id == project.id).limit(1)
+            )).scalar_one()
+            document_id = (await db.execute(
+                select(Document.id).where(Document.project_id == project.id).limit(1)
+            )).scalar_one()
+            db.add(Extraction(
+                job_id=uuid4(), document_id=document_id, variable_id=variable_id,
+                value="army",
+            ))
+            await db.commit()
+
+            second = await service._collect_columns(project.id, False, False, None)
+
+        assert second is not first
+        assert len(second["value"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_large_export_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(export_service, "EXPORT_CACHE_MAX_EXPORT_ROWS", 1)
+        async with _session() as db:
+            project = await _seed_project(db, [(0, "actor", "police", 90), (1, "actor", "army", 80)])
+            service = ExportService(db)
+
+            first = await service._collect_columns(project.id, False, False, None)
+            second = await service._collect_columns(project.id, False, False, None)
+
+        assert second is not first
+        assert second == first
+        assert not export_service._export_cache
+
+    @pytest.mark.asyncio
+    async def test_total_rows_are_bounded(self, monkeypatch):
+        monkeypatch.setattr(export_service, "EXPORT_CACHE_MAX_ROWS", 3)
+        async with _session() as db:
+            project = await _seed_project(db, [(0, "actor", "police", 90), (1, "actor", "army", 80)])
+            service = ExportService(db)
+
+            await service._collect_columns(project.id, False, False, None)
+            latest = await service._collect_columns(project.id, True, False, None)
+
+        assert [entry[2] for entry in export_service._export_cache.values()] == [latest]
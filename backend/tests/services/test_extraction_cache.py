@@ -0,0 +1,130 @@
+"""
+Tests for the LLM extraction cache.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.core.database import Base
+from src.models.variable import Variable, VariableType
+from src.services.extraction_cache import (
+    content_hash,
+    load_cached_extractions,
+    purge_cached_extractions,
+    store_cached_extractions,
+    variable_hash,
+)
+
+
+@asynccontextmanager
+async def _session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+def _variable(**overrides) -> Variable:
+    fields = {"name": "actor", "type": VariableType.TEXT, "instructions": "Who acted?"}
+    fields.update(overrides)
+    return Variable(**fields)
+
+
+def _row(variable_id, text_hash, var_hash, value, model="gpt-4o", **extra):
+    return {
+        "variable_id": variable_id, "content_hash": text_hash, "model": model,
+        "variable_hash": var_hash, "value": value, "confidence": 80,
+        "source_text": "quote", **extra,
+    }
+
+
+class TestHashes:
+    """Tests for content_hash and variable_hash."""
+
+    def test_content_hash_is_stable(self):
+        assert content_hash("text") == content_hash("text")
+        assert content_hash("text") != content_hash("text ")
+        assert len(content_hash("text")) == 32
+
+    def test_variable_hash_tracks_definition(self):
+        base = variable_hash(_variable())
+
+        assert variable_hash(_variable()) == base
+        assert variable_hash(_variable(instructions="Who else?")) != base
+        assert variable_hash(_variable(type=VariableType.NUMBER)) != base
+        assert variable_hash(_variable(), prompt_text="Find the actor") != base
+
+
+class TestCachedExtractions:
+    """Tests for load_cached_extractions, store_cached_extractions and purge_cached_extractions."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self):
+        var1, var2, other = uuid4(), uuid4(), uuid4()
+        async with _session() as db:
+            await store_cached_extractions(db, [
+                _row(var1, "t1", "h1", ["police", "army"]),
+                _row(var2, "t1", "h2", None),
+                _row(var1, "t2", "h1", "other text"),
+                _row(var1, "t1", "h1", "other model", model="gpt-4o-mini"),
+                _row(other, "t1", "h1", "other project"),
+            ])
+            await db.commit()
+
+            cached = await load_cached_extractions(db, ["t1"], {var1: "h1", var2: "h2"}, "gpt-4o")
+
+        assert cached == {
+            ("t1", var1): {"value": ["police", "army"], "confidence": 80, "source_text": "quote"},
+            ("t1", var2): {"value": None, "confidence": 80, "source_text": "quote"},
+        }
+
+    @pytest.mark.asyncio
+    async def test_existing_result_is_kept(self):
+        variable_id = uuid4()
+        async with _session() as db:
+            await store_cached_extractions(db, [_row(variable_id, "t1", "h1", "first")])
+            await db.commit()
+            await store_cached_extractions(db, [_row(variable_id, "t1", "h1", "second")])
+            await db.commit()
+
+            cached = await load_cached_extractions(db, ["t1"], {variable_id: "h1"}, "gpt-4o")
+
+        assert cached[("t1", variable_id)]["value"] == "first"
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_skipped_and_replaced(self):
+        variable_id = uuid4()
+        async with _session() as db:
+            await store_cached_extractions(db, [_row(variable_id, "t1", "old", "before edit")])
+            await db.commit()
+
+            assert await load_cached_extractions(db, ["t1"], {variable_id: "new"}, "gpt-4o") == {}
+
+            await store_cached_extractions(db, [_row(variable_id, "t1", "new", "after edit")])
+            await db.commit()
+
+            cached = await load_cached_extractions(db, ["t1"], {variable_id: "new"}, "gpt-4o")
+
+        assert cached[("t1", variable_id)]["value"] == "after edit"
+
+    @pytest.mark.asyncio
+    async def test_purge_deletes_old_results(self):
+        variable_id = uuid4()
+        async with _session() as db:
+            await store_cached_extractions(db, [
+                _row(variable_id, "old", "h1", "a", created_at=datetime.utcnow() - timedelta(days=31)),
+                _row(variable_id, "new", "h1", "b", created_at=datetime.utcnow() - timedelta(days=29)),
+            ])
+            await db.commit()
+
+            deleted = await purge_cached_extractions(db, max_age_days=30)
+            await db.commit()
+            cached = await load_cached_extractions(db, ["old", "new"], {variable_id: "h1"}, "gpt-4o")
+
+        assert deleted == 1
+        assert set(cached) == {("new", variable_id)}
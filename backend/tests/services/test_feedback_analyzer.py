@@ -0,0 +1,149 @@
+"""
+Tests for the feedback analyzer service.
+"""
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.services.feedback_analyzer as feedback_analyzer
+from src.core.database import Base
+from src.models.document import ContentType, Document
+from src.models.extraction import Extraction
+from src.models.extraction_feedback import ExtractionFeedback, FeedbackType
+from src.models.project import Project, ProjectScale
+from src.models.prompt import Prompt
+from src.models.variable import Variable, VariableType
+from src.services.feedback_analyzer import FeedbackAnalyzer, analyze_and_refine_prompts
+
+
+@asynccontextmanager
+async def _session(path):
+    # A file database, since variables are analyzed in concurrent sessions
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+async def _seed_feedback(db, feedback_by_variable):
+    """
+    Create one variable with a v1 prompt per entry of feedback_by_variable,
+    each with one extraction per feedback type listed.
+    """
+    project = Project(name="Feedback", scale=ProjectScale.SMALL)
+    db.add(project)
+    await db.flush()
+    document = Document(
+        project_id=project.id, name="Doc", content="text",
+        content_type=ContentType.TXT, size_bytes=4,
+    )
+    db.add(document)
+
+    variables = {}
+    for order, (name, feedback_types) in enumerate(feedback_by_variable.items()):
+        variable = Variable(
+            project_id=project.id, name=name, type=VariableType.TEXT,
+            instructions="x", order=order,
+        )
+        db.add(variable)
+        await db.flush()
+        db.add(Prompt(
+            variable_id=variable.id, prompt_text=f"Find the {name}",
+            model_config_={}, version=1,
+        ))
+        for feedback_type in feedback_types:
+            extraction = Extraction(
+                job_id=uuid4(), document_id=document.id, variable_id=variable.id,
+                value="v",
+            )
+            db.add(extraction)
+            await db.flush()
+            db.add(ExtractionFeedback(
+                extraction_id=extraction.id, feedback_type=feedback_type,
+                user_comment="value is missing",
+            ))
+        variables[name] = variable.id
+
+    await db.commit()
+    return variables
+
+
+class TestIdentifyCommonIssues:
+    """Tests for FeedbackAnalyzer._identify_common_issues."""
+
+    def test_keyword_in_two_comments(self):
+        comments = ["Value is MISSING", "missing again, wrong year", "wrong-ish"]
+        issues = FeedbackAnalyzer(db=None)._identify_common_issues(comments)
+
+        assert issues == [
+            'extraction misses information',
+            'extraction returns incorrect value',
+        ]
+
+    def test_repeats_within_one_comment_count_once(self):
+        comments = ["null null null", "fine"]
+
+        assert FeedbackAnalyzer(db=None)._identify_common_issues(comments) == []
+
+
+class TestGenerateRefinementSuggestion:
+    """Tests for FeedbackAnalyzer._generate_refinement_suggestion."""
+
+    def test_suggestions_in_fixed_order(self):
+        suggestion = FeedbackAnalyzer(db=None)._generate_refinement_suggestion([
+            'extraction hallucinates non-existent information',
+            'extraction misses information',
+        ])
+
+        first, second = suggestion.split("\n\n")
+        assert first.startswith("Be more thorough")
+        assert second.startswith("CRITICAL:")
+
+    def test_no_issues(self):
+        assert FeedbackAnalyzer(db=None)._generate_refinement_suggestion([]) == ""
+
+
+class TestAnalyzeAndRefinePrompts:
+    """Tests for analyze_and_refine_prompts."""
+
+    @pytest.mark.asyncio
+    async def test_refines_each_variable_in_its_own_session(self, tmp_path):
+        async with _session(tmp_path / "feedback.db") as db:
+            variables = await _seed_feedback(db, {
+                "actor": [FeedbackType.INCORRECT] * 3,
+                "city": [FeedbackType.CORRECT] * 3,
+                "size": [FeedbackType.INCORRECT, FeedbackType.INCORRECT, FeedbackType.CORRECT],
+            })
+
+            results = await analyze_and_refine_prompts(db, max_concurrency=2)
+
+        assert set(results) == set(variables.values())
+        assert results[variables["city"]] is None
+        for name in ("actor", "size"):
+            prompt = results[variables[name]]
+            assert prompt.version == 2
+            assert prompt.prompt_text.startswith(f"Find the {name}")
+            assert "Be more thorough" in prompt.prompt_text
+
+    @pytest.mark.asyncio
+    async def test_binds_rls_context_per_session(self, tmp_path, monkeypatch):
+        bound = []
+        monkeypatch.setattr(
+            feedback_analyzer, "bind_rls_context",
+            lambda session, user_id: bound.append((session, user_id)),
+        )
+        user_id = uuid4()
+        async with _session(tmp_path / "feedback.db") as db:
+            await _seed_feedback(db, {
+                "actor": [FeedbackType.CORRECT] * 3,
+                "city": [FeedbackType.CORRECT] * 3,
+            })
+
+            await analyze_and_refine_prompts(db, user_id=user_id)
+
+        assert [uid for _, uid in bound] == [user_id, user_id]
+        assert bound[0][0] is not bound[1][0]
@@ -0,0 +1,234 @@
+"""
+Tests for the LLM client helpers.
+"""
+import random
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import src.core.mock_llm as mock_llm
+import src.services.llm_client as llm_client
+from src.core.config import settings
+from src.services.llm_client import (
+    LLM_CACHE_KEY_PREFIX,
+    ExtractionResult,
+    LLMClient,
+    LLMClientError,
+    _JsonObjectScanner,
+    _retry_after_seconds,
+    close_llm_http_client,
+)
+
+
+@pytest.fixture
+def real_llm(monkeypatch):
+    """Build clients for the OpenAI SDK path instead of the mock."""
+    monkeypatch.setattr(mock_llm, "is_mock_mode", lambda: False)
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(settings, "LLM_USE_LANGCHAIN", False)
+
+
+def _api_error(headers=None):
+    response = SimpleNamespace(headers=httpx.Headers(headers)) if headers is not None else None
+    return SimpleNamespace(response=response)
+
+
+class TestJsonObjectScanner:
+    """Tests for _JsonObjectScanner."""
+
+    def test_closes_on_top_level_object(self):
+        scanner = _JsonObjectScanner()
+
+        assert not scanner.feed('{"a": {"b": 1}')
+        assert scanner.feed("}")
+        assert scanner.depth == 0
+
+    def test_braces_in_strings_are_ignored(self):
+        scanner = _JsonObjectScanner()
+
+        assert not scanner.feed('{"value": "a } b {"')
+        assert scanner.depth == 1
+        assert scanner.feed("}")
+
+    def test_escaped_quote_keeps_string_open(self):
+        scanner = _JsonObjectScanner()
+
+        assert not scanner.feed('{"value": "say \\"}\\" now"')
+        assert not scanner.in_string
+        assert scanner.feed("}")
+
+    def test_escape_split_across_chunks(self):
+        scanner = _JsonObjectScanner()
+
+        assert not scanner.feed('{"value": "a\\')
+        assert scanner.escaped
+        assert not scanner.feed('"}')
+        assert scanner.in_string
+        assert scanner.feed('"}')
+
+    def test_quotes_before_object_are_ignored(self):
+        scanner = _JsonObjectScanner()
+
+        assert not scanner.feed("Here's the answer: ")
+        assert not scanner.in_string
+        assert scanner.feed('{"value": 1}')
+
+
+class TestRetryAfterSeconds:
+    """Tests for _retry_after_seconds."""
+
+    def test_no_response_or_headers(self):
+        assert _retry_after_seconds(ValueError("boom")) is None
+        assert _retry_after_seconds(_api_error({})) is None
+
+    def test_retry_after_ms_wins(self):
+        error = _api_error({"retry-after-ms": "1500", "retry-after": "9"})
+
+        assert _retry_after_seconds(error) == 1.5
+
+    def test_retry_after_seconds(self):
+        assert _retry_after_seconds(_api_error({"retry-after": "2"})) == 2.0
+
+    def test_invalid_values_fall_back_to_reset_headers(self):
+        error = _api_error({
+            "retry-after-ms": "soon",
+            "retry-after": "Wed, 21 Oct 2026 07:28:00 GMT",
+            "x-ratelimit-reset-requests": "200ms",
+        })
+
+        assert _retry_after_seconds(error) == pytest.approx(0.2)
+
+    def test_longest_rate_limit_reset(self):
+        error = _api_error({
+            "x-ratelimit-reset-requests": "1s",
+            "x-ratelimit-reset-tokens": "1m30s",
+        })
+
+        assert _retry_after_seconds(error) == 90.0
+
+    def test_unparseable_reset(self):
+        assert _retry_after_seconds(_api_error({"x-ratelimit-reset-tokens": "later"})) is None
+
+
+class TestCalculateBackoffDelay:
+    """Tests for LLMClient._calculate_backoff_delay."""
+
+    def test_stays_within_bounds(self):
+        client = LLMClient(base_delay=1.0, max_delay=10.0)
+        random.seed(0)
+
+        delays = [client._calculate_backoff_delay(2.0) for _ in range(200)]
+
+        assert all(1.0 <= delay <= 6.0 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_capped_at_max_delay(self):
+        client = LLMClient(base_delay=1.0, max_delay=10.0)
+        random.seed(0)
+
+        delays = [client._calculate_backoff_delay(100.0) for _ in range(200)]
+
+        assert max(delays) == 10.0
+        assert min(delays) >= 1.0
+
+
+class TestExtractRetries:
+    """Tests for the retry loop in LLMClient.extract."""
+
+    REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    @pytest.fixture
+    def client(self, real_llm, monkeypatch):
+        async def no_sleep(seconds):
+            pass
+
+        monkeypatch.setattr(llm_client.asyncio, "sleep", no_sleep)
+        client = LLMClient(temperature=0.7, max_retries=3)
+        client.throttle = None
+        return client
+
+    def _fail_then_answer(self, client, errors):
+        attempts = []
+
+        async def stream_extraction(messages):
+            attempts.append(messages)
+            if len(attempts) <= len(errors):
+                raise errors[len(attempts) - 1]
+            return ExtractionResult(value="police", confidence=0.9, source_text="quote")
+
+        client._stream_extraction = stream_extraction
+        return attempts
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_retried(self, client):
+        attempts = self._fail_then_answer(client, [
+            openai.APITimeoutError(request=self.REQUEST),
+            openai.APIConnectionError(request=self.REQUEST),
+        ])
+
+        result = await client.extract("Find the actor", "text")
+
+        assert result.value == "police"
+        assert len(attempts) == 3
+
+    def test_retryable_errors_are_classified_by_type(self, client):
+        server_error = openai.InternalServerError(
+            "boom", response=httpx.Response(503, request=self.REQUEST), body=None,
+        )
+
+        assert client._is_retryable_error(openai.APITimeoutError(request=self.REQUEST))
+        assert client._is_retryable_error(server_error)
+        assert client._is_retryable_error(httpx.ReadTimeout("slow"))
+        assert client._is_retryable_error(RuntimeError("Request timed out."))
+        assert not client._is_retryable_error(ValueError("bad prompt"))
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_error_fails_at_once(self, client):
+        attempts = self._fail_then_answer(client, [ValueError("bad prompt")])
+
+        with pytest.raises(LLMClientError):
+            await client.extract("Find the actor", "text")
+
+        assert len(attempts) == 1
+
+
+class TestCacheKey:
+    """Tests for LLMClient._cache_key and cache_enabled."""
+
+    MESSAGES = [{"role": "user", "content": "Find the actor"}]
+
+    def test_key_depends_on_config_and_messages(self, real_llm):
+        client = LLMClient(model="gpt-4o", temperature=0.0)
+        key = client._cache_key(self.MESSAGES)
+
+        assert key.startswith(f"{LLM_CACHE_KEY_PREFIX}:")
+        assert key == LLMClient(model="gpt-4o", temperature=0.0)._cache_key(self.MESSAGES)
+        assert key != LLMClient(model="gpt-4o", temperature=0.1)._cache_key(self.MESSAGES)
+        assert key != LLMClient(model="gpt-4o-mini", temperature=0.0)._cache_key(self.MESSAGES)
+        assert key != client._cache_key([{"role": "user", "content": "Find the city"}])
+
+    def test_enabled_only_at_low_temperature(self, real_llm):
+        assert LLMClient(temperature=0.2).cache_enabled
+        assert not LLMClient(temperature=0.7).cache_enabled
+
+    def test_disabled_in_mock_mode(self, monkeypatch):
+        monkeypatch.setattr(mock_llm, "is_mock_mode", lambda: True)
+
+        assert not LLMClient(temperature=0.0).cache_enabled
+
+
+class TestCloseLLMHttpClient:
+    """Tests for close_llm_http_client."""
+
+    @pytest.mark.asyncio
+    async def test_closes_shared_client(self):
+        http_client = llm_client._get_http_client()
+
+        await close_llm_http_client()
+
+        assert http_client.is_closed
+        assert llm_client._http_client is None
+        assert llm_client._get_http_client() is not http_client
+        await close_llm_http_client()
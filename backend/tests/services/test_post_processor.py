@@ -11,6 +11,7 @@ from src.services.post_processor import (
     apply_default,
     check_confidence,
     coerce_type,
+    compile_variable,
     handle_multiple_values,
     post_process_extraction,
     validate_value,
@@ -63,6 +64,17 @@ class TestCoerceType:
     def test_date_us_format(self):
         assert coerce_type("01/15/2024", VariableType.DATE) == "2024-01-15"
 
+    def test_date_day_first_format(self):
+        assert coerce_type("15/01/2024", VariableType.DATE) == "2024-01-15"
+
+    def test_date_iso_datetime(self):
+        assert coerce_type(" 2024-1-5T09:30:00 ", VariableType.DATE) == "2024-01-05"
+
+    def test_date_invalid_calendar_day(self):
+        assert coerce_type("2023-02-29", VariableType.DATE) == "2023-02-29"
+        assert coerce_type("2024-02-29", VariableType.DATE) == "2024-02-29"
+        assert coerce_type("02/30/2024", VariableType.DATE) == "02/30/2024"
+
     def test_date_passthrough(self):
         # Unknown format passes through
         assert coerce_type("January 15th", VariableType.DATE) == "January 15th"
@@ -79,6 +91,10 @@ class TestCoerceType:
     def test_boolean_no(self):
         assert coerce_type("no", VariableType.BOOLEAN) is False
 
+    def test_boolean_mixed_case_padded(self):
+        assert coerce_type("  Yes ", VariableType.BOOLEAN) is True
+        assert coerce_type("FALSE", VariableType.BOOLEAN) is False
+
     def test_boolean_none(self):
         assert coerce_type(None, VariableType.BOOLEAN) is None
 
@@ -288,3 +304,34 @@ class TestPostProcessExtraction:
         result = post_process_extraction("test", 50, var)
         assert result["should_skip"] is True
         assert result["value"] is None
+
+
+class TestCompileVariable:
+    """Tests for compile_variable function."""
+
+    def test_compiled_matches_variable(self):
+        var = _make_variable(
+            var_type=VariableType.NUMBER,
+            edge_cases={"validation_rules": [
+                {"rule_type": "range", "parameters": {"min": 0, "max": 100}},
+            ]},
+            uncertainty_handling={"confidence_threshold": 80, "if_uncertain_action": "flag"},
+        )
+        compiled = compile_variable(var)
+
+        for value, confidence in [("50", 90), ("500", 90), ("50", 40), (None, 0)]:
+            assert post_process_extraction(value, confidence, compiled) == (
+                post_process_extraction(value, confidence, var)
+            )
+
+    def test_compiled_passes_through(self):
+        compiled = compile_variable(_make_variable())
+        assert compile_variable(compiled) is compiled
+
+    def test_defaults(self):
+        compiled = compile_variable(_make_variable(max_values=None))
+        assert compiled.validation_rules == ()
+        assert compiled.confidence_threshold is None
+        assert compiled.uncertain_action == "flag"
+        assert compiled.multiple_values_action == "return_first"
+        assert compiled.max_values == 1
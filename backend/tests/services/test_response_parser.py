@@ -3,7 +3,11 @@ Tests for the response parser service.
 """
 import pytest
 
-from src.services.response_parser import clean_response, parse_extraction_response
+from src.services.response_parser import (
+    clean_response,
+    parse_batch_extraction_response,
+    parse_extraction_response,
+)
 
 
 class TestCleanResponse:
@@ -32,6 +36,10 @@ class TestCleanResponse:
         result = clean_response('{"value": None}')
         assert result == {"value": None}
 
+    def test_clean_json_strings_kept_verbatim(self):
+        result = clean_response('{"value": "None of the above", "source_text": "[  True story"}')
+        assert result == {"value": "None of the above", "source_text": "[  True story"}
+
     def test_handles_newlines_in_json(self):
         result = clean_response('{\n  "value": "test",\n  "confidence": 85\n}')
         assert result == {"value": "test", "confidence": 85}
@@ -40,6 +48,10 @@ class TestCleanResponse:
         result = clean_response('Here is the result: {"value": "test"} end.')
         assert result == {"value": "test"}
 
+    def test_fallback_skips_invalid_block(self):
+        result = clean_response('Note {not json} then {"value": "test"}')
+        assert result == {"value": "test"}
+
     def test_invalid_json_returns_none(self):
         assert clean_response("not json at all") is None
 
@@ -101,3 +113,40 @@ class TestParseExtractionResponse:
         result = parse_extraction_response(response)
         assert result["value"] == "protest"
         assert result["confidence"] == 88
+
+
+class TestParseBatchExtractionResponse:
+    """Tests for parse_batch_extraction_response function."""
+
+    def test_one_result_per_variable(self):
+        response = (
+            '{"extractions": {'
+            '"actor": {"value": "police", "confidence": 90, "source_text": "the police"}, '
+            '"city": {"value": null, "confidence": 120}}}'
+        )
+        results = parse_batch_extraction_response(response, ["actor", "city"])
+
+        assert results["actor"]["value"] == "police"
+        assert results["actor"]["confidence"] == 90
+        assert results["actor"]["source_text"] == "the police"
+        assert results["city"]["value"] is None
+        assert results["city"]["confidence"] == 100
+
+    def test_accepts_bare_mapping(self):
+        results = parse_batch_extraction_response(
+            '{"actor": {"value": "army", "confidence": 70}}', ["actor"]
+        )
+        assert results["actor"]["value"] == "army"
+
+    def test_missing_variable_gets_error(self):
+        results = parse_batch_extraction_response(
+            '{"extractions": {"actor": {"value": "army"}}}', ["actor", "city"]
+        )
+        assert "error" not in results["actor"]
+        assert results["city"]["value"] is None
+        assert results["city"]["error"] == "Variable missing from batch response"
+
+    def test_unparseable_response(self):
+        results = parse_batch_extraction_response("not json", ["actor"])
+        assert results["actor"]["confidence"] == 0
+        assert results["actor"]["error"] == "Failed to parse JSON response"
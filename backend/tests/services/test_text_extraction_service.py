@@ -0,0 +1,182 @@
+"""
+Tests for the text extraction service.
+"""
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+import src.services.text_extraction_service as text_extraction_service
+from src.models.variable import Variable, VariableType
+from src.services.text_extraction_service import (
+    CircuitBreaker,
+    CircuitState,
+    TextExtractionService,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breaker(monkeypatch):
+    async def no_sleep(seconds):
+        pass
+
+    breaker = CircuitBreaker()
+    monkeypatch.setattr(text_extraction_service, "_circuit_breaker", breaker)
+    monkeypatch.setattr(text_extraction_service.asyncio, "sleep", no_sleep)
+    return breaker
+
+
+class _FakeCompletions:
+    """Stand-in for client.chat.completions that answers from a callback."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        content = self.answer(kwargs)
+        if isinstance(content, Exception):
+            raise content
+        message = SimpleNamespace(content=json.dumps(content))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _service(answer) -> TextExtractionService:
+    service = TextExtractionService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(answer)))
+    service.throttle = None
+    return service
+
+
+def _variable(name: str) -> Variable:
+    return Variable(id=uuid4(), name=name, type=VariableType.TEXT, instructions=f"Find the {name}")
+
+
+class _RecordingThrottle:
+    def __init__(self):
+        self.acquired = []
+
+    async def acquire(self, estimated_tokens):
+        self.acquired.append(estimated_tokens)
+
+
+class TestThrottle:
+    """Tests for the per-model LLM throttle."""
+
+    @pytest.mark.asyncio
+    async def test_every_call_waits_for_budget(self):
+        service = _service(lambda kwargs: {"value": "police", "confidence": 90, "source_text": "q"})
+        service.throttle = _RecordingThrottle()
+        variable = _variable("actor")
+
+        await service.extract_variable("x" * 400, variable)
+        await service.extract_variable_for_entity("x" * 400, variable, {"label": "A", "text": ""})
+
+        assert len(service.throttle.acquired) == 2
+        assert all(tokens > 100 for tokens in service.throttle.acquired)
+        assert len(service.client.chat.completions.calls) == 2
+        assert service.client.chat.completions.calls[0]["model"] == "gpt-4o"
+
+
+def _answer(kwargs):
+    """Answer stored prompts with one value and batched calls per variable name."""
+    system = kwargs["messages"][0]["content"]
+    if system.startswith("PROMPT "):
+        name = system.split()[1]
+        return {"value": f"{name} value", "confidence": 80, "source_text": name}
+    requested = kwargs["messages"][1]["content"].split("Extract: ")[1].split("\n")[0].split(", ")
+    return {"extractions": {
+        name: {"value": f"{name} value", "confidence": 90, "source_text": name}
+        for name in requested
+    }}
+
+
+def _is_batched(call) -> bool:
+    return "Variables to extract:" in call["messages"][0]["content"]
+
+
+class TestExtractDocument:
+    """Tests for TextExtractionService.extract_document."""
+
+    @pytest.mark.asyncio
+    async def test_batches_unprompted_variables_in_input_order(self):
+        service = _service(_answer)
+        variables = [_variable(name) for name in ("actor", "city", "date", "size")]
+        prompts = {
+            str(variables[0].id): "PROMPT actor",
+            str(variables[3].id): "PROMPT size",
+        }
+
+        results = await service.extract_document("text", variables, prompts)
+
+        assert [r["variable_id"] for r in results] == [str(v.id) for v in variables]
+        assert [r["variable_name"] for r in results] == ["actor", "city", "date", "size"]
+        assert [r["value"] for r in results] == [
+            "actor value", "city value", "date value", "size value",
+        ]
+        calls = service.client.chat.completions.calls
+        assert len(calls) == 3
+        batched = [call for call in calls if _is_batched(call)]
+        assert len(batched) == 1
+        assert "Extract: city, date" in batched[0]["messages"][1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_single_unprompted_variable_is_not_batched(self, monkeypatch):
+        service = _service(_answer)
+        variables = [_variable("actor"), _variable("city")]
+        prompts = {str(variables[0].id): "PROMPT actor"}
+        fallback = []
+        extract_all_variables = service.extract_all_variables
+
+        async def spy(text, variables, prompts=None, **kwargs):
+            fallback.append([v.name for v in variables])
+            return await extract_all_variables(text, variables, prompts, **kwargs)
+
+        monkeypatch.setattr(service, "extract_all_variables", spy)
+
+        results = await service.extract_document("text", variables, prompts)
+
+        assert fallback == [["actor", "city"]]
+        assert [r["variable_name"] for r in results] == ["actor", "city"]
+        assert not any(_is_batched(call) for call in service.client.chat.completions.calls)
+
+    @pytest.mark.asyncio
+    async def test_variable_left_out_gets_error_row(self):
+        service = _service(lambda kwargs: {"extractions": {
+            "actor": {"value": "police", "confidence": 90, "source_text": "police"},
+        }})
+        variables = [_variable("actor"), _variable("city")]
+
+        actor, city = await service.extract_document("text", variables)
+
+        assert actor["value"] == "police"
+        assert "error" not in actor
+        assert city["variable_id"] == str(variables[1].id)
+        assert city["value"] is None
+        assert city["error"] == "Variable missing from batch response"
+
+    @pytest.mark.asyncio
+    async def test_all_variables_fail_when_retries_run_out(self):
+        service = _service(lambda kwargs: RuntimeError("upstream down"))
+        variables = [_variable("actor"), _variable("city")]
+
+        results = await service.extract_document("text", variables, max_retries=2)
+
+        assert len(service.client.chat.completions.calls) == 2
+        assert [r["variable_name"] for r in results] == ["actor", "city"]
+        assert all(r["value"] is None and r["error"] == "upstream down" for r in results)
+
+    @pytest.mark.asyncio
+    async def test_all_variables_fail_when_circuit_is_open(self, fresh_circuit_breaker):
+        for _ in range(fresh_circuit_breaker.failure_threshold):
+            fresh_circuit_breaker.record_failure()
+        assert fresh_circuit_breaker.state == CircuitState.OPEN
+        service = _service(_answer)
+        variables = [_variable("actor"), _variable("city")]
+
+        results = await service.extract_document("text", variables)
+
+        assert service.client.chat.completions.calls == []
+        assert all(r["value"] is None and "Circuit breaker open" in r["error"] for r in results)
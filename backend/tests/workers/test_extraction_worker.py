@@ -0,0 +1,168 @@
+"""
+Tests for the extraction worker.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import src.workers.extraction_worker as extraction_worker
+from src.core.database import Base
+from src.models.document import ContentType, Document
+from src.models.extraction import Extraction
+from src.models.llm_extraction_cache import LLMExtractionCache
+from src.models.processing_job import JobStatus, JobType, ProcessingJob
+from src.models.processing_log import EventType, ProcessingLog
+from src.models.project import Project, ProjectScale
+from src.models.variable import Variable, VariableType
+
+
+class _FakeExtractionService:
+    """Extraction service that fails for documents whose text starts with "fail"."""
+
+    default_model = "fake-model"
+
+    def __init__(self, on_call=None):
+        self.on_call = on_call
+
+    async def extract_all_variables(self, text, variables, prompts=None):
+        if self.on_call:
+            await self.on_call()
+        if text.startswith("fail"):
+            raise RuntimeError("extraction failed")
+        return [
+            {"variable_id": str(v.id), "value": "police", "confidence": 90, "source_text": text}
+            for v in variables
+        ]
+
+
+@asynccontextmanager
+async def _session_factory(path):
+    # A file database, since documents run in concurrent sessions
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _seed_job(session_factory, contents):
+    async with session_factory() as db:
+        project = Project(name="Worker", scale=ProjectScale.SMALL)
+        db.add(project)
+        await db.flush()
+        db.add(Variable(
+            project_id=project.id, name="actor", type=VariableType.TEXT,
+            instructions="x", order=0,
+        ))
+        documents = [
+            Document(
+                project_id=project.id, name=f"doc{i}", content=content,
+                content_type=ContentType.TXT, size_bytes=len(content),
+            )
+            for i, content in enumerate(contents)
+        ]
+        db.add_all(documents)
+        await db.flush()
+        job = ProcessingJob(
+            project_id=project.id, job_type=JobType.FULL, status=JobStatus.PENDING,
+            document_ids=[str(d.id) for d in documents],
+        )
+        db.add(job)
+        await db.commit()
+        return job.id, [d.id for d in documents]
+
+
+class TestProcessExtractionJob:
+    """Tests for process_extraction_job."""
+
+    @pytest.mark.asyncio
+    async def test_auto_pause_accounts_for_whole_window(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(extraction_worker, "MAX_CONSECUTIVE_FAILURES", 2)
+        monkeypatch.setattr(extraction_worker, "MAX_PARALLEL_DOCUMENTS", 5)
+        monkeypatch.setattr(extraction_worker.settings, "EXTRACTION_BATCH_VARIABLES", False)
+        monkeypatch.setattr(extraction_worker.settings, "EXTRACTION_CACHE_ENABLED", False)
+        monkeypatch.setattr(
+            extraction_worker, "create_extraction_service", lambda: _FakeExtractionService()
+        )
+        async with _session_factory(tmp_path / "worker.db") as session_factory:
+            job_id, document_ids = await _seed_job(
+                session_factory, ["fail one", "fail two", "ok three", "ok four"]
+            )
+
+            result = await extraction_worker.process_extraction_job(
+                {"session_factory": session_factory}, str(job_id)
+            )
+
+            assert result == {"status": "paused", "reason": "consecutive_failures"}
+            async with session_factory() as db:
+                job = (await db.execute(
+                    select(ProcessingJob).where(ProcessingJob.id == job_id)
+                )).scalar_one()
+                assert job.status == JobStatus.PAUSED
+                assert job.documents_processed == 2
+                assert job.documents_failed == 2
+                assert job.consecutive_failures == 0
+                assert job.avg_seconds_per_doc is not None
+
+                logs = dict((await db.execute(
+                    select(ProcessingLog.event_type, func.count())
+                    .where(ProcessingLog.job_id == job_id)
+                    .group_by(ProcessingLog.event_type)
+                )).all())
+                assert logs[EventType.DOC_FAILED] == 2
+                assert logs[EventType.DOC_COMPLETED] == 2
+                assert logs[EventType.JOB_PAUSED] == 1
+
+                extracted = set((await db.execute(
+                    select(Extraction.document_id).where(Extraction.job_id == job_id)
+                )).scalars())
+                assert extracted == set(document_ids[2:])
+
+    @pytest.mark.asyncio
+    async def test_no_connection_held_during_llm_calls(self, tmp_path, monkeypatch):
+        checked_out = set()
+        held_during_calls = []
+        calls = []
+        all_calling = asyncio.Event()
+
+        async def on_call():
+            # Once every document of the window is waiting on the LLM, no
+            # connection should be checked out
+            calls.append(1)
+            if len(calls) == 3:
+                held_during_calls.append(len(checked_out))
+                all_calling.set()
+            await all_calling.wait()
+
+        service = _FakeExtractionService(on_call=on_call)
+        monkeypatch.setattr(extraction_worker, "MAX_PARALLEL_DOCUMENTS", 5)
+        monkeypatch.setattr(extraction_worker.settings, "EXTRACTION_BATCH_VARIABLES", False)
+        monkeypatch.setattr(extraction_worker.settings, "EXTRACTION_CACHE_ENABLED", True)
+        monkeypatch.setattr(extraction_worker, "is_mock_mode", lambda: False)
+        monkeypatch.setattr(extraction_worker, "create_extraction_service", lambda: service)
+        async with _session_factory(tmp_path / "worker.db") as session_factory:
+            job_id, document_ids = await _seed_job(
+                session_factory, ["ok one", "ok two", "ok three"]
+            )
+            pool = session_factory.kw["bind"].sync_engine.pool
+            event.listen(pool, "checkout", lambda conn, record, proxy: checked_out.add(id(record)))
+            event.listen(pool, "checkin", lambda conn, record: checked_out.discard(id(record)))
+
+            result = await extraction_worker.process_extraction_job(
+                {"session_factory": session_factory}, str(job_id)
+            )
+
+            assert result["status"] == "completed"
+            assert held_during_calls == [0]
+            async with session_factory() as db:
+                extracted = set((await db.execute(
+                    select(Extraction.document_id).where(Extraction.job_id == job_id)
+                )).scalars())
+                cached = (await db.execute(
+                    select(func.count()).select_from(LLMExtractionCache)
+                )).scalar_one()
+            assert extracted == set(document_ids)
+            assert cached == 3
@@ -0,0 +1,62 @@
+"""
+Tests for the refinement worker.
+"""
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.database import Base
+from src.models.extraction_feedback import FeedbackType
+from src.models.prompt import Prompt
+from src.models.variable import Variable
+from src.workers.refinement_worker import process_project_refinement_job
+from tests.services.test_feedback_analyzer import _seed_feedback
+
+
+@asynccontextmanager
+async def _session_factory(path):
+    # A file database, since variables are analyzed in concurrent sessions
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestProcessProjectRefinementJob:
+    """Tests for process_project_refinement_job."""
+
+    @pytest.mark.asyncio
+    async def test_refines_variables_with_poor_feedback(self, tmp_path):
+        async with _session_factory(tmp_path / "refine.db") as session_factory:
+            async with session_factory() as db:
+                variables = await _seed_feedback(db, {
+                    "actor": [FeedbackType.INCORRECT] * 3,
+                    "city": [FeedbackType.CORRECT] * 3,
+                })
+                project_id = (await db.execute(
+                    select(Variable.project_id).where(Variable.id == variables["actor"])
+                )).scalar_one()
+
+            result = await process_project_refinement_job(
+                {"session_factory": session_factory}, str(project_id)
+            )
+
+            assert result == {"status": "completed", "refined": {str(variables["actor"]): 2}}
+            async with session_factory() as db:
+                versions = (await db.execute(
+                    select(Prompt.version).where(Prompt.variable_id == variables["city"])
+                )).scalars().all()
+            assert versions == [1]
+
+    @pytest.mark.asyncio
+    async def test_project_without_variables(self, tmp_path):
+        async with _session_factory(tmp_path / "refine.db") as session_factory:
+            result = await process_project_refinement_job(
+                {"session_factory": session_factory}, str(uuid4())
+            )
+
+        assert result["status"] == "skipped"